@@ -1,15 +1,24 @@
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
 from tkinter import filedialog, messagebox
 
 import common.serializer as serializer
+from common.contraction import ContractionHierarchy
+from common.landmarks import load_landmarks_for
 from common.network import Network
-from common.point import squared_distance
+from common.network_view import NetworkView
+
+CH_LABEL = "Contraction hierarchies"
+BUILD_CH_LABEL = "Build contraction hierarchy"
 
 
 class App:
     # Create and manage the tkinter interface.
     def __init__(self):
         self.network = None
+        self.view = None
+        # (network, CSR view, future) while a contraction hierarchy is built.
+        self.hierarchy_build = None
 
         # Make the main interface.
         self.window = tk.Tk()
@@ -41,7 +50,48 @@ class App:
             value=Network.LABEL_SETTING,
             command=self.check_for_path,
         )
+        self.menu_options.add_radiobutton(
+            label="Dijkstra",
+            variable=self.shortest_path_algorithm,
+            value=Network.DIJKSTRA,
+            command=self.check_for_path,
+        )
+        self.menu_options.add_radiobutton(
+            label="Dijkstra (compact)",
+            variable=self.shortest_path_algorithm,
+            value=Network.COMPACT_DIJKSTRA,
+            command=self.check_for_path,
+        )
+        self.menu_options.add_radiobutton(
+            label="Bidirectional Dijkstra",
+            variable=self.shortest_path_algorithm,
+            value=Network.BIDIRECTIONAL,
+            command=self.check_for_path,
+        )
+        self.menu_options.add_radiobutton(
+            label="A*",
+            variable=self.shortest_path_algorithm,
+            value=Network.A_STAR,
+            command=self.check_for_path,
+        )
+        self.menu_options.add_radiobutton(
+            label="ALT (landmarks)",
+            variable=self.shortest_path_algorithm,
+            value=Network.ALT,
+            command=self.check_for_path,
+        )
+        self.menu_options.add_radiobutton(
+            label=CH_LABEL,
+            variable=self.shortest_path_algorithm,
+            value=Network.CONTRACTION_HIERARCHIES,
+            command=self.check_for_path,
+        )
+        self.menu_options.add_separator()
+        self.menu_options.add_command(
+            label=BUILD_CH_LABEL, command=self.build_contraction_hierarchy
+        )
         self.menubar.add_cascade(label="Options", menu=self.menu_options)
+        self.update_options()
 
         self.window.config(menu=self.menubar)
 
@@ -55,6 +105,10 @@ class App:
         self.window.bind("<Control-o>", self.ctrl_o_pressed)
         self.window.bind("<Button1-ButtonRelease>", self.select_start_node)
         self.window.bind("<Button3-ButtonRelease>", self.select_end_node)
+        self.canvas.bind("<Configure>", self.canvas_resized)
+        self.canvas.bind("<MouseWheel>", self.mouse_wheel)
+        self.canvas.bind("<Button-4>", self.mouse_wheel)
+        self.canvas.bind("<Button-5>", self.mouse_wheel)
 
         # Display the window.
         self.window.focus_force()
@@ -69,41 +123,101 @@ class App:
     def select_start_node(self, event):
         if self.network is None:
             return
-        for node in self.network.nodes:
-            if _was_selected(node, event):
-                self.network.select_start_node(node)
-                self.check_for_path()
-                return
+        if node := self.network.node_at(self.view.to_world(event.x, event.y)):
+            self.network.select_start_node(node)
+            self.check_for_path()
 
     def select_end_node(self, event):
         if self.network is None:
             return
-        for node in self.network.nodes:
-            if _was_selected(node, event):
-                self.network.select_end_node(node)
-                self.check_for_path()
-                return
+        if node := self.network.node_at(self.view.to_world(event.x, event.y)):
+            self.network.select_end_node(node)
+            self.check_for_path()
+
+    def canvas_resized(self, event):
+        self.draw_network()
+
+    def mouse_wheel(self, event):
+        if self.view is None:
+            return
+        zoom_in = event.num == 4 or event.delta > 0
+        self.view.zoom(1.25 if zoom_in else 0.8, event.x, event.y)
 
     def check_for_path(self):
+        if self.network is None:
+            return
         self.network.check_for_path(self.shortest_path_algorithm.get())
-        self.draw_network()
+        self.view.refresh()
+        self.update_options()
+
+    def update_options(self):
+        # Contraction hierarchies can only be picked once the hierarchy is built.
+        # Changing a link cost drops it (see Network.update_link_cost), which
+        # turns the option off until the hierarchy is built again.
+        ready = (
+            self.network is not None and self.network.contraction_hierarchy is not None
+        )
+        self.menu_options.entryconfig(
+            CH_LABEL, state=tk.NORMAL if ready else tk.DISABLED
+        )
+        can_build = self.network is not None and self.hierarchy_build is None
+        self.menu_options.entryconfig(
+            BUILD_CH_LABEL, state=tk.NORMAL if can_build else tk.DISABLED
+        )
+        if (
+            not ready
+            and self.shortest_path_algorithm.get() == Network.CONTRACTION_HIERARCHIES
+        ):
+            self.shortest_path_algorithm.set(Network.BIDIRECTIONAL)
+
+    def build_contraction_hierarchy(self):
+        # Build in another process so that the window keeps responding, and
+        # check every 200 ms whether it is done.
+        if self.network is None or self.hierarchy_build is not None:
+            return
+        compact = self.network.to_csr()
+        executor = ProcessPoolExecutor(max_workers=1)
+        future = executor.submit(ContractionHierarchy.build, compact)
+        executor.shutdown(wait=False)
+        self.hierarchy_build = (self.network, compact, future)
+        self.update_options()
+        self.window.after(200, self.contraction_hierarchy_built)
+
+    def contraction_hierarchy_built(self):
+        network, compact, future = self.hierarchy_build
+        if not future.done():
+            self.window.after(200, self.contraction_hierarchy_built)
+            return
+        self.hierarchy_build = None
+        try:
+            hierarchy = future.result()
+        except Exception as ex:
+            messagebox.showinfo("", f"Could not build the contraction hierarchy\n{ex}")
+        else:
+            # Keep it only if the network and its costs did not change meanwhile.
+            if network is self.network and network.to_csr() is compact:
+                network.contraction_hierarchy = hierarchy
+        self.update_options()
 
     def open_network(self):
         if filename := filedialog.askopenfilename():
             try:
-                self.network = serializer.load_from_file(filename)
+                if serializer.is_binary_file(filename):
+                    self.network = serializer.load_binary(filename)
+                else:
+                    self.network = serializer.load_from_file(filename)
+                self.network.landmarks = load_landmarks_for(self.network, filename)
+                self.view = NetworkView(self.network, self.canvas)
                 self.draw_network()
+                self.update_options()
             except Exception as ex:
                 messagebox.showinfo("", f"Could not open file '{filename}'\n{ex}")
 
     def draw_network(self):
-        if self.network is not None:
-            self.canvas.delete(tk.ALL)
-            self.network.draw(self.canvas)
-
-
-def _was_selected(node, event):
-    return squared_distance(node.pos, event) <= node.radius**2
+        if self.view is not None:
+            self.view.draw()
 
 
-App()
+if __name__ == "__main__":
+    # The guard keeps the worker processes from opening windows of their own.
+    App()
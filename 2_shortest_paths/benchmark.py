@@ -0,0 +1,91 @@
+"""
+Time the shortest path algorithms on grid-shaped networks.
+"""
+import argparse
+import time
+from typing import Tuple
+
+from builder import build_grid_network
+
+from common.contraction import ContractionHierarchy
+from common.landmarks import Landmarks
+from common.network import Network
+
+ALGORITHMS = {
+    "label-correcting": Network.LABEL_CORRECTING,
+    "dijkstra": Network.DIJKSTRA,
+    "compact-dijkstra": Network.COMPACT_DIJKSTRA,
+    "bidirectional": Network.BIDIRECTIONAL,
+    "a-star": Network.A_STAR,
+    "alt": Network.ALT,
+    "ch": Network.CONTRACTION_HIERARCHIES,
+}
+
+
+def _time_algorithm(network: Network, algorithm_idx: int) -> Tuple[float, str]:
+    start = time.perf_counter()
+    network.check_for_path(algorithm_idx)
+    seconds = time.perf_counter() - start
+    settled = "-" if network.num_settled is None else str(network.num_settled)
+    return seconds, settled
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", type=int, nargs="+", help="grid side lengths")
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS)
+    )
+    parser.add_argument(
+        "--end-node",
+        action="store_true",
+        help="query between two nodes inside the grid instead of from a corner",
+    )
+    parser.add_argument(
+        "--k-paths",
+        type=int,
+        default=10,
+        metavar="K",
+        help="also time the K shortest paths (to the far corner), 0 to skip",
+    )
+    args = parser.parse_args()
+    print(f"{'nodes':>10} {'algorithm':>18} {'seconds':>10} {'settled':>10}")
+    for size in args.sizes:
+        network = build_grid_network(10 * size, 10 * size, size, size)
+        if args.end_node:
+            start, end = size // 4, 3 * size // 4
+            network.select_start_node(network.nodes[start * size + start])
+            network.select_end_node(network.nodes[end * size + end])
+        else:
+            network.select_start_node(network.nodes[0])
+        if "alt" in args.algorithms:
+            start = time.perf_counter()
+            network.landmarks = Landmarks.build(network.to_csr(), workers=None)
+            seconds = time.perf_counter() - start
+            print(
+                f"{len(network.nodes):>10} {'alt preprocessing':>18} {seconds:>10.3f}"
+            )
+        if "ch" in args.algorithms:
+            start = time.perf_counter()
+            network.contraction_hierarchy = ContractionHierarchy.build(network.to_csr())
+            seconds = time.perf_counter() - start
+            shortcuts = network.contraction_hierarchy.num_shortcuts
+            print(
+                f"{len(network.nodes):>10} {'ch preprocessing':>18} {seconds:>10.3f}"
+                f" {shortcuts:>10} shortcuts"
+            )
+        for name in args.algorithms:
+            seconds, settled = _time_algorithm(network, ALGORITHMS[name])
+            print(f"{len(network.nodes):>10} {name:>18} {seconds:>10.3f} {settled:>10}")
+        if args.k_paths:
+            if network.end_node is None:
+                network.select_end_node(network.nodes[-1])
+            start = time.perf_counter()
+            network.find_k_shortest_paths(args.k_paths)
+            seconds = time.perf_counter() - start
+            name = f"{args.k_paths}-paths"
+            print(f"{len(network.nodes):>10} {name:>18} {seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    _main()
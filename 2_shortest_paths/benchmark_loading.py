@@ -0,0 +1,70 @@
+"""
+Time loading grid-shaped networks from the text and binary files.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from builder import build_grid_network
+
+import common.serializer as serializer
+from common.network import Network, Node
+
+
+def _load_line_by_line(filename: str) -> Network:
+    # The text loader before the bulk parser, kept as the baseline.
+    network = Network()
+    with open(filename, "r", encoding="utf-8") as reader:
+
+        def next_line() -> str:
+            while line := reader.readline():
+                if clean_line := serializer._remove_comments(line):
+                    return clean_line
+            raise serializer.DeserializationException("Unexpected end of file")
+
+        num_nodes = int(next_line())
+        num_links = int(next_line())
+        radius = Node.SMALL_RADIUS if num_nodes > Network.BIG else Node.LARGE_RADIUS
+        for _ in range(num_nodes):
+            serializer._add_node(network, next_line(), radius=radius)
+        for _ in range(num_links):
+            serializer._add_link(network, next_line())
+    return network
+
+
+LOADERS = {
+    "line-by-line": _load_line_by_line,
+    "bulk": serializer.load_from_file,
+    "binary": serializer.load_binary,
+    "binary-compact": serializer.load_compact,
+}
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "sizes", type=int, nargs="*", default=[1000], help="grid side lengths"
+    )
+    parser.add_argument("--loaders", nargs="+", choices=LOADERS, default=list(LOADERS))
+    args = parser.parse_args()
+    print(f"{'links':>10} {'loader':>16} {'seconds':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        text_filename = os.path.join(directory, "grid.net")
+        binary_filename = os.path.join(directory, "grid.netb")
+        for size in args.sizes:
+            network = build_grid_network(10 * size, 10 * size, size, size)
+            num_links = len(network.links)
+            serializer.save_into_file(network, text_filename)
+            serializer.save_binary(network, binary_filename)
+            del network
+            for name in args.loaders:
+                filename = binary_filename if "binary" in name else text_filename
+                start = time.perf_counter()
+                LOADERS[name](filename)
+                seconds = time.perf_counter() - start
+                print(f"{num_links:>10} {name:>16} {seconds:>10.3f}")
+
+
+if __name__ == "__main__":
+    _main()
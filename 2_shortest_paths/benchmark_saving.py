@@ -0,0 +1,75 @@
+"""
+Time saving grid-shaped networks into text files.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from builder import build_grid_network
+
+import common.serializer as serializer
+
+
+def _save_as_one_string(network, filename: str, compression=None):
+    # The writer before the streaming one, kept as the baseline.
+    with open(filename, "w", encoding="utf-8") as writer:
+        writer.writelines(serializer._network_to_string(network))
+
+
+WRITERS = {
+    "one-string": _save_as_one_string,
+    "streaming": serializer.save_into_file,
+    "gzip": serializer.save_into_file,
+    "zstd": serializer.save_into_file,
+}
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "sizes", type=int, nargs="*", default=[500], help="grid side lengths"
+    )
+    parser.add_argument("--writers", nargs="+", choices=WRITERS, default=list(WRITERS))
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="also report the peak memory allocated while saving, which is slower",
+    )
+    args = parser.parse_args()
+    print(
+        f"{'links':>10} {'writer':>12} {'seconds':>10} {'MB':>8} {'links/s':>10}",
+        end="",
+    )
+    print(f" {'peak MB':>8}" if args.memory else "")
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "grid.net")
+        for size in args.sizes:
+            network = build_grid_network(10 * size, 10 * size, size, size)
+            for name in args.writers:
+                compression = name if name in ("gzip", "zstd") else None
+                if args.memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                try:
+                    WRITERS[name](network, filename, compression)
+                except ValueError as ex:
+                    print(f"{len(network.links):>10} {name:>12} skipped: {ex}")
+                    continue
+                finally:
+                    seconds = time.perf_counter() - start
+                    if args.memory:
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                megabytes = os.path.getsize(filename) / 1e6
+                print(
+                    f"{len(network.links):>10} {name:>12} {seconds:>10.3f}"
+                    f" {megabytes:>8.1f} {len(network.links) / seconds:>10.0f}",
+                    end="",
+                )
+                print(f" {peak / 1e6:>8.1f}" if args.memory else "")
+
+
+if __name__ == "__main__":
+    _main()
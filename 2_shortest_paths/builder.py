@@ -2,15 +2,30 @@
 Generate grid-shaped networks.
 """
 import argparse
+import os
 import random
+import shutil
+import tempfile
+from typing import List, NamedTuple, Optional, Tuple
 
-from common.network import Network, Node
+import numpy
+
+import common.network_arrays as network_arrays
+from common.network import Network
+from common.parallel import map_with_graph
 from common.point import Point
-from common.serializer import save_into_file
+from common.serializer import COMMENT, save_into_file
+
+GRID_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # left, right, up and down
+BAND_ROWS = 256  # rows per partition, fixed so that the file does not depend on workers
 
 
 def _cost(lenght: int) -> int:
-    return int(lenght * (1 + random.randint(0, 20) / 100))
+    return _cost_with(lenght, random.randint(0, 20))
+
+
+def _cost_with(lenght: float, percent: int) -> int:
+    return int(lenght * (1 + percent / 100))
 
 
 def build_grid_network(width: int, height: int, num_rows: int, num_cols) -> Network:
@@ -23,9 +38,9 @@ def build_grid_network(width: int, height: int, num_rows: int, num_cols) -> Netw
 
     # Add nodes
     num_nodes = num_rows * num_cols
-    radius = Node.LARGE_RADIUS if num_nodes < Network.BIG else Node.SMALL_RADIUS
-    dist_x = (width - 4 * radius) / (num_cols - 1) if num_cols > 1 else 0
-    dist_y = (height - 4 * radius) / (num_rows - 1) if num_rows > 1 else 0
+    radius, dist_x, dist_y = network_arrays.grid_spacing(
+        width, height, num_rows, num_cols
+    )
     pos_x, pos_y = 2 * radius, 2 * radius
     i = 0
     for _ in range(num_rows):
@@ -56,6 +71,117 @@ def build_grid_network(width: int, height: int, num_rows: int, num_cols) -> Netw
     return network
 
 
+class _GridFile(NamedTuple):
+    width: int
+    height: int
+    num_rows: int
+    num_cols: int
+    seed: int
+    directory: str  # where the partitions write their parts
+
+
+def _write_band(grid: _GridFile, first_row: int) -> Tuple[str, str]:
+    # Write the node and link lines of the rows first_row to first_row +
+    # BAND_ROWS - 1 into two part files, in the order of build_grid_network.
+    rng = random.Random(f"{grid.seed}/{first_row}")
+    num_cols = grid.num_cols
+    last_row = min(first_row + BAND_ROWS, grid.num_rows)
+    radius, dist_x, dist_y = network_arrays.grid_spacing(
+        grid.width, grid.height, grid.num_rows, num_cols
+    )
+    costs_x = [_cost_with(dist_x, k) for k in range(21)]
+    costs_y = [_cost_with(dist_y, k) for k in range(21)]
+    xs = [str(int(2 * radius + col * dist_x)) for col in range(num_cols)]
+
+    nodes_path = os.path.join(grid.directory, f"{first_row}.nodes")
+    links_path = os.path.join(grid.directory, f"{first_row}.links")
+    with open(nodes_path, "w", encoding="utf-8") as nodes_writer, open(
+        links_path, "w", encoding="utf-8"
+    ) as links_writer:
+        for row in range(first_row, last_row):
+            first = row * num_cols
+            pos_y = int(2 * radius + row * dist_y)
+            nodes_writer.writelines(
+                f"{x},{pos_y},{first + col}\n" for col, x in enumerate(xs)
+            )
+
+            cost_x = iter(rng.choices(costs_x, k=2 * (num_cols - 1)))
+            cost_y = iter(rng.choices(costs_y, k=2 * num_cols))
+            lines = []
+            for i in range(first, first + num_cols):
+                if i > first:
+                    lines.append(f"{i},{i - 1},{next(cost_x)}\n")
+                if i < first + num_cols - 1:
+                    lines.append(f"{i},{i + 1},{next(cost_x)}\n")
+                if row > 0:
+                    lines.append(f"{i},{i - num_cols},{next(cost_y)}\n")
+                if row < grid.num_rows - 1:
+                    lines.append(f"{i},{i + num_cols},{next(cost_y)}\n")
+            links_writer.writelines(lines)
+    return nodes_path, links_path
+
+
+def build_grid_arrays(
+    width: int,
+    height: int,
+    num_rows: int,
+    num_cols: int,
+    rng: numpy.random.Generator,
+) -> network_arrays.NetworkArrays:
+    """
+    Build the arrays of the grid-shaped network of build_grid_network at once,
+    with the random cost factors drawn from rng
+    """
+    xs, ys, dist_x, dist_y = network_arrays.grid_positions(
+        width, height, num_rows, num_cols
+    )
+    from_indices, to_indices, steps = network_arrays.grid_links(
+        num_rows, num_cols, GRID_STEPS
+    )
+    lengths = numpy.where(steps < 2, dist_x, dist_y)
+    percents = rng.integers(0, 21, len(steps))
+    costs = (lengths * (1 + percents / 100)).astype(numpy.int64)
+    return network_arrays.NetworkArrays(xs, ys, from_indices, to_indices, costs)
+
+
+def _copy_parts(paths: List[str], writer):
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as reader:
+            shutil.copyfileobj(reader, writer)
+
+
+def write_grid_network(
+    filename: str,
+    width: int,
+    height: int,
+    num_rows: int,
+    num_cols: int,
+    workers: Optional[int] = None,
+    seed: int = 0,
+):
+    """
+    Write the file of a grid-shaped network like build_grid_network's without
+    creating the network. Bands of BAND_ROWS rows are written in parallel, each
+    with its own random generator seeded from seed and its first row, so the
+    file only depends on the arguments and seed.
+    """
+    num_nodes = num_rows * num_cols
+    num_links = 2 * num_rows * (num_cols - 1) + 2 * num_cols * (num_rows - 1)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.TemporaryDirectory(dir=directory) as parts_directory:
+        grid = _GridFile(width, height, num_rows, num_cols, seed, parts_directory)
+        parts = map_with_graph(
+            _write_band, grid, range(0, num_rows, BAND_ROWS), workers
+        )
+        with open(filename, "w", encoding="utf-8") as writer:
+            writer.write(f"{num_nodes} {COMMENT} Num nodes.\n")
+            writer.write(f"{num_links} {COMMENT} Num links.\n")
+            writer.write(f"{COMMENT} Nodes.\n")
+            _copy_parts([nodes_path for nodes_path, _ in parts], writer)
+            writer.write(f"{COMMENT} Links.\n")
+            _copy_parts([links_path for _, links_path in parts], writer)
+
+
 def _main():
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
@@ -63,7 +189,40 @@ def _main():
     parser.add_argument("height", type=int)
     parser.add_argument("rows", type=int)
     parser.add_argument("cols", type=int)
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="write the file in row bands over worker processes, without a Network",
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="build the network as NumPy arrays",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
     args = parser.parse_args()
+    if args.vectorized:
+        arrays = build_grid_arrays(
+            args.width,
+            args.height,
+            args.rows,
+            args.cols,
+            numpy.random.default_rng(args.seed),
+        )
+        arrays.save_into_file(args.filename)
+        return
+    if args.parallel:
+        write_grid_network(
+            args.filename,
+            args.width,
+            args.height,
+            args.rows,
+            args.cols,
+            args.workers,
+            args.seed,
+        )
+        return
     network = build_grid_network(args.width, args.height, args.rows, args.cols)
     save_into_file(network, args.filename)
 
@@ -1,6 +1,10 @@
-from builder import build_grid_network
+import builder
+import numpy
+from builder import build_grid_arrays, build_grid_network, write_grid_network
 from pytest import approx
 
+from common.serializer import load_from_file
+
 
 def test_build_one_by_one_grid():
     network = build_grid_network(40, 40, 1, 1)
@@ -62,3 +66,48 @@ def test_build_a_big_grid():
     assert network.nodes[0].pos.y == approx(10)
     assert network.nodes[-1].pos.x == approx(210)
     assert network.nodes[-1].pos.y == approx(210)
+
+
+def test_write_grid_network(tmp_path):
+    filename = str(tmp_path / "grid.net")
+    write_grid_network(filename, 220, 220, 10, 10, workers=1)
+    network = load_from_file(filename)
+    expected = build_grid_network(220, 220, 10, 10)
+    assert [(node.pos.x, node.pos.y, node.text) for node in network.nodes] == [
+        (int(node.pos.x), int(node.pos.y), node.text) for node in expected.nodes
+    ]
+    assert [(link.from_node.index, link.to_node.index) for link in network.links] == [
+        (link.from_node.index, link.to_node.index) for link in expected.links
+    ]
+    assert all(22 <= link.cost <= 26 for link in network.links)
+
+
+def test_write_grid_network_is_deterministic(tmp_path, monkeypatch):
+    monkeypatch.setattr(builder, "BAND_ROWS", 2)
+    contents = []
+    for name, workers, seed in [("a", 1, 0), ("b", 2, 0), ("c", 1, 1)]:
+        filename = str(tmp_path / f"{name}.net")
+        write_grid_network(filename, 500, 300, 5, 7, workers=workers, seed=seed)
+        with open(filename, "r", encoding="utf-8") as reader:
+            contents.append(reader.read())
+    assert contents[0] == contents[1]
+    assert contents[0] != contents[2]
+    assert contents[0].endswith("\n")
+
+
+def test_build_grid_arrays():
+    arrays = build_grid_arrays(220, 220, 10, 10, numpy.random.default_rng(1))
+    network = arrays.to_network()
+    expected = build_grid_network(220, 220, 10, 10)
+    assert [node.pos.x for node in network.nodes] == approx(
+        [node.pos.x for node in expected.nodes]
+    )
+    assert [node.pos.y for node in network.nodes] == approx(
+        [node.pos.y for node in expected.nodes]
+    )
+    assert [(link.from_node.index, link.to_node.index) for link in network.links] == [
+        (link.from_node.index, link.to_node.index) for link in expected.links
+    ]
+    assert all(22 <= link.cost <= 26 for link in network.links)
+    again = build_grid_arrays(220, 220, 10, 10, numpy.random.default_rng(1))
+    assert again.costs.tolist() == arrays.costs.tolist()
@@ -3,7 +3,7 @@ from tkinter import filedialog, messagebox
 
 import common.serializer as serializer
 from common.network import Network
-from common.point import squared_distance
+from common.point import Point
 
 
 class App:
@@ -69,20 +69,16 @@ class App:
     def select_start_node(self, event):
         if self.network is None:
             return
-        for node in self.network.nodes:
-            if _was_selected(node, event):
-                self.network.select_start_node(node)
-                self.check_for_path()
-                return
+        if node := self.network.node_at(Point(event.x, event.y)):
+            self.network.select_start_node(node)
+            self.check_for_path()
 
     def select_end_node(self, event):
         if self.network is None:
             return
-        for node in self.network.nodes:
-            if _was_selected(node, event):
-                self.network.select_end_node(node)
-                self.check_for_path()
-                return
+        if node := self.network.node_at(Point(event.x, event.y)):
+            self.network.select_end_node(node)
+            self.check_for_path()
 
     def check_for_path(self):
         self.network.check_for_path(self.shortest_path_algorithm.get())
@@ -102,8 +98,4 @@ class App:
             self.network.draw(self.canvas)
 
 
-def _was_selected(node, event):
-    return squared_distance(node.pos, event) <= node.radius**2
-
-
 App()
@@ -4,10 +4,15 @@ Generate grid-shaped networks.
 import argparse
 import random
 
-from common.network import Network, Node
+import numpy
+
+import common.network_arrays as network_arrays
+from common.network import Network
 from common.point import Point
 from common.serializer import save_into_file
 
+GRID_STEPS = [(1, 0), (0, 1)]  # right and down
+
 
 def _capacity() -> int:
     return random.randint(1, 5)
@@ -23,9 +28,9 @@ def build_grid_network(width: int, height: int, num_rows: int, num_cols) -> Netw
 
     # Add nodes
     num_nodes = num_rows * num_cols
-    radius = Node.LARGE_RADIUS if num_nodes < Network.BIG else Node.SMALL_RADIUS
-    dist_x = (width - 4 * radius) / (num_cols - 1) if num_cols > 1 else 0
-    dist_y = (height - 4 * radius) / (num_rows - 1) if num_rows > 1 else 0
+    radius, dist_x, dist_y = network_arrays.grid_spacing(
+        width, height, num_rows, num_cols
+    )
     pos_x, pos_y = 2 * radius, 2 * radius
     i = 0
     for _ in range(num_rows):
@@ -52,6 +57,25 @@ def build_grid_network(width: int, height: int, num_rows: int, num_cols) -> Netw
     return network
 
 
+def build_grid_arrays(
+    width: int,
+    height: int,
+    num_rows: int,
+    num_cols: int,
+    rng: numpy.random.Generator,
+) -> network_arrays.NetworkArrays:
+    """
+    Build the arrays of the grid-shaped network of build_grid_network at once,
+    with the capacities drawn from rng
+    """
+    xs, ys, _, _ = network_arrays.grid_positions(width, height, num_rows, num_cols)
+    from_indices, to_indices, _ = network_arrays.grid_links(
+        num_rows, num_cols, GRID_STEPS
+    )
+    capacities = rng.integers(1, 6, len(from_indices))
+    return network_arrays.NetworkArrays(xs, ys, from_indices, to_indices, capacities)
+
+
 def _main():
     parser = argparse.ArgumentParser()
     parser.add_argument("filename")
@@ -59,7 +83,23 @@ def _main():
     parser.add_argument("height", type=int)
     parser.add_argument("rows", type=int)
     parser.add_argument("cols", type=int)
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="build the network as NumPy arrays",
+    )
+    parser.add_argument("--seed", type=int, default=0)
     args = parser.parse_args()
+    if args.vectorized:
+        arrays = build_grid_arrays(
+            args.width,
+            args.height,
+            args.rows,
+            args.cols,
+            numpy.random.default_rng(args.seed),
+        )
+        arrays.save_into_file(args.filename)
+        return
     network = build_grid_network(args.width, args.height, args.rows, args.cols)
     save_into_file(network, args.filename)
 
@@ -0,0 +1,169 @@
+"""
+Array-backed, read-only view of a Network in compressed sparse row form
+"""
+from __future__ import annotations
+
+from array import array
+from heapq import heappop, heappush
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy
+
+if TYPE_CHECKING:
+    from common.network import Link, Network
+
+NO_EDGE = -1
+_DTYPES = {"q": numpy.int64, "i": numpy.intc, "d": numpy.float64}
+
+
+def _from_numpy(typecode: str, values: numpy.ndarray) -> array:
+    return array(typecode, values.astype(_DTYPES[typecode], copy=False).tobytes())
+
+
+def _to_array(typecode: str, values: Sequence) -> array:
+    return values if isinstance(values, array) else array(typecode, values)
+
+
+class CompactNetwork:
+    """
+    The outgoing edges of node i are the positions offsets[i] to offsets[i + 1] - 1
+    of the targets, costs and link_indices buffers. link_indices maps every edge
+    back to the position of its Link in Network.links.
+    """
+
+    __slots__ = ("num_nodes", "offsets", "targets", "costs", "link_indices")
+
+    def __init__(
+        self,
+        num_nodes: int,
+        offsets: Sequence[int],
+        targets: Sequence[int],
+        costs: Sequence[float],
+        link_indices: Sequence[int],
+    ):
+        self.num_nodes = num_nodes
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.link_indices = link_indices
+
+    @classmethod
+    def from_network(cls, network: Network) -> CompactNetwork:
+        num_nodes = len(network.nodes)
+        offsets = array("q", bytes(8 * (num_nodes + 1)))
+        for link in network.links:
+            offsets[link.from_node.index + 1] += 1
+        for i in range(num_nodes):
+            offsets[i + 1] += offsets[i]
+
+        num_links = len(network.links)
+        targets = array("i", bytes(4 * num_links))
+        costs = array("d", bytes(8 * num_links))
+        link_indices = array("i", bytes(4 * num_links))
+        next_edge = offsets[:-1]
+        for k, link in enumerate(network.links):
+            e = next_edge[link.from_node.index]
+            next_edge[link.from_node.index] += 1
+            targets[e] = link.to_node.index
+            costs[e] = link.cost
+            link_indices[e] = k
+        return cls(num_nodes, offsets, targets, costs, link_indices)
+
+    def __reduce__(self):
+        # Memory-mapped views cannot be pickled, send copies to other processes.
+        return CompactNetwork, (
+            self.num_nodes,
+            _to_array("q", self.offsets),
+            _to_array("i", self.targets),
+            _to_array("d", self.costs),
+            _to_array("i", self.link_indices),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        num_nodes: int,
+        from_indices: numpy.ndarray,
+        to_indices: numpy.ndarray,
+        costs: numpy.ndarray,
+    ) -> CompactNetwork:
+        """
+        Build the CSR view of the links from_indices[k] -> to_indices[k], with
+        costs[k] and link index k, without creating a Network
+        """
+        order = numpy.argsort(from_indices, kind="stable")
+        offsets = numpy.zeros(num_nodes + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(from_indices, minlength=num_nodes), out=offsets[1:])
+        return cls(
+            num_nodes,
+            _from_numpy("q", offsets),
+            _from_numpy("i", numpy.asarray(to_indices)[order]),
+            _from_numpy("d", numpy.asarray(costs)[order]),
+            _from_numpy("i", order),
+        )
+
+    @property
+    def num_links(self) -> int:
+        return len(self.targets)
+
+    def edges(self, node: int) -> range:
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    def reverse(self) -> CompactNetwork:
+        """
+        Return the transposed network: every edge u -> v becomes v -> u and keeps
+        its cost and link index
+        """
+        offsets = array("q", bytes(8 * (self.num_nodes + 1)))
+        for target in self.targets:
+            offsets[target + 1] += 1
+        for i in range(self.num_nodes):
+            offsets[i + 1] += offsets[i]
+
+        targets = array("i", bytes(4 * self.num_links))
+        costs = array("d", bytes(8 * self.num_links))
+        link_indices = array("i", bytes(4 * self.num_links))
+        next_edge = offsets[:-1]
+        for node in range(self.num_nodes):
+            for e in self.edges(node):
+                r = next_edge[self.targets[e]]
+                next_edge[self.targets[e]] += 1
+                targets[r] = node
+                costs[r] = self.costs[e]
+                link_indices[r] = self.link_indices[e]
+        return CompactNetwork(self.num_nodes, offsets, targets, costs, link_indices)
+
+    def shortest_path_tree(self, source: int) -> Tuple[array, array]:
+        """
+        Dijkstra from source. Return the cost to reach every node (inf when it
+        cannot be reached) and the edge used to get there (NO_EDGE for the source
+        and for unreachable nodes)
+        """
+        offsets, targets, edge_costs = self.offsets, self.targets, self.costs
+        costs = array("d", [float("inf")]) * self.num_nodes
+        edges = array("i", [NO_EDGE]) * self.num_nodes
+        settled = bytearray(self.num_nodes)
+        costs[source] = 0
+        queue = [(0.0, source)]
+        while queue:
+            cost, i = heappop(queue)
+            if settled[i]:
+                continue
+            settled[i] = 1
+            for e in range(offsets[i], offsets[i + 1]):
+                j = targets[e]
+                new_cost = cost + edge_costs[e]
+                if new_cost < costs[j]:
+                    costs[j] = new_cost
+                    edges[j] = e
+                    heappush(queue, (new_cost, j))
+        return costs, edges
+
+    def to_links(self, network: Network, edges: Sequence[int]) -> List[Optional[Link]]:
+        """
+        Map a per-node array of edges, such as the one returned by
+        shortest_path_tree, back to the Link objects of network
+        """
+        return [
+            None if e == NO_EDGE else network.links[self.link_indices[e]] for e in edges
+        ]
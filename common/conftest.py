@@ -0,0 +1,37 @@
+import random
+from typing import Callable
+
+import pytest
+
+from common.network import Network
+from common.point import Point
+
+
+@pytest.fixture
+def random_grid() -> Callable[..., Network]:
+    """
+    Return a function that builds a num_rows x num_cols grid with links in both
+    directions and costs drawn from their own generator, so that the global
+    random state is left alone
+    """
+
+    def build(
+        num_rows: int, num_cols: int, min_cost: int, max_cost: int, seed: int
+    ) -> Network:
+        rng = random.Random(seed)
+        network = Network()
+        for row in range(num_rows):
+            for col in range(num_cols):
+                network.add_node(Point(10 * col, 10 * row), str(row * num_cols + col))
+        nodes = network.nodes
+        for i, node in enumerate(nodes):
+            if i % num_cols < num_cols - 1:
+                network.add_link(node, nodes[i + 1], rng.randint(min_cost, max_cost))
+                network.add_link(nodes[i + 1], node, rng.randint(min_cost, max_cost))
+            if i < len(nodes) - num_cols:
+                below = nodes[i + num_cols]
+                network.add_link(node, below, rng.randint(min_cost, max_cost))
+                network.add_link(below, node, rng.randint(min_cost, max_cost))
+        return network
+
+    return build
@@ -0,0 +1,422 @@
+"""
+Contraction hierarchies for fast start/end queries on a static network
+"""
+from __future__ import annotations
+
+from array import array
+from heapq import heapify, heappop, heappush
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from common.compact_network import CompactNetwork
+from common.distance_matrix import DistanceMatrix
+from common.workspace import SearchWorkspace
+
+NO_LINK = -1
+
+# Adjacency of the nodes not contracted yet: neighbour -> (cost, edge)
+_Adjacency = List[Dict[int, Tuple[float, int]]]
+
+
+def _to_compact(num_nodes: int, adjacency: List[List[Tuple[int, float, int]]]):
+    # The link_indices of the result are edge ids of the hierarchy, not links.
+    offsets = array("q", [0])
+    targets, costs, edges = array("i"), array("d"), array("i")
+    for neighbours in adjacency:
+        for target, cost, edge in neighbours:
+            targets.append(target)
+            costs.append(cost)
+            edges.append(edge)
+        offsets.append(len(targets))
+    return CompactNetwork(num_nodes, offsets, targets, costs, edges)
+
+
+class ContractionHierarchy:
+    """
+    Nodes are contracted one at a time, fewest shortcuts per removed edge
+    first. When a node is removed, a shortcut edge replaces every path
+    u -> node -> w that is not matched by a witness path avoiding the node. A
+    query then only follows edges towards nodes contracted later, forward from
+    the start node and backward from the end node.
+    """
+
+    # Nodes a witness search may settle when ranking the nodes and when
+    # contracting one. A search that gives up adds a shortcut that may not be
+    # needed, which only costs query time, so ranking can afford to be sloppy.
+    PRIORITY_SETTLED_LIMIT: int = 50
+    WITNESS_SETTLED_LIMIT: int = 1000
+
+    def __init__(
+        self,
+        rank: array,
+        upward: CompactNetwork,
+        downward: CompactNetwork,
+        edge_tails: array,
+        edge_heads: array,
+        edge_links: array,
+        edge_children: List[Tuple[int, int]],
+    ):
+        self.rank = rank
+        self.upward = upward  # edges u -> w, stored at u, with rank[u] < rank[w]
+        self.downward = downward  # edges u -> w, stored at w, with rank[u] > rank[w]
+        self.edge_tails = edge_tails
+        self.edge_heads = edge_heads
+        self.edge_links = edge_links  # link index, or NO_LINK for shortcuts
+        self.edge_children = edge_children  # the two edges a shortcut replaces
+        self.num_settled = 0
+        self._workspaces = (SearchWorkspace(), SearchWorkspace())
+
+    @classmethod
+    def build(cls, compact: CompactNetwork) -> ContractionHierarchy:
+        return _Builder(compact).build()
+
+    @property
+    def num_shortcuts(self) -> int:
+        return self.edge_links.count(NO_LINK)
+
+    def query(self, source: int, target: int) -> Optional[List[int]]:
+        """
+        Return the indices of the links in the cheapest path from source to
+        target, or None when there is no path. Link costs must not be negative.
+        """
+        num_nodes = len(self.rank)
+        for workspace in self._workspaces:
+            workspace.reset(num_nodes)
+        # Index 0 holds the forward search, index 1 the backward one. The
+        # workspace links hold the edge used to reach each node.
+        forward, backward = self._workspaces
+        generations = forward.generation, backward.generation
+        all_stamps = forward.stamps, backward.stamps
+        all_costs = forward.costs, backward.costs
+        all_edges = forward.links, backward.links
+        graphs = (self.upward, self.downward)
+        # The edges into a node from higher ranked ones, for each search. They
+        # are never followed, but when one of them reaches the node for less,
+        # its cost is not final and its edges need not be followed either
+        # (stall-on-demand).
+        stall_graphs = (self.downward, self.upward)
+        forward.set(source, 0.0, None)
+        backward.set(target, 0.0, None)
+        queues = [[(0.0, source)], [(0.0, target)]]
+        best_cost, meeting_node = float("inf"), None
+        self.num_settled = 0
+        while queues[0] or queues[1]:
+            for side in (0, 1):
+                queue = queues[side]
+                if not queue:
+                    continue
+                cost, i = heappop(queue)
+                generation, stamps = generations[side], all_stamps[side]
+                costs, edges = all_costs[side], all_edges[side]
+                if cost > costs[i]:
+                    continue
+                if cost >= best_cost:
+                    queue.clear()
+                    continue
+                self.num_settled += 1
+                other = 1 - side
+                if all_stamps[other][i] == generations[other]:
+                    if (total := cost + all_costs[other][i]) < best_cost:
+                        best_cost, meeting_node = total, i
+                graph = stall_graphs[side]
+                targets, edge_costs = graph.targets, graph.costs
+                for e in range(graph.offsets[i], graph.offsets[i + 1]):
+                    j = targets[e]
+                    if stamps[j] == generation and costs[j] + edge_costs[e] < cost:
+                        break
+                else:
+                    graph = graphs[side]
+                    targets, edge_costs = graph.targets, graph.costs
+                    for e in range(graph.offsets[i], graph.offsets[i + 1]):
+                        j = targets[e]
+                        new_cost = cost + edge_costs[e]
+                        if stamps[j] != generation:
+                            stamps[j] = generation
+                        elif new_cost >= costs[j]:
+                            continue
+                        costs[j] = new_cost
+                        edges[j] = graph.link_indices[e]
+                        heappush(queue, (new_cost, j))
+
+        if meeting_node is None:
+            return None
+        return self._unpack(source, target, meeting_node, forward, backward)
+
+    def many_to_many(
+        self, sources: Sequence[int], targets: Sequence[int]
+    ) -> ManyToManyResult:
+        """
+        Costs from every source to every target with one backward search per
+        target, which leaves (target, cost) entries in a bucket at every node it
+        reaches, and one forward search per source, which scans the buckets of
+        the nodes it reaches
+        """
+        buckets: Dict[int, List[Tuple[int, float]]] = {}
+        backward_edges = []
+        for col, target in enumerate(targets):
+            costs, edges = self._search_space(self.downward, target)
+            backward_edges.append(edges)
+            for node, cost in costs.items():
+                buckets.setdefault(node, []).append((col, cost))
+
+        num_cols = len(targets)
+        values = array("d", [float("inf")]) * (len(sources) * num_cols)
+        meeting_nodes = array("i", [-1]) * (len(sources) * num_cols)
+        forward_edges = []
+        for row, source in enumerate(sources):
+            costs, edges = self._search_space(self.upward, source)
+            forward_edges.append(edges)
+            for node, cost in costs.items():
+                for col, bucket_cost in buckets.get(node, ()):
+                    if cost + bucket_cost < values[row * num_cols + col]:
+                        values[row * num_cols + col] = cost + bucket_cost
+                        meeting_nodes[row * num_cols + col] = node
+        return ManyToManyResult(
+            self,
+            sources,
+            targets,
+            DistanceMatrix(len(sources), num_cols, values),
+            meeting_nodes,
+            forward_edges,
+            backward_edges,
+        )
+
+    @staticmethod
+    def _search_space(
+        graph: CompactNetwork, source: int
+    ) -> Tuple[Dict[int, float], Dict[int, int]]:
+        # Every node reachable through graph, with its cost and the edge used.
+        costs = {source: 0.0}
+        edges: Dict[int, int] = {}
+        queue = [(0.0, source)]
+        while queue:
+            cost, i = heappop(queue)
+            if cost > costs[i]:
+                continue
+            for e in graph.edges(i):
+                j = graph.targets[e]
+                new_cost = cost + graph.costs[e]
+                if new_cost < costs.get(j, float("inf")):
+                    costs[j] = new_cost
+                    edges[j] = graph.link_indices[e]
+                    heappush(queue, (new_cost, j))
+        return costs, edges
+
+    def _unpack(
+        self,
+        source: int,
+        target: int,
+        meeting_node: int,
+        forward_edges: Union[Dict[int, int], SearchWorkspace],
+        backward_edges: Union[Dict[int, int], SearchWorkspace],
+    ) -> List[int]:
+        # Follow the edges of both searches from the meeting node and replace
+        # every shortcut by the two edges it stands for, down to the links.
+        path: List[int] = []
+        node = meeting_node
+        while node != source:
+            path.append(forward_edges[node])
+            node = self.edge_tails[path[-1]]
+        path.reverse()
+        node = meeting_node
+        while node != target:
+            path.append(backward_edges[node])
+            node = self.edge_heads[path[-1]]
+
+        links: List[int] = []
+        stack = list(reversed(path))
+        while stack:
+            edge = stack.pop()
+            if self.edge_links[edge] != NO_LINK:
+                links.append(self.edge_links[edge])
+            else:
+                first, second = self.edge_children[edge]
+                stack.append(second)
+                stack.append(first)
+        return links
+
+
+class ManyToManyResult:
+    """
+    Cost matrix of ContractionHierarchy.many_to_many, with what is needed to
+    rebuild any of its paths on demand
+    """
+
+    def __init__(
+        self,
+        hierarchy: ContractionHierarchy,
+        sources: Sequence[int],
+        targets: Sequence[int],
+        matrix: DistanceMatrix,
+        meeting_nodes: array,
+        forward_edges: List[Dict[int, int]],
+        backward_edges: List[Dict[int, int]],
+    ):
+        self.hierarchy = hierarchy
+        self.sources = sources
+        self.targets = targets
+        self.matrix = matrix
+        self.meeting_nodes = meeting_nodes
+        self.forward_edges = forward_edges
+        self.backward_edges = backward_edges
+
+    def path(self, row: int, col: int) -> Optional[List[int]]:
+        """
+        Indices of the links from sources[row] to targets[col], None if there
+        is no path
+        """
+        meeting_node = self.meeting_nodes[row * self.matrix.num_cols + col]
+        if meeting_node == -1:
+            return None
+        return self.hierarchy._unpack(
+            self.sources[row],
+            self.targets[col],
+            meeting_node,
+            self.forward_edges[row],
+            self.backward_edges[col],
+        )
+
+
+class _Builder:
+    def __init__(self, compact: CompactNetwork):
+        self.num_nodes = compact.num_nodes
+        self.outgoing: _Adjacency = [{} for _ in range(self.num_nodes)]
+        self.incoming: _Adjacency = [{} for _ in range(self.num_nodes)]
+        self.edge_tails, self.edge_heads = array("i"), array("i")
+        self.edge_links = array("i")
+        self.edge_children: List[Tuple[int, int]] = []
+        self.edge_hops = array("i")  # the number of links each edge stands for
+        for u in range(self.num_nodes):
+            for e in compact.edges(u):
+                self._add_edge(
+                    u, compact.targets[e], compact.costs[e], compact.link_indices[e]
+                )
+
+    def _add_edge(
+        self, u: int, w: int, cost: float, link: int, children=(NO_LINK, NO_LINK)
+    ):
+        # Parallel edges are merged and self loops dropped, neither is ever useful.
+        if u == w or (w in self.outgoing[u] and self.outgoing[u][w][0] <= cost):
+            return
+        edge = len(self.edge_links)
+        self.edge_tails.append(u)
+        self.edge_heads.append(w)
+        self.edge_links.append(link)
+        self.edge_children.append(children)
+        self.edge_hops.append(
+            1
+            if link != NO_LINK
+            else self.edge_hops[children[0]] + self.edge_hops[children[1]]
+        )
+        self.outgoing[u][w] = (cost, edge)
+        self.incoming[w][u] = (cost, edge)
+
+    def _unwitnessed(
+        self, source: int, skipped: int, via_costs: Dict[int, float], max_settled: int
+    ) -> Set[int]:
+        # Bounded Dijkstra that avoids the node being contracted and returns the
+        # targets it found no path to at most as expensive as the one through the
+        # node. It stops once every target has one; giving up earlier only means
+        # adding a shortcut that may not be needed.
+        unwitnessed = set(via_costs)
+        limit = max(via_costs.values())
+        outgoing, inf = self.outgoing, float("inf")
+        costs = {source: 0.0}
+        queue = [(0.0, source)]
+        settled = 0
+        while queue and settled < max_settled:
+            cost, i = heappop(queue)
+            if cost > costs[i]:
+                continue
+            settled += 1
+            for j, (link_cost, _) in outgoing[i].items():
+                new_cost = cost + link_cost
+                # Nodes beyond the limit cannot be on a witness, leave them out.
+                if new_cost <= limit and j != skipped and new_cost < costs.get(j, inf):
+                    costs[j] = new_cost
+                    heappush(queue, (new_cost, j))
+                    if j in unwitnessed and new_cost <= via_costs[j]:
+                        unwitnessed.remove(j)
+                        if not unwitnessed:
+                            return unwitnessed
+        return unwitnessed
+
+    def _shortcuts(
+        self, node: int, max_settled: int
+    ) -> List[Tuple[int, int, float, int, int]]:
+        shortcuts = []
+        for u, (in_cost, in_edge) in self.incoming[node].items():
+            via_costs = {
+                w: in_cost + out_cost
+                for w, (out_cost, _) in self.outgoing[node].items()
+                if w != u
+            }
+            if not via_costs:
+                continue
+            for w in self._unwitnessed(u, node, via_costs, max_settled):
+                out_edge = self.outgoing[node][w][1]
+                shortcuts.append((u, w, via_costs[w], in_edge, out_edge))
+        return shortcuts
+
+    def build(self) -> ContractionHierarchy:
+        rank = array("i", [0]) * self.num_nodes
+        upward: List[List[Tuple[int, float, int]]] = [[] for _ in range(self.num_nodes)]
+        downward: List[List[Tuple[int, float, int]]] = [
+            [] for _ in range(self.num_nodes)
+        ]
+        # Priority (as in RoutingKit): the depth in the hierarchy so far, which
+        # spreads contraction uniformly, plus the ratios of the edges, and of the
+        # links they stand for, that contracting the node adds and removes.
+        # Ratios rather than differences keep dense nodes for the top.
+        depth = [0] * self.num_nodes
+        hops = self.edge_hops
+
+        def priority(node: int) -> float:
+            shortcuts = self._shortcuts(
+                node, ContractionHierarchy.PRIORITY_SETTLED_LIMIT
+            )
+            edges = [*self.incoming[node].values(), *self.outgoing[node].values()]
+            if not edges:
+                return depth[node]
+            added_hops = sum(hops[a] + hops[b] for _, _, _, a, b in shortcuts)
+            return (
+                depth[node]
+                + len(shortcuts) / len(edges)
+                + added_hops / sum(hops[e] for _, e in edges)
+            )
+
+        queue = [(priority(node), node) for node in range(self.num_nodes)]
+        heapify(queue)
+        order = 0
+        while queue:
+            _, node = heappop(queue)
+            # Lazy update: the priority may be outdated by earlier contractions.
+            if queue and (new_priority := priority(node)) > queue[0][0]:
+                heappush(queue, (new_priority, node))
+                continue
+            shortcuts = self._shortcuts(
+                node, ContractionHierarchy.WITNESS_SETTLED_LIMIT
+            )
+            for u, w, cost, in_edge, out_edge in shortcuts:
+                self._add_edge(u, w, cost, NO_LINK, (in_edge, out_edge))
+            rank[node] = order
+            order += 1
+            for w, (cost, edge) in self.outgoing[node].items():
+                upward[node].append((w, cost, edge))
+                del self.incoming[w][node]
+                depth[w] = max(depth[w], depth[node] + 1)
+            for u, (cost, edge) in self.incoming[node].items():
+                downward[node].append((u, cost, edge))
+                del self.outgoing[u][node]
+                depth[u] = max(depth[u], depth[node] + 1)
+            self.outgoing[node] = {}
+            self.incoming[node] = {}
+
+        return ContractionHierarchy(
+            rank,
+            _to_compact(self.num_nodes, upward),
+            _to_compact(self.num_nodes, downward),
+            self.edge_tails,
+            self.edge_heads,
+            self.edge_links,
+            self.edge_children,
+        )
@@ -0,0 +1,102 @@
+"""
+Batch shortest path costs between many sources and targets
+"""
+from __future__ import annotations
+
+import argparse
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from common.compact_network import CompactNetwork
+from common.parallel import map_with_graph
+
+HEADER_SIZE = 2  # num rows, num cols
+
+
+class DistanceMatrix:
+    """
+    Dense row-major matrix of costs, inf where a target cannot be reached. It
+    is saved as two int64 (rows, cols) followed by the float64 values, so it can
+    also be read with numpy.fromfile(filename, dtype="f8", offset=16).
+    """
+
+    def __init__(self, num_rows: int, num_cols: int, values: array):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.values = values
+
+    def __getitem__(self, index: Tuple[int, int]) -> float:
+        row, col = index
+        return self.values[row * self.num_cols + col]
+
+    def row(self, row: int) -> array:
+        return self.values[row * self.num_cols : (row + 1) * self.num_cols]
+
+    def save(self, filename: str):
+        with open(filename, "wb") as writer:
+            array("q", [self.num_rows, self.num_cols]).tofile(writer)
+            self.values.tofile(writer)
+
+    @classmethod
+    def load(cls, filename: str) -> DistanceMatrix:
+        with open(filename, "rb") as reader:
+            header = array("q")
+            header.fromfile(reader, HEADER_SIZE)
+            num_rows, num_cols = header
+            values = array("d")
+            values.fromfile(reader, num_rows * num_cols)
+        return cls(num_rows, num_cols, values)
+
+
+def _row(graph: Tuple[CompactNetwork, Optional[Sequence[int]]], source: int) -> array:
+    compact, targets = graph
+    costs, _ = compact.shortest_path_tree(source)
+    if targets is None:
+        return costs
+    return array("d", (costs[target] for target in targets))
+
+
+def distance_matrix(
+    compact: CompactNetwork,
+    sources: Sequence[int],
+    targets: Optional[Sequence[int]] = None,
+    workers: Optional[int] = None,
+) -> DistanceMatrix:
+    """
+    Run one Dijkstra per source, spread over a pool of worker processes that
+    each receive the compact network once. Without targets every node is one.
+    """
+    rows = map_with_graph(_row, (compact, targets), sources, workers)
+    values = array("d")
+    for row in rows:
+        values.extend(row)
+    num_cols = compact.num_nodes if targets is None else len(targets)
+    return DistanceMatrix(len(sources), num_cols, values)
+
+
+def _read_indices(filename: str) -> List[int]:
+    with open(filename, "r", encoding="utf-8") as reader:
+        return [int(value) for value in reader.read().split()]
+
+
+def _main():
+    # Avoid a circular import, the serializer depends on the network module.
+    from common.serializer import load_from_file
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename", help="network file")
+    parser.add_argument("sources", help="file with the source node indices")
+    parser.add_argument("output", help="file to save the matrix into")
+    parser.add_argument("--targets", help="file with the target node indices")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    compact = load_from_file(args.filename).to_csr()
+    targets = _read_indices(args.targets) if args.targets else None
+    matrix = distance_matrix(
+        compact, _read_indices(args.sources), targets, args.workers
+    )
+    matrix.save(args.output)
+
+
+if __name__ == "__main__":
+    _main()
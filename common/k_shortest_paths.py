@@ -0,0 +1,170 @@
+"""
+K cheapest loopless paths between two nodes (Yen's algorithm)
+"""
+from __future__ import annotations
+
+from array import array
+from heapq import heappop, heappush, nsmallest
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
+
+from common.compact_network import NO_EDGE
+from common.workspace import SearchWorkspace
+
+if TYPE_CHECKING:
+    from common.network import Link, Network, Node
+
+
+class _SpurSearch:
+    """
+    The spur searches of one k_shortest_paths call, on the CSR view of the
+    network and a SearchWorkspace reused from one search to the next. Paths are
+    lists of link indices.
+    """
+
+    def __init__(self, network: Network, end: int):
+        self.compact = network.to_csr()
+        self.end = end
+        # Backward Dijkstra: the cost from every node to the end node and the
+        # first link of a cheapest path there. No spur search can do better, so
+        # the costs are an exact enough A* heuristic for all of them.
+        reverse = network.reverse_csr()
+        self.costs_to_end, tree_edges = reverse.shortest_path_tree(end)
+        self.next_links = array(
+            "i",
+            (NO_EDGE if e == NO_EDGE else reverse.link_indices[e] for e in tree_edges),
+        )
+        self.link_sources = array("i", (link.from_node.index for link in network.links))
+        self.link_targets = array("i", (link.to_node.index for link in network.links))
+        # The nodes of the current root path, which a spur path must avoid.
+        self.banned = bytearray(self.compact.num_nodes)
+        self.workspace = SearchWorkspace()
+
+    def _tree_path(self, i: int, banned_links: Set[int]) -> Optional[List[int]]:
+        # The cheapest path from i to the end, or None if there is none or it
+        # goes through a banned link or node. Reaching a node the search already
+        # settled ends the walk early, the rest is that node's tree path, which
+        # was blocked.
+        settled, generation = self.workspace.settled, self.workspace.generation
+        path = []
+        while i != self.end:
+            link = self.next_links[i]
+            if link == NO_EDGE:
+                return None
+            i = self.link_targets[link]
+            if self.banned[i] or settled[i] == generation or link in banned_links:
+                return None
+            path.append(link)
+        return path
+
+    def search(
+        self, start: int, banned_links: Set[int], max_cost: float = float("inf")
+    ) -> Optional[Tuple[float, List[int]]]:
+        """
+        A* from start to the end that avoids the banned nodes and banned_links,
+        and gives up on paths costing more than max_cost. With an exact
+        heuristic the first node taken off the queue whose tree path is still
+        free completes a cheapest path, so the search usually stops after a
+        handful of nodes instead of walking to the end.
+        """
+        offsets, targets = self.compact.offsets, self.compact.targets
+        edge_costs, link_indices = self.compact.costs, self.compact.link_indices
+        costs_to_end, banned = self.costs_to_end, self.banned
+        workspace = self.workspace
+        workspace.reset(self.compact.num_nodes)
+        generation = workspace.generation
+        stamps, settled, costs = workspace.stamps, workspace.settled, workspace.costs
+        # The workspace links hold the index of the link to each node.
+        links = workspace.links
+        workspace.set(start, 0, None)
+        queue = [(costs_to_end[start], 0, start)]
+        while queue:
+            estimate, _, i = heappop(queue)
+            if estimate > max_cost:
+                return None
+            if settled[i] == generation:
+                continue
+            settled[i] = generation
+            tail = self._tree_path(i, banned_links)
+            if tail is not None:
+                path = []
+                cost = costs[i] + costs_to_end[i]
+                while i != start:
+                    path.append(links[i])
+                    i = self.link_sources[links[i]]
+                path.reverse()
+                return cost, path + tail
+            for e in range(offsets[i], offsets[i + 1]):
+                j = targets[e]
+                if (
+                    banned[j]
+                    or settled[j] == generation
+                    or link_indices[e] in banned_links
+                    or costs_to_end[j] == float("inf")
+                ):
+                    continue
+                new_cost = costs[i] + edge_costs[e]
+                if new_cost < (costs[j] if stamps[j] == generation else float("inf")):
+                    workspace.set(j, new_cost, link_indices[e])
+                    heappush(queue, (new_cost + costs_to_end[j], costs_to_end[j], j))
+        return None
+
+
+def k_shortest_paths(
+    network: Network, start_node: Node, end_node: Node, k: int
+) -> List[List[Link]]:
+    """
+    Return up to k loopless paths from start_node to end_node, cheapest first.
+    Each new path is searched for only from the node where it left the path it
+    was derived from (Lawler), as the earlier spur nodes were already tried.
+    """
+    spurs = _SpurSearch(network, end_node.index)
+    if spurs.costs_to_end[start_node.index] == float("inf"):
+        return []
+    _, first = spurs.search(start_node.index, set())
+    paths: List[List[int]] = [first]
+    deviations = [0]
+    seen = {tuple(first)}
+    candidates: List[Tuple[float, int, List[int], int]] = []
+    banned = spurs.banned
+    while len(paths) < k:
+        path, deviation = paths[-1], deviations[-1]
+        # The root path up to the spur node grows one link per step, its cost
+        # and banned nodes are carried over rather than recomputed.
+        root_cost = sum(network.links[link].cost for link in path[:deviation])
+        root = [start_node.index]
+        root.extend(spurs.link_targets[link] for link in path[:deviation])
+        for node in root:
+            banned[node] = 1
+        # Once the candidates hold enough paths to finish, a spur path costing
+        # more than the one that would be taken last cannot make the cut.
+        needed = k - len(paths)
+        max_cost = float("inf")
+        if len(candidates) >= needed:
+            max_cost = nsmallest(needed, candidates)[-1][0]
+        for i in range(deviation, len(path)):
+            spur_node = spurs.link_sources[path[i]]
+            banned[spur_node] = 0
+            banned_links = {
+                other[i] for other in paths if len(other) > i and other[:i] == path[:i]
+            }
+            spur = spurs.search(spur_node, banned_links, max_cost - root_cost)
+            if spur is not None:
+                candidate = path[:i] + spur[1]
+                candidate_key = tuple(candidate)
+                if candidate_key not in seen:
+                    seen.add(candidate_key)
+                    heappush(
+                        candidates,
+                        (root_cost + spur[0], len(seen), candidate, i),
+                    )
+            banned[spur_node] = 1
+            root.append(spur_node)
+            root_cost += network.links[path[i]].cost
+        for node in root:
+            banned[node] = 0
+        if not candidates:
+            break
+        _, _, path, deviation = heappop(candidates)
+        paths.append(path)
+        deviations.append(deviation)
+    return [[network.links[link] for link in path] for path in paths]
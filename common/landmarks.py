@@ -0,0 +1,197 @@
+"""
+Landmarks for ALT (A*, landmarks and triangle inequality) queries
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+from array import array
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from common.compact_network import CompactNetwork
+from common.parallel import map_with_graph
+
+if TYPE_CHECKING:
+    from common.network import Network
+
+HEADER_SIZE = 3  # num nodes, num links, num landmarks
+FINGERPRINT_SIZE = 32  # bytes of the SHA-256 after the header
+
+
+def landmarks_filename(network_filename: str) -> str:
+    return network_filename + ".alt"
+
+
+def fingerprint(compact: CompactNetwork) -> bytes:
+    """
+    SHA-256 of the links and costs of the network, which tells whether saved
+    landmarks were computed for it
+    """
+    digest = hashlib.sha256()
+    for values, typecode in (
+        (compact.offsets, "q"),
+        (compact.targets, "i"),
+        (compact.costs, "d"),
+    ):
+        digest.update(array(typecode, values))
+    return digest.digest()
+
+
+def _tree_costs(compact: CompactNetwork, source: int) -> array:
+    costs, _ = compact.shortest_path_tree(source)
+    return costs
+
+
+def _farthest(costs: array, excluded: List[int]) -> Optional[int]:
+    candidate, farthest = None, -1.0
+    for node, cost in enumerate(costs):
+        if farthest < cost < float("inf") and node not in excluded:
+            candidate, farthest = node, cost
+    return candidate
+
+
+def _select_farthest(compact: CompactNetwork, k: int) -> Tuple[List[int], List[array]]:
+    # Start with the node farthest from node 0, then keep adding the node whose
+    # distance to its closest landmark is the largest. The distances from every
+    # landmark are returned with the landmarks, they are needed anyway.
+    nodes: List[int] = []
+    from_costs: List[array] = []
+    if compact.num_nodes == 0:
+        return nodes, from_costs
+    closest = None
+    candidate = _farthest(_tree_costs(compact, 0), nodes)
+    while candidate is not None and len(nodes) < k:
+        nodes.append(candidate)
+        costs = _tree_costs(compact, candidate)
+        from_costs.append(costs)
+        closest = costs if closest is None else array("d", map(min, closest, costs))
+        candidate = _farthest(closest, nodes)
+    return nodes, from_costs
+
+
+class Landmarks:
+    """
+    Distances from (from_costs) and to (to_costs) a few landmark nodes. By the
+    triangle inequality they give a lower bound for the cost between any two
+    nodes, a much tighter heuristic for A* than the straight line distance.
+    """
+
+    DEFAULT_COUNT: int = 8
+
+    def __init__(
+        self,
+        num_links: int,
+        nodes: List[int],
+        from_costs: List[array],
+        to_costs: List[array],
+        network_fingerprint: bytes,
+    ):
+        self.num_links = num_links
+        self.nodes = nodes
+        self.from_costs = from_costs
+        self.to_costs = to_costs
+        self.network_fingerprint = network_fingerprint
+
+    @classmethod
+    def build(
+        cls,
+        compact: CompactNetwork,
+        k: int = DEFAULT_COUNT,
+        workers: Optional[int] = 1,
+        nodes: Optional[List[int]] = None,
+        reverse: Optional[CompactNetwork] = None,
+    ) -> Landmarks:
+        """
+        Pick k landmarks with the farthest point heuristic, unless nodes are
+        given, and compute their distance arrays over a pool of workers.
+        reverse is compact.reverse(), when it is already at hand.
+        """
+        # The selection computes the distances from the landmarks as it goes,
+        # only those to them are left for the pool.
+        if nodes is None:
+            nodes, from_costs = _select_farthest(compact, k)
+        else:
+            from_costs = map_with_graph(_tree_costs, compact, nodes, workers)
+        if reverse is None:
+            reverse = compact.reverse()
+        to_costs = map_with_graph(_tree_costs, reverse, nodes, workers)
+        return cls(compact.num_links, nodes, from_costs, to_costs, fingerprint(compact))
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.from_costs[0]) if self.from_costs else 0
+
+    def lower_bound(self, node: int, target: int) -> float:
+        bound = 0.0
+        inf = float("inf")
+        for from_costs, to_costs in zip(self.from_costs, self.to_costs):
+            # d(node, target) >= d(landmark, target) - d(landmark, node)
+            if from_costs[node] < inf and from_costs[target] < inf:
+                bound = max(bound, from_costs[target] - from_costs[node])
+            # d(node, target) >= d(node, landmark) - d(target, landmark)
+            if to_costs[node] < inf and to_costs[target] < inf:
+                bound = max(bound, to_costs[node] - to_costs[target])
+        return bound
+
+    def save(self, filename: str):
+        with open(filename, "wb") as writer:
+            array("q", [self.num_nodes, self.num_links, len(self.nodes)]).tofile(writer)
+            writer.write(self.network_fingerprint)
+            array("q", self.nodes).tofile(writer)
+            for costs in self.from_costs + self.to_costs:
+                costs.tofile(writer)
+
+    @classmethod
+    def load(cls, filename: str) -> Landmarks:
+        with open(filename, "rb") as reader:
+            header = array("q")
+            header.fromfile(reader, HEADER_SIZE)
+            num_nodes, num_links, k = header
+            network_fingerprint = reader.read(FINGERPRINT_SIZE)
+            nodes = array("q")
+            nodes.fromfile(reader, k)
+            costs = []
+            for _ in range(2 * k):
+                costs.append(array("d"))
+                costs[-1].fromfile(reader, num_nodes)
+        return cls(num_links, list(nodes), costs[:k], costs[k:], network_fingerprint)
+
+
+def load_landmarks_for(network: Network, filename: str) -> Optional[Landmarks]:
+    """
+    Load the landmarks saved next to the network file, if there are any and
+    they were computed for the same links and costs
+    """
+    landmarks_file = landmarks_filename(filename)
+    if not os.path.exists(landmarks_file):
+        return None
+    try:
+        landmarks = Landmarks.load(landmarks_file)
+    except (EOFError, ValueError):
+        # Truncated, or saved before the files had a fingerprint.
+        return None
+    if (landmarks.num_nodes, landmarks.num_links) != (
+        len(network.nodes),
+        len(network.links),
+    ) or landmarks.network_fingerprint != fingerprint(network.to_csr()):
+        return None
+    return landmarks
+
+
+def _main():
+    # Avoid a circular import, the serializer depends on the network module.
+    from common.serializer import load_from_file
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("-k", type=int, default=Landmarks.DEFAULT_COUNT)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    network = load_from_file(args.filename)
+    landmarks = Landmarks.build(network.to_csr(), args.k, args.workers)
+    landmarks.save(landmarks_filename(args.filename))
+
+
+if __name__ == "__main__":
+    _main()
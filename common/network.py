@@ -1,11 +1,27 @@
 from __future__ import annotations
 
 import math
-from heapq import heappop, heappush
+from array import array
+from collections import deque
+from functools import partial
+from heapq import heapify, heappop, heappush
 from tkinter import Canvas
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 
-from common.point import Point
+from common import spanning_tree
+from common.compact_network import CompactNetwork
+from common.contraction import ContractionHierarchy, ManyToManyResult
+from common.k_shortest_paths import k_shortest_paths
+from common.landmarks import Landmarks
+from common.point import Point, distance, squared_distance
+from common.spatial_index import GridIndex
+from common.workspace import SearchWorkspace
+
+
+class NegativeCycleException(Exception):
+    """
+    Exception for networks whose shortest paths are undefined
+    """
 
 
 class Node:
@@ -17,6 +33,7 @@ class Node:
         self.pos: Point = pos
         self.text: str = text
         self.links: List[Link] = []
+        self.in_links: List[Link] = []
         self.is_start_node: bool = False
         self.is_end_node: bool = False
         self.radius: int = radius
@@ -27,15 +44,20 @@ class Node:
     def add_link(self, link: Link):
         self.links.append(link)
 
-    def draw(self, canvas: Canvas, draw_label: bool):
-        color = "white"
+    def add_in_link(self, link: Link):
+        self.in_links.append(link)
+
+    def color(self) -> str:
         if self.is_start_node:
-            color = "pink"
-        elif self.is_end_node:
-            color = "lightblue1"
+            return "pink"
+        if self.is_end_node:
+            return "lightblue1"
+        return "white"
+
+    def draw(self, canvas: Canvas, draw_label: bool):
         _x, _y = self.pos.x, self.pos.y
         _r = self.radius
-        canvas.create_oval(_x - _r, _y - _r, _x + _r, _y + _r, fill=color)
+        canvas.create_oval(_x - _r, _y - _r, _x + _r, _y + _r, fill=self.color())
         if draw_label:
             canvas.create_text(_x, _y, text=self.text)
 
@@ -48,6 +70,7 @@ class Link:
         self.is_in_path = False
         self.is_in_tree = False
         from_node.add_link(self)
+        to_node.add_in_link(self)
 
     def __lt__(self, other: Link) -> bool:
         return self.cost < other.cost
@@ -65,17 +88,18 @@ class Link:
             or self.is_in_tree
         )
 
+    def style(self) -> Tuple[int, str]:
+        # Line width and color
+        if self.is_in_path:
+            return 5, "red"
+        if self.is_in_tree:
+            return 5, "green"
+        return 1, "black"
+
     def draw(self, canvas: Canvas):
         if not self.is_visible():
             return
-        witdh = 1
-        color = "black"
-        if self.is_in_tree:
-            witdh = 5
-            color = "green"
-        if self.is_in_path:
-            witdh = 5
-            color = "red"
+        witdh, color = self.style()
         _x0, _y0 = self.from_node.pos.x, self.from_node.pos.y
         _x1, _y1 = self.to_node.pos.x, self.to_node.pos.y
         canvas.create_line(_x0, _y0, _x1, _y1, width=witdh, fill=color)
@@ -102,126 +126,649 @@ class WorkflowLink(Link):
 
 class Network:
     BIG: int = 100
+    LINK_CELL_SIZE: int = 64  # a few nodes wide, so long links fill few cells
     LABEL_CORRECTING: int = 0
     LABEL_SETTING: int = 1
+    DIJKSTRA: int = 2
+    COMPACT_DIJKSTRA: int = 3
+    BIDIRECTIONAL: int = 4
+    A_STAR: int = 5
+    ALT: int = 6
+    CONTRACTION_HIERARCHIES: int = 7
 
     def __init__(self):
         self.nodes: List[Node] = []
         self.links: List[Link] = []
         self.start_node = None
         self.end_node = None
+        self.num_settled: Optional[int] = None  # by the last search, if it counts
+        self.landmarks: Optional[Landmarks] = None
+        self.contraction_hierarchy: Optional[ContractionHierarchy] = None
+        # Complete shortest path tree from the start node, kept by the searches
+        # that build one so that update_link_cost can repair it.
+        self.tree_costs: Optional[List[float]] = None
+        self.tree_links: Optional[List[Optional[Link]]] = None
+        # Forward search, backward search and path, reused by every query.
+        self._workspaces = (SearchWorkspace(), SearchWorkspace(), SearchWorkspace())
+        # Links with is_in_tree or is_in_path set, so they can be cleared quickly.
+        # A dict used as an ordered set, a link is only kept once.
+        self._marked_links: Dict[Link, None] = {}
+        # The algorithm of the last check_for_path, run again by update_link_cost
+        # when there is no complete tree to repair.
+        self._last_algorithm: Optional[int] = None
+        self._compact: Optional[CompactNetwork] = None
+        self._reverse: Optional[CompactNetwork] = None
+        self._sorted_links: Optional[Sequence[int]] = None
+        self._cost_per_length: Optional[float] = None
+        self._node_index: Optional[GridIndex[Node]] = None
+        self._link_index: Optional[GridIndex[Link]] = None
 
     def add_node(self, pos: Point, text: str, radius: int = Node.LARGE_RADIUS) -> Node:
         index = len(self.nodes)
         node = Node(index, pos, text, radius)
         self.nodes.append(node)
+        self._clear_spatial_indexes()
+        self._clear_indexes()
         return node
 
     def add_link(self, from_node: Node, to_node: Node, cost: int) -> Link:
         link = Link(from_node, to_node, cost)
         self.links.append(link)
+        self._clear_spatial_indexes()
+        self._clear_indexes()
         return link
 
     def add_workflow_link(self, from_node: Node, to_node: Node, cost: int) -> Link:
         link = WorkflowLink(from_node, to_node, cost)
         self.links.append(link)
+        self._clear_spatial_indexes()
+        self._clear_indexes()
         return link
 
+    def _clear_spatial_indexes(self):
+        # Drop the structures derived from the positions of nodes and links.
+        self._node_index = None
+        self._link_index = None
+
+    def _clear_indexes(self):
+        # Drop the structures derived from the nodes, links and costs.
+        self._compact = None
+        self._reverse = None
+        self._sorted_links = None
+        self._cost_per_length = None
+        self.landmarks = None
+        self.contraction_hierarchy = None
+
+    def to_csr(self) -> CompactNetwork:
+        if self._compact is None:
+            self._compact = CompactNetwork.from_network(self)
+        return self._compact
+
+    def reverse_csr(self) -> CompactNetwork:
+        # The transposed CSR view, to search backward from a node.
+        if self._reverse is None:
+            self._reverse = self.to_csr().reverse()
+        return self._reverse
+
+    def use_indexes(
+        self,
+        compact: CompactNetwork,
+        reverse: CompactNetwork,
+        sorted_links: Sequence[int],
+    ):
+        """
+        Use indexes built elsewhere, such as the ones kept by a NetworkCache,
+        instead of building them again. They must match the current links.
+        """
+        self._compact = compact
+        self._reverse = reverse
+        self._sorted_links = sorted_links
+
+    def node_index(self) -> GridIndex[Node]:
+        """
+        Return the grid index of the node circles, building it if needed
+        """
+        if self._node_index is None:
+            radius = max((node.radius for node in self.nodes), default=1)
+            self._node_index = GridIndex(2 * radius)
+            for node in self.nodes:
+                x, y, r = node.pos.x, node.pos.y, node.radius
+                self._node_index.insert(node, x - r, y - r, x + r, y + r)
+        return self._node_index
+
+    def link_index(self) -> GridIndex[Link]:
+        """
+        Return the grid index of the link bounding boxes, building it if needed
+        """
+        if self._link_index is None:
+            self._link_index = GridIndex(Network.LINK_CELL_SIZE)
+            for link in self.links:
+                p, q = link.from_node.pos, link.to_node.pos
+                self._link_index.insert(link, p.x, p.y, q.x, q.y)
+        return self._link_index
+
+    def node_at(self, point: Point) -> Optional[Node]:
+        """
+        Return the first node drawn over point, if there is one
+        """
+        hits = [
+            node
+            for node in self.node_index().at(point.x, point.y)
+            if squared_distance(node.pos, point) <= node.radius**2
+        ]
+        return min(hits, key=lambda node: node.index, default=None)
+
+    def nodes_inside(self, x0: float, y0: float, x1: float, y1: float) -> Set[Node]:
+        return self.node_index().inside(x0, y0, x1, y1)
+
+    def links_inside(self, x0: float, y0: float, x1: float, y1: float) -> Set[Link]:
+        return self.link_index().inside(x0, y0, x1, y1)
+
+    @property
+    def marked_links(self) -> List[Link]:
+        """
+        Links with is_in_tree or is_in_path set by the last search
+        """
+        return list(self._marked_links)
+
     def select_start_node(self, node: Node) -> Node:
         node.is_start_node = True
         if self.start_node:
             self.start_node.is_start_node = False
         self.start_node = node
-        for link in self.links:
-            link.is_in_path = False
-            link.is_in_tree = False
+        self._forget_query()
 
     def select_end_node(self, node: Node) -> Node:
         node.is_end_node = True
         if self.end_node:
             self.end_node.is_end_node = False
         self.end_node = node
-        for link in self.links:
+        self._forget_query()
+
+    def _clear_marks(self):
+        for link in self._marked_links:
             link.is_in_path = False
             link.is_in_tree = False
+        self._marked_links = {}
+
+    def _forget_query(self):
+        # Drop the marks, the kept tree and the query they came from.
+        self.tree_costs = self.tree_links = None
+        self._last_algorithm = None
+        self._clear_marks()
 
     def check_for_path(self, algorithm_idx: int):
         if self.start_node is None:
             return
-        links_in_tree = [
-            self.find_path_tree_label_correcting,
-            self.find_path_tree_label_setting,
-        ][algorithm_idx]()
+        links_in_tree = self._search(algorithm_idx)
         if self.end_node:
             self.find_path(links_in_tree)
 
-    def find_path_tree_label_correcting(self):
-        processed: List[Node] = []
-        links: List[Optional[Link]] = [None] * len(self.nodes)
-        costs: List[float] = [float("inf")] * len(self.nodes)
+    def _search(self, algorithm_idx: int) -> Sequence[Optional[Link]]:
+        self.num_settled = None
+        self.tree_costs = self.tree_links = None
+        self._clear_marks()
+        self._last_algorithm = algorithm_idx
+        return [
+            self.find_path_tree_label_correcting,
+            self.find_path_tree_label_setting,
+            partial(self.find_path_tree_dijkstra, self.end_node),
+            self.find_path_tree_compact,
+            partial(self.find_path_bidirectional, self.end_node),
+            partial(self.find_path_a_star, self.end_node),
+            partial(self.find_path_alt, self.end_node),
+            partial(self.find_path_contraction_hierarchies, self.end_node),
+        ][algorithm_idx]()
 
-        node = self.start_node
-        costs[node.index] = 0
-        while node is not None:
-            cost = costs[node.index]
-            for link in node.links:
+    def find_path_tree_label_correcting(self) -> List[Optional[Link]]:
+        # FIFO candidate list with the Small-Label-First (a node whose label is
+        # lower than the one at the front jumps the queue) and Large-Label-Last
+        # (nodes above the average label are moved to the back) heuristics.
+        # Links may have negative costs, the labels are final only at the end.
+        # The settled flags of the forward workspace mark the queued nodes and
+        # its counts the links in the path to each node.
+        num_nodes = len(self.nodes)
+        workspace = self._workspaces[0]
+        workspace.reset(num_nodes)
+        generation = workspace.generation
+        stamps, in_queue = workspace.stamps, workspace.settled
+        costs, num_links = workspace.costs, workspace.counts
+
+        start = self.start_node.index
+        workspace.set(start, 0, None)
+        num_links[start] = 0
+        queue = deque([start])
+        in_queue[start] = generation
+        total = 0  # sum of the labels of the nodes in the queue
+        while queue:
+            average = total / len(queue)
+            for _ in range(len(queue) - 1):
+                if costs[queue[0]] <= average:
+                    break
+                queue.rotate(-1)
+            i = queue.popleft()
+            in_queue[i] = 0
+            cost = costs[i]
+            total -= cost
+            for link in self.nodes[i].links:
+                j = link.to_node.index
                 new_cost = cost + link.cost
-                i = link.to_node.index
-                if new_cost < costs[i]:
-                    link.is_in_tree = True
-                    if prev_link := links[i]:
-                        prev_link.is_in_tree = False
-                    links[i] = link
-                    costs[i] = new_cost
-            processed.append(node)
-            node = self.find_lowest_cost_node(costs, processed)
-
-        return links
+                if stamps[j] != generation or new_cost < costs[j]:
+                    num_links[j] = num_links[i] + 1
+                    if num_links[j] >= num_nodes:
+                        raise NegativeCycleException(
+                            f"Negative cycle reachable from {self.start_node}"
+                        )
+                    if in_queue[j] == generation:
+                        total += new_cost - costs[j]
+                    workspace.set(j, new_cost, link)
+                    if in_queue[j] != generation:
+                        in_queue[j] = generation
+                        total += new_cost
+                        if queue and new_cost < costs[queue[0]]:
+                            queue.appendleft(j)
+                        else:
+                            queue.append(j)
+
+        self.tree_costs, self.tree_links = workspace.to_lists()
+        for link in self.tree_links:
+            if link:
+                link.is_in_tree = True
+                self._marked_links[link] = None
+        return self.tree_links
 
     def find_path_tree_label_setting(self) -> List[Optional[Link]]:
+        # The queue holds links ordered by the cost of reaching their end through
+        # them. Ordering by link cost alone would build a Prim spanning tree, see
+        # find_minimum_spanning_tree_prim for that.
         queue = []  # priority queue
-        links: List[Optional[Link]] = [None] * len(self.nodes)
-        visited: bool = [False] * len(self.nodes)
+        workspace = self._workspaces[0]
+        workspace.reset(len(self.nodes))
+        generation, visited = workspace.generation, workspace.settled
 
-        def visit(node: Node):
-            visited[node.index] = True
-            for link in node.links:
-                if not visited[link.to_node.index]:
-                    heappush(queue, link)
+        def visit(node: Node, cost: float, link: Optional[Link]):
+            visited[node.index] = generation
+            workspace.set(node.index, cost, link)
+            for out_link in node.links:
+                if visited[out_link.to_node.index] != generation:
+                    heappush(queue, (cost + out_link.cost, out_link))
 
-        visit(self.start_node)
+        visit(self.start_node, 0, None)
 
         while queue:
-            link = heappop(queue)
+            cost, link = heappop(queue)
             node = link.to_node
-            if visited[node.index]:
+            if visited[node.index] == generation:
                 continue
             link.is_in_tree = True
-            links[node.index] = link
-            visit(node)
+            self._marked_links[link] = None
+            visit(node, cost, link)
+
+        self.tree_costs, self.tree_links = workspace.to_lists()
+        return self.tree_links
+
+    def find_minimum_spanning_tree_kruskal(self) -> List[Link]:
+        """
+        Minimum spanning forest of the network taken as undirected, built by
+        adding the links in cost order unless they would close a cycle
+        """
+        tree = spanning_tree.kruskal(self.nodes, self.links, self.sorted_links())
+        self._mark_tree(tree)
+        return tree
+
+    def find_minimum_spanning_tree_prim(self) -> List[Link]:
+        """
+        Minimum spanning forest of the network taken as undirected, grown from
+        the start node (or the first node) one cheapest link at a time
+        """
+        start = self.start_node.index if self.start_node else 0
+        tree = spanning_tree.prim(self.nodes, start)
+        self._mark_tree(tree)
+        return tree
+
+    def sorted_links(self) -> Sequence[int]:
+        # Link indices by cost, kept until the links or their costs change.
+        if self._sorted_links is None:
+            costs = [link.cost for link in self.links]
+            self._sorted_links = array(
+                "i", sorted(range(len(costs)), key=costs.__getitem__)
+            )
+        return self._sorted_links
+
+    def _mark_tree(self, links: List[Link]):
+        # The spanning tree replaces the marks and the kept tree of any search.
+        self._forget_query()
+        for link in links:
+            link.is_in_tree = True
+        self._marked_links.update(dict.fromkeys(links))
+
+    def find_path_tree_dijkstra(
+        self, end_node: Optional[Node] = None
+    ) -> Sequence[Optional[Link]]:
+        # When end_node is given the search stops as soon as it is settled, so
+        # only the part of the tree explored so far is marked.
+        return self._best_first_search(end_node)
+
+    def cost_per_length(self) -> float:
+        """
+        Return the lowest ratio of link cost to link length, so that the straight
+        line distance times it never overestimates the cost of a path. It is 0
+        when a cost is negative.
+        """
+        if self._cost_per_length is None:
+            ratios = [
+                link.cost / length
+                for link in self.links
+                if (length := distance(link.from_node.pos, link.to_node.pos)) > 0
+            ]
+            self._cost_per_length = max(0.0, min(ratios, default=0.0))
+        return self._cost_per_length
+
+    def find_path_a_star(
+        self, end_node: Optional[Node] = None, weight: float = 1.0
+    ) -> Sequence[Optional[Link]]:
+        # The straight line distance to the end node times cost_per_length never
+        # overestimates the cost of a path, even when rounding made some links
+        # cheaper than they are long. A weight above 1 settles fewer nodes but
+        # the path may not be optimal.
+        if end_node is None:
+            return self._best_first_search(None)
+        target = end_node.pos
+        scale = weight * self.cost_per_length()
+        return self._best_first_search(
+            end_node, lambda node: scale * distance(node.pos, target)
+        )
 
+    def find_path_alt(
+        self, end_node: Optional[Node] = None
+    ) -> Sequence[Optional[Link]]:
+        # A* with the landmark lower bounds, the landmarks are computed on first
+        # use unless they were loaded with the network.
+        if end_node is None:
+            return self._best_first_search(None)
+        if self.landmarks is None:
+            self.landmarks = Landmarks.build(self.to_csr(), reverse=self.reverse_csr())
+        landmarks, target = self.landmarks, end_node.index
+        return self._best_first_search(
+            end_node, lambda node: landmarks.lower_bound(node.index, target)
+        )
+
+    def build_contraction_hierarchy(self) -> ContractionHierarchy:
+        # Building takes long on big networks, so it is never done behind a
+        # query. Changing the network or a link cost drops the hierarchy until
+        # it is built again.
+        self.contraction_hierarchy = ContractionHierarchy.build(self.to_csr())
+        return self.contraction_hierarchy
+
+    def find_path_contraction_hierarchies(
+        self, end_node: Optional[Node] = None
+    ) -> Sequence[Optional[Link]]:
+        # Until build_contraction_hierarchy is called this is bidirectional
+        # Dijkstra, which finds the same paths. Only the links of the path are
+        # returned, indexed by the node they lead to.
+        if end_node is None:
+            return self._best_first_search(None)
+        if self.contraction_hierarchy is None:
+            return self.find_path_bidirectional(end_node)
+        links = self._workspaces[2]
+        links.reset(len(self.nodes))
+        path = self.contraction_hierarchy.query(self.start_node.index, end_node.index)
+        self.num_settled = self.contraction_hierarchy.num_settled
+        for i in path or []:
+            links.set(self.links[i].to_node.index, 0, self.links[i])
         return links
 
-    def find_lowest_cost_node(
-        self, costs: List[float], processed: List[Node]
-    ) -> Optional[Node]:
-        lowest_cost = float("inf")
-        lowest_cost_node = None
-        for i, cost in enumerate(costs):
+    def find_k_shortest_paths(self, k: int) -> List[List[Link]]:
+        # Up to k loopless paths from the start node to the end node, cheapest
+        # first.
+        if self.start_node is None or self.end_node is None:
+            return []
+        return k_shortest_paths(self, self.start_node, self.end_node, k)
+
+    def many_to_many(
+        self, sources: List[Node], targets: List[Node]
+    ) -> ManyToManyResult:
+        # Costs between every source and target through the contraction
+        # hierarchy. Like every preprocessing it is never built behind a query,
+        # without it distance_matrix gives the costs with one Dijkstra per source.
+        if self.contraction_hierarchy is None:
+            raise RuntimeError("Call build_contraction_hierarchy before many_to_many")
+        return self.contraction_hierarchy.many_to_many(
+            [node.index for node in sources], [node.index for node in targets]
+        )
+
+    def _best_first_search(
+        self,
+        end_node: Optional[Node],
+        heuristic: Optional[Callable[[Node], float]] = None,
+    ) -> Sequence[Optional[Link]]:
+        # Binary heap with lazy deletion: a node may be pushed several times, only
+        # the entry with its lowest cost is expanded, the stale ones are skipped.
+        # The heap is ordered by cost plus heuristic, Dijkstra when there is none.
+        # A start/end query returns the forward workspace, valid until the next
+        # search; a complete tree is copied into lists and kept.
+        workspace = self._workspaces[0]
+        workspace.reset(len(self.nodes))
+        generation = workspace.generation
+        stamps, settled = workspace.stamps, workspace.settled
+        costs, links = workspace.costs, workspace.links
+        marked_links = self._marked_links
+        start = self.start_node.index
+        workspace.set(start, 0, None)
+        queue = [(0, start)]
+
+        self.num_settled = 0
+        while queue:
+            _, i = heappop(queue)
+            if settled[i] == generation:
+                continue
+            settled[i] = generation
+            self.num_settled += 1
+            if link := links[i]:
+                link.is_in_tree = True
+                marked_links[link] = None
+            if end_node is not None and i == end_node.index:
+                break
+            cost = costs[i]
+            for link in self.nodes[i].links:
+                j = link.to_node.index
+                new_cost = cost + link.cost
+                if stamps[j] != generation:
+                    stamps[j] = generation
+                elif new_cost >= costs[j] or settled[j] == generation:
+                    continue
+                costs[j] = new_cost
+                links[j] = link
+                if heuristic is not None:
+                    new_cost += heuristic(link.to_node)
+                heappush(queue, (new_cost, j))
+
+        if end_node is None:
+            self.tree_costs, self.tree_links = workspace.to_lists()
+            return self.tree_links
+        return workspace
+
+    def find_path_bidirectional(
+        self, end_node: Optional[Node] = None
+    ) -> Sequence[Optional[Link]]:
+        # Dijkstra forward from the start node over Node.links and backward from
+        # the end node over Node.in_links, always expanding the side with the
+        # lowest queued cost. Once the two lowest queued costs add up to the best
+        # connection found no shorter one can exist. Only the links of the path
+        # are returned, indexed by the node they lead to.
+        if end_node is None:
+            return self.find_path_tree_dijkstra()
+        num_nodes = len(self.nodes)
+        # Index 0 holds the forward search, index 1 the backward one.
+        for workspace in self._workspaces:
+            workspace.reset(num_nodes)
+        forward, backward, path = self._workspaces
+        generation = forward.generation, backward.generation
+        stamps = forward.stamps, backward.stamps
+        settled = forward.settled, backward.settled
+        costs = forward.costs, backward.costs
+        trees = forward.links, backward.links
+        marked_links = self._marked_links
+        forward.set(self.start_node.index, 0, None)
+        backward.set(end_node.index, 0, None)
+        queues = [[(0, self.start_node.index)], [(0, end_node.index)]]
+        best_cost = 0 if self.start_node is end_node else float("inf")
+        meeting_node = self.start_node.index
+
+        self.num_settled = 0
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best_cost:
+                break
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            cost, i = heappop(queues[side])
+            if settled[side][i] == generation[side]:
+                continue
+            settled[side][i] = generation[side]
+            self.num_settled += 1
+            if link := trees[side][i]:
+                link.is_in_tree = True
+                marked_links[link] = None
             node = self.nodes[i]
-            if cost < lowest_cost and node not in processed:
-                lowest_cost = cost
-                lowest_cost_node = node
-        return lowest_cost_node
+            other = 1 - side
+            for link in node.links if side == 0 else node.in_links:
+                j = (link.to_node if side == 0 else link.from_node).index
+                new_cost = cost + link.cost
+                if stamps[side][j] != generation[side]:
+                    stamps[side][j] = generation[side]
+                elif new_cost >= costs[side][j]:
+                    continue
+                costs[side][j] = new_cost
+                trees[side][j] = link
+                heappush(queues[side], (new_cost, j))
+                if stamps[other][j] == generation[other]:
+                    if new_cost + costs[other][j] < best_cost:
+                        best_cost = new_cost + costs[other][j]
+                        meeting_node = j
+
+        if best_cost == float("inf"):
+            return path
+        link = forward[meeting_node]
+        while link is not None:
+            path.set(link.to_node.index, 0, link)
+            link = forward[link.from_node.index]
+        link = backward[meeting_node]
+        while link is not None:
+            path.set(link.to_node.index, 0, link)
+            link = backward[link.to_node.index]
+        return path
+
+    def find_path_tree_compact(self) -> List[Optional[Link]]:
+        compact = self.to_csr()
+        _, edges = compact.shortest_path_tree(self.start_node.index)
+        links = compact.to_links(self, edges)
+        for link in links:
+            if link:
+                link.is_in_tree = True
+                self._marked_links[link] = None
+        return links
+
+    def update_link_cost(self, link: Link, new_cost: int):
+        """
+        Change the cost of a link and repair the shortest path tree kept from the
+        last complete search, only revisiting the nodes whose cost can change
+        (Ramalingam-Reps). Costs must not be negative. Without a complete tree
+        the marks are cleared and the last check_for_path query is run again.
+        Landmarks are kept when the cost grows and dropped when it shrinks.
+        """
+        old_cost = link.cost
+        link.cost = new_cost
+        landmarks = self.landmarks
+        self._clear_indexes()
+        if new_cost >= old_cost:
+            # Lower bounds computed with a lower cost still hold.
+            self.landmarks = landmarks
+        if new_cost == old_cost:
+            return
+        if self.tree_links is None:
+            algorithm_idx = self._last_algorithm
+            self._clear_marks()
+            if algorithm_idx is not None:
+                # Building landmarks takes long, so the edit runs A* instead of
+                # ALT without them. It finds the same paths.
+                if algorithm_idx == Network.ALT and self.landmarks is None:
+                    links_in_tree = self._search(Network.A_STAR)
+                    self._last_algorithm = algorithm_idx
+                else:
+                    links_in_tree = self._search(algorithm_idx)
+                if self.end_node:
+                    self._mark_path(links_in_tree)
+            return
+        costs, links = self.tree_costs, self.tree_links
+        u, v = link.from_node.index, link.to_node.index
+        if self.end_node:
+            path_link = links[self.end_node.index]
+            while path_link is not None:
+                path_link.is_in_path = False
+                path_link = links[path_link.from_node.index]
+
+        def set_tree_link(i: int, new_link: Optional[Link]):
+            if links[i]:
+                links[i].is_in_tree = False
+            if new_link:
+                new_link.is_in_tree = True
+                self._marked_links[new_link] = None
+            links[i] = new_link
+
+        queue = []
+        if new_cost < old_cost:
+            if costs[u] + new_cost < costs[v]:
+                costs[v] = costs[u] + new_cost
+                set_tree_link(v, link)
+                queue.append((costs[v], v))
+        elif links[v] is link:
+            # Every node below v in the tree may now be reached more cheaply from
+            # outside the subtree, its nodes start over from their other links.
+            subtree, stack = {v}, [v]
+            while stack:
+                for out_link in self.nodes[stack.pop()].links:
+                    j = out_link.to_node.index
+                    if links[j] is out_link and j not in subtree:
+                        subtree.add(j)
+                        stack.append(j)
+            for i in subtree:
+                costs[i] = float("inf")
+                set_tree_link(i, None)
+            for i in subtree:
+                for in_link in self.nodes[i].in_links:
+                    j = in_link.from_node.index
+                    if j not in subtree and costs[j] + in_link.cost < costs[i]:
+                        costs[i] = costs[j] + in_link.cost
+                        set_tree_link(i, in_link)
+                if costs[i] < float("inf"):
+                    queue.append((costs[i], i))
+            heapify(queue)
+
+        while queue:
+            cost, i = heappop(queue)
+            if cost > costs[i]:
+                continue
+            for out_link in self.nodes[i].links:
+                j = out_link.to_node.index
+                if cost + out_link.cost < costs[j]:
+                    costs[j] = cost + out_link.cost
+                    set_tree_link(j, out_link)
+                    heappush(queue, (costs[j], j))
+
+        if self.end_node:
+            self._mark_path(links)
+
+    def find_path(self, links_in_tree: Sequence[Optional[Link]]):
+        print(f"cost={self._mark_path(links_in_tree)}")
 
-    def find_path(self, links_in_tree: List[Optional[Link]]):
+    def _mark_path(self, links_in_tree: Sequence[Optional[Link]]) -> float:
         cost = 0
         link = links_in_tree[self.end_node.index]
         while link is not None:
             cost += link.cost
             link.is_in_path = True
+            self._marked_links[link] = None
             link = links_in_tree[link.from_node.index]
-        print(f"cost={cost}")
+        return cost
 
     def draw(self, canvas: Canvas):
         draw_labels = len(self.nodes) < Network.BIG
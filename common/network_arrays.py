@@ -0,0 +1,113 @@
+"""
+Networks held as NumPy arrays, for generators that build millions of nodes
+and links at once
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy
+
+import common.serializer as serializer
+from common.compact_network import CompactNetwork
+from common.network import Network, Node
+from common.point import Point
+
+
+class NetworkArrays(NamedTuple):
+    """
+    Node k is at (xs[k], ys[k]) with text str(k), and link k goes from node
+    from_indices[k] to node to_indices[k] with cost costs[k]
+    """
+
+    xs: numpy.ndarray
+    ys: numpy.ndarray
+    from_indices: numpy.ndarray
+    to_indices: numpy.ndarray
+    costs: numpy.ndarray
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.xs)
+
+    @property
+    def num_links(self) -> int:
+        return len(self.from_indices)
+
+    def to_csr(self) -> CompactNetwork:
+        return CompactNetwork.from_arrays(
+            self.num_nodes, self.from_indices, self.to_indices, self.costs
+        )
+
+    def to_network(self, workflow: bool = False) -> Network:
+        network = Network()
+        num_nodes = self.num_nodes
+        radius = Node.LARGE_RADIUS if num_nodes < Network.BIG else Node.SMALL_RADIUS
+        for i, (pos_x, pos_y) in enumerate(zip(self.xs.tolist(), self.ys.tolist())):
+            network.add_node(Point(pos_x, pos_y), str(i), radius)
+        nodes = network.nodes
+        add_link_fn = network.add_workflow_link if workflow else network.add_link
+        for from_index, to_index, cost in zip(
+            self.from_indices.tolist(), self.to_indices.tolist(), self.costs.tolist()
+        ):
+            add_link_fn(nodes[from_index], nodes[to_index], cost)
+        return network
+
+    def save_into_file(self, filename: str, compression: Optional[str] = None):
+        serializer.save_arrays_into_file(
+            filename,
+            self.xs,
+            self.ys,
+            self.from_indices,
+            self.to_indices,
+            self.costs,
+            compression,
+        )
+
+
+def grid_spacing(
+    width: int, height: int, num_rows: int, num_cols: int
+) -> Tuple[int, float, float]:
+    """
+    Return the node radius of a grid-shaped network and the distances between
+    its columns and between its rows, for the grid builders
+    """
+    num_nodes = num_rows * num_cols
+    radius = Node.LARGE_RADIUS if num_nodes < Network.BIG else Node.SMALL_RADIUS
+    dist_x = (width - 4 * radius) / (num_cols - 1) if num_cols > 1 else 0
+    dist_y = (height - 4 * radius) / (num_rows - 1) if num_rows > 1 else 0
+    return radius, dist_x, dist_y
+
+
+def grid_positions(
+    width: int, height: int, num_rows: int, num_cols: int
+) -> Tuple[numpy.ndarray, numpy.ndarray, float, float]:
+    """
+    Return the x and y of the nodes of a grid, row by row, arranged like the
+    grid builders do, and the distances between columns and between rows
+    """
+    radius, dist_x, dist_y = grid_spacing(width, height, num_rows, num_cols)
+    xs = 2 * radius + dist_x * numpy.arange(num_cols, dtype=numpy.float64)
+    ys = 2 * radius + dist_y * numpy.arange(num_rows, dtype=numpy.float64)
+    return numpy.tile(xs, num_rows), numpy.repeat(ys, num_cols), dist_x, dist_y
+
+
+def grid_links(
+    num_rows: int, num_cols: int, steps: Sequence[Tuple[int, int]]
+) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Return the start and end nodes of the links of a grid to the neighbours
+    (col + d_col, row + d_row) of every node for each (d_col, d_row) in steps,
+    ordered by start node and then by step, and the step of every link
+    """
+    nodes = numpy.arange(num_rows * num_cols).reshape(num_rows, num_cols)
+    to_nodes = numpy.full((num_rows, num_cols, len(steps)), -1, dtype=numpy.int64)
+    for k, (d_col, d_row) in enumerate(steps):
+        # The nodes whose neighbour is inside the grid form a rectangle.
+        rows = slice(max(-d_row, 0), num_rows - max(d_row, 0))
+        cols = slice(max(-d_col, 0), num_cols - max(d_col, 0))
+        to_nodes[rows, cols, k] = nodes[rows, cols] + d_row * num_cols + d_col
+    to_nodes = to_nodes.reshape(-1, len(steps))
+    exists = to_nodes >= 0
+    from_nodes, step_indices = numpy.nonzero(exists)
+    return from_nodes, to_nodes[exists], step_indices
@@ -0,0 +1,163 @@
+"""
+On-disk cache of loaded networks and their derived indexes, keyed by the
+content of the network file and the loader options
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import time
+from array import array
+from contextlib import suppress
+from typing import Dict, List, Sequence, Tuple
+
+import common.serializer as serializer
+from common.compact_network import CompactNetwork
+from common.network import Network
+
+CACHE_VERSION = 1  # part of every key, bump it when the stored files change
+DEFAULT_MAX_BYTES = 1 << 30
+_SUFFIXES = (".netb", ".idx")  # the network and its derived indexes
+STALE_PARTIAL_SECONDS = 3600  # older partial files were left by a dead process
+
+
+def file_hash(filename: str) -> str:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as reader:
+        while chunk := reader.read(serializer.CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_indexes(filename: str, reverse: CompactNetwork, sorted_links: Sequence[int]):
+    # A header with the number of nodes and links, then the reverse CSR arrays
+    # and the sorted links, each padded to a multiple of 8 bytes.
+    arrays = [
+        array("q", [reverse.num_nodes, reverse.num_links]),
+        array("q", reverse.offsets),
+        array("i", reverse.targets),
+        array("d", reverse.costs),
+        array("i", reverse.link_indices),
+        array("i", sorted_links),
+    ]
+    with open(filename, "wb") as writer:
+        for values in arrays:
+            data = values.tobytes()
+            writer.write(data + bytes(-len(data) % 8))
+
+
+def _load_indexes(filename: str) -> Tuple[CompactNetwork, Sequence[int]]:
+    with open(filename, "rb") as reader:
+        buffer = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    num_nodes, num_links = view[:16].cast("q")
+    sections = []
+    position = 16
+    for typecode, length in [
+        ("q", num_nodes + 1),
+        ("i", num_links),
+        ("d", num_links),
+        ("i", num_links),
+        ("i", num_links),
+    ]:
+        size = length * array(typecode).itemsize
+        sections.append(view[position : position + size].cast(typecode))
+        position += size + (-size % 8)
+    offsets, targets, costs, link_indices, sorted_links = sections
+    return (
+        CompactNetwork(num_nodes, offsets, targets, costs, link_indices),
+        sorted_links,
+    )
+
+
+class NetworkCache:
+    """
+    Every entry is a binary network file and an index file named after the
+    key. Reading an entry touches its files, and storing one evicts the least
+    recently used entries until the cache fits in max_bytes. A changed network
+    file hashes to a new key, so stale entries are never read and just age out.
+    Partial files left by a process that died while storing are removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._remove_stale_partials()
+
+    def key(self, filename: str, workflow: bool = False) -> str:
+        return f"{file_hash(filename)}-w{int(workflow)}-v{CACHE_VERSION}"
+
+    def _paths(self, key: str) -> List[str]:
+        return [os.path.join(self.directory, key + suffix) for suffix in _SUFFIXES]
+
+    def load(self, filename: str, workflow: bool = False) -> Network:
+        """
+        Load the network in filename with serializer.load_from_file, or from
+        the cache together with its CSR, reverse CSR and sorted links
+        """
+        key = self.key(filename, workflow)
+        network_path, indexes_path = self._paths(key)
+        if os.path.exists(network_path) and os.path.exists(indexes_path):
+            for path in (network_path, indexes_path):
+                os.utime(path)
+            network = serializer.load_binary(network_path, workflow)
+            reverse, sorted_links = _load_indexes(indexes_path)
+            compact = serializer.load_compact(network_path)
+            network.use_indexes(compact, reverse, sorted_links)
+            return network
+
+        network = serializer.load_from_file(filename, workflow)
+        self._store(key, network)
+        return network
+
+    def _store(self, key: str, network: Network):
+        # The indexes are written first, an entry only counts once both exist.
+        network_path, indexes_path = self._paths(key)
+        with serializer.replace_when_done(indexes_path) as partial_path:
+            _save_indexes(partial_path, network.reverse_csr(), network.sorted_links())
+        with serializer.replace_when_done(network_path) as partial_path:
+            serializer.save_binary(network, partial_path)
+        self.evict(keep=key)
+
+    def _remove_stale_partials(self):
+        # A recent partial file may still be written by another process.
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(serializer.PARTIAL_SUFFIX):
+                with suppress(FileNotFoundError):
+                    if now - entry.stat().st_mtime > STALE_PARTIAL_SECONDS:
+                        os.remove(entry.path)
+
+    def entries(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Return the last use time and size in bytes of every entry
+        """
+        entries: Dict[str, Tuple[float, int]] = {}
+        for entry in os.scandir(self.directory):
+            key, suffix = os.path.splitext(entry.name)
+            if suffix not in _SUFFIXES:
+                continue
+            stat = entry.stat()
+            used, size = entries.get(key, (0.0, 0))
+            entries[key] = max(used, stat.st_mtime), size + stat.st_size
+        return entries
+
+    def evict(self, keep: str = ""):
+        """
+        Remove the stale partial files and the least recently used entries,
+        other than keep, until the cache is no larger than max_bytes
+        """
+        self._remove_stale_partials()
+        entries = self.entries()
+        total = sum(size for _, size in entries.values())
+        for key in sorted(entries, key=lambda key: entries[key][0]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= entries[key][1]
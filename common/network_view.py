@@ -0,0 +1,222 @@
+"""
+Draw a Network on a tkinter canvas, only over the visible area, and keep the
+drawing up to date by changing just the items of the links whose state changed
+"""
+from __future__ import annotations
+
+import math
+from tkinter import ALL, Canvas
+from typing import Dict, Optional, Set, Tuple
+
+from common.network import Link, Network, Node
+from common.point import Point
+
+Style = Tuple[int, str]
+
+
+class NetworkView:
+    """
+    Maps the network to the canvas with a scale and the position of the world
+    point shown at the top left corner. Below LOD_SCALE the plain links are
+    merged into one line per pair of LOD_CELL sized screen cells and only the
+    start and end nodes are drawn. Zooming out stops at MIN_SCALE.
+    """
+
+    LOD_SCALE: float = 0.5
+    LOD_CELL: int = 8
+    MIN_SCALE: float = 0.01
+    OVERLAY: str = "overlay"  # tag of the items drawn over the links
+
+    def __init__(self, network: Network, canvas: Canvas):
+        self.network = network
+        self.canvas = canvas
+        self.scale = 1.0
+        self.origin = Point(0, 0)
+        self._link_items: Dict[Link, int] = {}
+        self._link_styles: Dict[Link, Style] = {}
+        self._node_items: Dict[Node, int] = {}
+        self._node_colors: Dict[Node, str] = {}
+        self._visible_links: Set[Link] = set()
+        self._visible_nodes: Set[Node] = set()
+        self._marked: Set[Link] = set()  # links drawn with a tree or path style
+        self._end_nodes: Set[Node] = set()  # start and end nodes when last drawn
+
+    @property
+    def detailed(self) -> bool:
+        return self.scale >= NetworkView.LOD_SCALE
+
+    def to_world(self, x: float, y: float) -> Point:
+        return Point(self.origin.x + x / self.scale, self.origin.y + y / self.scale)
+
+    def to_screen(self, point: Point) -> Tuple[float, float]:
+        return (
+            (point.x - self.origin.x) * self.scale,
+            (point.y - self.origin.y) * self.scale,
+        )
+
+    def viewport(self) -> Tuple[float, float, float, float]:
+        top_left = self.to_world(0, 0)
+        bottom_right = self.to_world(
+            max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+        )
+        return top_left.x, top_left.y, bottom_right.x, bottom_right.y
+
+    def zoom(self, factor: float, x: float, y: float):
+        """
+        Scale the drawing by factor, keeping the point under (x, y) in place
+        """
+        anchor = self.to_world(x, y)
+        self.scale = max(self.scale * factor, NetworkView.MIN_SCALE)
+        self.origin = Point(anchor.x - x / self.scale, anchor.y - y / self.scale)
+        self.draw()
+
+    def draw(self):
+        """
+        Draw the part of the network inside the viewport from scratch
+        """
+        self.canvas.delete(ALL)
+        self._link_items, self._link_styles = {}, {}
+        self._node_items, self._node_colors = {}, {}
+        x0, y0, x1, y1 = self.viewport()
+        self._visible_links = self.network.links_inside(x0, y0, x1, y1)
+        _r = max((node.radius for node in self.network.nodes), default=0)
+        self._visible_nodes = self.network.nodes_inside(
+            x0 - _r, y0 - _r, x1 + _r, y1 + _r
+        )
+
+        # Plain links first, so that the tree and path are drawn over them.
+        links = sorted(
+            self._visible_links, key=lambda link: link.is_in_path or link.is_in_tree
+        )
+        # No overlay item exists yet, so the lines need no restacking.
+        if not self.detailed:
+            self._draw_merged_links(links)
+        for link in links:
+            self._sync_link(link)
+        draw_labels = self.detailed and len(self.network.nodes) < Network.BIG
+        if draw_labels:
+            for link in links:
+                self._draw_link_label(link)
+        for node in sorted(self._visible_nodes, key=lambda node: node.index):
+            self._sync_node(node)
+            if draw_labels:
+                x, y = self.to_screen(node.pos)
+                self.canvas.create_text(x, y, text=node.text, tags=self.OVERLAY)
+
+        self._marked = {link for link in links if link.is_in_path or link.is_in_tree}
+        self._end_nodes = self._current_end_nodes()
+
+    def refresh(self):
+        """
+        Update the items of the links and nodes whose state changed since the
+        last draw or refresh
+        """
+        links = self._marked | set(self.network.marked_links)
+        created = False
+        for link in links & self._visible_links:
+            created |= self._sync_link(link)
+        if created:
+            # New lines go on top, put the nodes and labels back over them.
+            self.canvas.tag_raise(self.OVERLAY)
+        end_nodes = self._current_end_nodes()
+        for node in (self._end_nodes | end_nodes) & self._visible_nodes:
+            self._sync_node(node)
+        self._marked = {link for link in links if link.is_in_path or link.is_in_tree}
+        self._end_nodes = end_nodes
+
+    def _current_end_nodes(self) -> Set[Node]:
+        return {
+            node
+            for node in (self.network.start_node, self.network.end_node)
+            if node is not None
+        }
+
+    def _link_style(self, link: Link) -> Optional[Style]:
+        # None when the link is not drawn on its own.
+        if link.is_in_path or link.is_in_tree:
+            return link.style()
+        if self.detailed and link.is_visible():
+            return link.style()
+        return None
+
+    def _sync_link(self, link: Link) -> bool:
+        # True when a new line was created, on top of every other item.
+        style = self._link_style(link)
+        if style == self._link_styles.get(link):
+            return False
+        if style is None:
+            self.canvas.delete(self._link_items.pop(link))
+            del self._link_styles[link]
+            return False
+        width, color = style
+        self._link_styles[link] = style
+        if link in self._link_items:
+            self.canvas.itemconfig(self._link_items[link], width=width, fill=color)
+            return False
+        x0, y0 = self.to_screen(link.from_node.pos)
+        x1, y1 = self.to_screen(link.to_node.pos)
+        self._link_items[link] = self.canvas.create_line(
+            x0, y0, x1, y1, width=width, fill=color
+        )
+        return True
+
+    def _node_color(self, node: Node) -> Optional[str]:
+        if self.detailed or node.is_start_node or node.is_end_node:
+            return node.color()
+        return None
+
+    def _sync_node(self, node: Node):
+        color = self._node_color(node)
+        if color == self._node_colors.get(node):
+            return
+        if color is None:
+            self.canvas.delete(self._node_items.pop(node))
+            del self._node_colors[node]
+            return
+        if node in self._node_items:
+            self.canvas.itemconfig(self._node_items[node], fill=color)
+        else:
+            x, y = self.to_screen(node.pos)
+            _r = max(node.radius * self.scale, 1)
+            self._node_items[node] = self.canvas.create_oval(
+                x - _r, y - _r, x + _r, y + _r, fill=color, tags=self.OVERLAY
+            )
+        self._node_colors[node] = color
+
+    def _draw_link_label(self, link: Link):
+        if not link.is_visible():
+            return
+        delta = link.to_node.pos - link.from_node.pos
+        angle = 180 * math.atan2(delta.x, delta.y) / math.pi - 90
+        x0, y0 = self.to_screen(link.from_node.pos)
+        x1, y1 = self.to_screen(link.to_node.pos)
+        _x, _y = 0.667 * x0 + 0.333 * x1, 0.667 * y0 + 0.333 * y1
+        _r = Node.LARGE_RADIUS * self.scale
+        self.canvas.create_oval(
+            _x - _r, _y - _r, _x + _r, _y + _r, fill="white", width=0, tags=self.OVERLAY
+        )
+        self.canvas.create_text(
+            _x, _y, text=link._to_str(), angle=angle, tags=self.OVERLAY
+        )
+
+    def _draw_merged_links(self, links):
+        # One line between the centers of every pair of cells joined by links,
+        # skipping the links inside a single cell.
+        size = NetworkView.LOD_CELL
+        pairs = set()
+        for link in links:
+            x0, y0 = self.to_screen(link.from_node.pos)
+            x1, y1 = self.to_screen(link.to_node.pos)
+            cells = (int(x0 // size), int(y0 // size)), (
+                int(x1 // size),
+                int(y1 // size),
+            )
+            if cells[0] != cells[1]:
+                pairs.add(min(cells) + max(cells))
+        for col0, row0, col1, row1 in pairs:
+            self.canvas.create_line(
+                (col0 + 0.5) * size,
+                (row0 + 0.5) * size,
+                (col1 + 0.5) * size,
+                (row1 + 0.5) * size,
+            )
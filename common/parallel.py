@@ -0,0 +1,38 @@
+"""
+Run one function per item over a process pool that shares a read-only graph
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, List, Optional
+
+_graph: Any = None
+
+
+def _set_graph(graph: Any):
+    global _graph
+    _graph = graph
+
+
+def _call(fn: Callable[[Any, Any], Any], item: Any) -> Any:
+    return fn(_graph, item)
+
+
+def map_with_graph(
+    fn: Callable[[Any, Any], Any],
+    graph: Any,
+    items: Iterable[Any],
+    workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Return [fn(graph, item) for item in items]. With more than one worker the
+    graph is sent once to every worker process instead of once per item, so fn
+    must be a module level function and graph an array-backed structure such as
+    a CompactNetwork. workers=None uses one process per CPU, workers=1 runs in
+    the calling process.
+    """
+    if workers == 1:
+        return [fn(graph, item) for item in items]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_set_graph, initargs=(graph,)
+    ) as executor:
+        return list(executor.map(partial(_call, fn), items))
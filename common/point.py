@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+
 
 class Point:
     def __init__(self, x: float = 0.0, y: float = 0.0):
@@ -22,3 +24,7 @@ def multiply(k: float, p: Point) -> Point:
 
 def squared_distance(p: Point, q: Point) -> float:
     return (p.x - q.x) ** 2 + (p.y - q.y) ** 2
+
+
+def distance(p: Point, q: Point) -> float:
+    return math.hypot(p.x - q.x, p.y - q.y)
@@ -0,0 +1,126 @@
+"""
+Render a Network into a Pillow image, without a Tk canvas
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from common.network import Link, Network, Node
+from common.serializer import load_from_file
+
+SUPERSAMPLING = 3  # image scale used to antialias
+MARGIN = 10
+
+# Tk color names that Pillow does not know.
+_TK_COLORS = {"lightblue1": "#bfefff"}
+
+
+def _color(name: str) -> str:
+    return _TK_COLORS.get(name, name)
+
+
+def polylines(links: Iterable[Link]) -> List[List[Node]]:
+    """
+    Split the links into chains where every link starts at the end of the
+    previous one, so that each chain is drawn with a single call
+    """
+    outgoing: Dict[Node, List[Link]] = {}
+    for link in links:
+        outgoing.setdefault(link.from_node, []).append(link)
+    for node_links in outgoing.values():
+        node_links.reverse()  # pop them in their original order
+    chains = []
+    for node, node_links in outgoing.items():
+        while node_links:
+            chain = [node]
+            next_links = node_links
+            while next_links:
+                link = next_links.pop()
+                chain.append(link.to_node)
+                next_links = outgoing.get(link.to_node)
+            chains.append(chain)
+    return chains
+
+
+def render_network(
+    network: Network,
+    scale: float = 1.0,
+    antialias: bool = False,
+    size: Optional[Tuple[int, int]] = None,
+) -> Image.Image:
+    """
+    Draw the network like Network.draw does, with the positions multiplied by
+    scale. The image is just big enough for the network unless size is given.
+    """
+    if size is None:
+        right = max((node.pos.x + node.radius for node in network.nodes), default=0)
+        bottom = max((node.pos.y + node.radius for node in network.nodes), default=0)
+        size = int(right * scale) + MARGIN, int(bottom * scale) + MARGIN
+    factor = SUPERSAMPLING if antialias else 1
+    scale *= factor
+    image = Image.new("RGB", (size[0] * factor, size[1] * factor), "white")
+    draw = ImageDraw.Draw(image)
+
+    # Plain links first, so that the tree and path are drawn over them.
+    styles: Dict[Tuple[int, str], List[Link]] = {}
+    for link in network.links:
+        if link.is_visible():
+            styles.setdefault(link.style(), []).append(link)
+    for (width, color), links in sorted(styles.items(), key=lambda item: item[0]):
+        for chain in polylines(links):
+            draw.line(
+                [(node.pos.x * scale, node.pos.y * scale) for node in chain],
+                fill=_color(color),
+                width=max(round(width * factor), 1),
+                joint="curve" if width > 1 else None,
+            )
+
+    draw_labels = len(network.nodes) < Network.BIG
+    if draw_labels:
+        for link in network.links:
+            if link.is_visible():
+                _x = (0.667 * link.from_node.pos.x + 0.333 * link.to_node.pos.x) * scale
+                _y = (0.667 * link.from_node.pos.y + 0.333 * link.to_node.pos.y) * scale
+                _r = Node.LARGE_RADIUS * scale
+                draw.ellipse((_x - _r, _y - _r, _x + _r, _y + _r), fill="white")
+                draw.text((_x, _y), link._to_str(), fill="black", anchor="mm")
+    for node in network.nodes:
+        _x, _y = node.pos.x * scale, node.pos.y * scale
+        _r = node.radius * scale
+        draw.ellipse(
+            (_x - _r, _y - _r, _x + _r, _y + _r),
+            fill=_color(node.color()),
+            outline="black",
+            width=factor,
+        )
+        if draw_labels:
+            draw.text((_x, _y), node.text, fill="black", anchor="mm")
+
+    if antialias:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename", help="network file")
+    parser.add_argument("output", help="image file, its extension sets the format")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--antialias", action="store_true")
+    parser.add_argument("--start", type=int, help="start node index of a path")
+    parser.add_argument("--end", type=int, help="end node index of a path")
+    args = parser.parse_args()
+    network = load_from_file(args.filename)
+    if args.start is not None:
+        network.select_start_node(network.nodes[args.start])
+        if args.end is not None:
+            network.select_end_node(network.nodes[args.end])
+        network.check_for_path(network.DIJKSTRA)
+    render_network(network, args.scale, args.antialias).save(args.output)
+
+
+if __name__ == "__main__":
+    _main()
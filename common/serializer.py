@@ -1,10 +1,41 @@
 """
 Serielizer for the Network class
 """
+import argparse
+import gzip
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from contextlib import contextmanager, suppress
+from functools import partial
+from itertools import chain, islice
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy
+
+from common.compact_network import CompactNetwork
 from common.network import Link, Network, Node
 from common.point import Point
 
 COMMENT = "#"
+GZIP_LEVEL = 6  # level 9 is several times slower and barely smaller
+COMPRESSION_MAGIC = {"gzip": b"\x1f\x8b", "zstd": b"\x28\xb5\x2f\xfd"}
+CHUNK_SIZE = 1 << 20  # bytes read at a time
+BATCH_SIZE = 1 << 16  # lines parsed or written at a time
+PARTIAL_SUFFIX = ".partial"  # files being written by replace_when_done
+# Lines of exactly three comma separated fields, joined by newlines.
+_THREE_FIELDS = re.compile(r"[^,\n]*,[^,\n]*,[^,\n]*(?:\n[^,\n]*,[^,\n]*,[^,\n]*)*")
+
+# Binary format: a header, then arrays that each start at a multiple of 8 bytes.
+BINARY_MAGIC = b"NETWORK\x00"
+BINARY_VERSION = 1
+_PREFIX = struct.Struct("8sc7x")  # magic and byte order, "<" or ">"
+_FIELDS = "4q"  # version, num nodes, num links, text size
 
 
 class DeserializationException(Exception):
@@ -21,49 +52,136 @@ def _link_to_string(link: Link) -> str:
     return f"{link.from_node.index},{link.to_node.index},{link.cost}"
 
 
+def _network_lines(network) -> Iterator[str]:
+    yield f"{len(network.nodes)} {COMMENT} Num nodes."
+    yield f"{len(network.links)} {COMMENT} Num links."
+    yield f"{COMMENT} Nodes."
+    yield from map(_node_to_string, network.nodes)
+    yield f"{COMMENT} Links."
+    yield from map(_link_to_string, network.links)
+
+
 def _network_to_string(network) -> str:
-    return "\n".join(
-        [
-            f"{len(network.nodes)} {COMMENT} Num nodes.",
-            f"{len(network.links)} {COMMENT} Num links.",
-            f"{COMMENT} Nodes.",
-        ]
-        + [_node_to_string(node) for node in network.nodes]
-        + [f"{COMMENT} Links."]
-        + [_link_to_string(link) for link in network.links]
-    )
+    return "\n".join(_network_lines(network))
+
+
+def _int_list(values: Sequence, first: int, last: int) -> List[int]:
+    # NumPy arrays and arrays turn into Python numbers in bulk with tolist.
+    part = values[first:last]
+    if hasattr(part, "tolist"):
+        part = part.tolist()
+    return list(map(int, part))
 
 
-def save_into_file(network, filename: str):
+def _write_rows(writer, columns: Sequence[Sequence[int]]):
+    # One % formatting for the whole batch, faster than a format per line.
+    rows = list(zip(*columns))
+    writer.write(("%d,%d,%d\n" * len(rows)) % tuple(chain.from_iterable(rows)))
+
+
+def save_arrays_into_file(
+    filename: str,
+    xs: Sequence[float],
+    ys: Sequence[float],
+    from_indices: Sequence[int],
+    to_indices: Sequence[int],
+    costs: Sequence[int],
+    compression: Optional[str] = None,
+):
     """
-    Save the network to a file
+    Save a network given as arrays like save_into_file does, with the index of
+    every node as its text
     """
-    with open(filename, "w", encoding="utf-8") as writer:
-        writer.writelines(_network_to_string(network))
+    with _open_text(filename, "w", compression) as writer:
+        writer.write(f"{len(xs)} {COMMENT} Num nodes.\n")
+        writer.write(f"{len(from_indices)} {COMMENT} Num links.\n")
+        writer.write(f"{COMMENT} Nodes.\n")
+        for first in range(0, len(xs), BATCH_SIZE):
+            last = first + BATCH_SIZE
+            columns = (
+                _int_list(xs, first, last),
+                _int_list(ys, first, last),
+                range(first, min(last, len(xs))),
+            )
+            _write_rows(writer, columns)
+        writer.write(f"{COMMENT} Links.\n")
+        for first in range(0, len(from_indices), BATCH_SIZE):
+            last = first + BATCH_SIZE
+            columns = (
+                _int_list(values, first, last)
+                for values in (from_indices, to_indices, costs)
+            )
+            _write_rows(writer, columns)
 
 
-def _add_node(network: Network, node_str: str, radius: int = Node.LARGE_RADIUS) -> Node:
+def _open_text(filename: str, mode: str, compression: Optional[str] = None):
+    if compression is None:
+        return open(filename, mode, encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(
+            filename, mode + "t", encoding="utf-8", compresslevel=GZIP_LEVEL
+        )
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as ex:
+            raise ValueError("zstd compression needs the zstandard package") from ex
+        return zstandard.open(filename, mode + "t", encoding="utf-8")
+    raise ValueError(f"Unknown compression: '{compression}'")
+
+
+def _compression_of(filename: str) -> Optional[str]:
+    with open(filename, "rb") as reader:
+        magic = reader.read(4)
+    for compression, prefix in COMPRESSION_MAGIC.items():
+        if magic.startswith(prefix):
+            return compression
+    return None
+
+
+def save_into_file(network, filename: str, compression: Optional[str] = None):
+    """
+    Save the network to a file, BATCH_SIZE lines at a time, and end it with a
+    newline. compression can be "gzip" or "zstd".
+    """
+    with _open_text(filename, "w", compression) as writer:
+        lines = _network_lines(network)
+        while batch := list(islice(lines, BATCH_SIZE)):
+            writer.write("\n".join(batch))
+            writer.write("\n")
+
+
+def _parse_node(node_str: str) -> Tuple[float, float, str]:
     try:
         pos_x, pos_y, text = node_str.split(",")
-        return network.add_node(Point(float(pos_x), float(pos_y)), text, radius=radius)
+        return float(pos_x), float(pos_y), text
     except ValueError as ex:
         raise DeserializationException(f"Invalid node string: '{node_str}'") from ex
 
 
-def _add_link(network: Network, link_str: str, workflow: bool = False) -> Link:
+def _add_node(network: Network, node_str: str, radius: int = Node.LARGE_RADIUS) -> Node:
+    pos_x, pos_y, text = _parse_node(node_str)
+    return network.add_node(Point(pos_x, pos_y), text, radius=radius)
+
+
+def _parse_link(link_str: str, n_nodes: int) -> Tuple[int, int, int]:
     try:
         from_index, to_index, cost = (int(value) for value in link_str.split(","))
-        n_nodes = len(network.nodes)
         if not (0 <= from_index < n_nodes and 0 <= to_index < n_nodes):
             raise DeserializationException(f"Node index out of bounds: '{link_str}'")
-        from_node = network.nodes[from_index]
-        to_node = network.nodes[to_index]
-        add_link_fn = network.add_workflow_link if workflow else network.add_link
-        return add_link_fn(from_node, to_node, cost)
+        return from_index, to_index, cost
     except ValueError as ex:
         raise DeserializationException(f"Invalid link string: '{link_str}'") from ex
 
 
+def _add_link(network: Network, link_str: str, workflow: bool = False) -> Link:
+    from_index, to_index, cost = _parse_link(link_str, len(network.nodes))
+    from_node = network.nodes[from_index]
+    to_node = network.nodes[to_index]
+    add_link_fn = network.add_workflow_link if workflow else network.add_link
+    return add_link_fn(from_node, to_node, cost)
+
+
 def _remove_comments(line: str) -> str:
     pos = line.find(COMMENT)
     if pos > -1:
@@ -71,24 +189,113 @@ def _remove_comments(line: str) -> str:
     return line.strip()
 
 
-def _get_value(reader, exception_msg) -> int:
-    while True:
-        if line := reader.readline():
-            if clean_line := _remove_comments(line):
-                return int(clean_line)
-        else:
-            raise DeserializationException(exception_msg)
+class _CleanLines:
+    """
+    The lines of a file without comments and blank lines, read CHUNK_SIZE bytes
+    at a time
+    """
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.chunk: List[str] = []
+        self.position = 0
+
+    def _read_chunk(self) -> bool:
+        while lines := self.reader.readlines(CHUNK_SIZE):
+            if COMMENT in "".join(lines):
+                self.chunk = list(filter(None, map(_remove_comments, lines)))
+            else:
+                self.chunk = list(filter(None, map(str.strip, lines)))
+            self.position = 0
+            if self.chunk:
+                return True
+        return False
+
+    def take(self, count: int) -> List[str]:
+        """
+        Return the next count lines, or fewer at the end of the file
+        """
+        lines: List[str] = []
+        while len(lines) < count:
+            if self.position == len(self.chunk) and not self._read_chunk():
+                break
+            end = self.position + count - len(lines)
+            lines += self.chunk[self.position : end]
+            self.position = min(end, len(self.chunk))
+        return lines
 
 
-def _parse_lines(reader, num_lines, parser, exception_msg):
+def _get_value(lines: _CleanLines, exception_msg) -> int:
+    if line := lines.take(1):
+        return int(line[0])
+    raise DeserializationException(exception_msg)
+
+
+def _parse_batch(lines: List[str], parser: Callable, convert: Callable) -> List:
+    """
+    Split all the lines at once and convert the columns of fields. If that fails,
+    parse the lines one by one, so that an invalid line raises the same exception
+    as it would on its own.
+    """
+    text = "\n".join(lines)
+    if _THREE_FIELDS.fullmatch(text):
+        fields = text.replace("\n", ",").split(",")
+        try:
+            return convert(fields[0::3], fields[1::3], fields[2::3])
+        except ValueError:
+            pass
+    return list(zip(*map(parser, lines)))
+
+
+def _parse_batches(
+    lines: _CleanLines, num_lines: int, parser, convert, exception_msg
+) -> Iterator[List]:
+    # Parse the next num_lines lines BATCH_SIZE at a time.
     i = 0
     while i < num_lines:
-        if line := reader.readline():
-            if clean_line := _remove_comments(line):
-                parser(clean_line)
-                i += 1
-        else:
+        batch = lines.take(min(BATCH_SIZE, num_lines - i))
+        if not batch:
             raise DeserializationException(f"{exception_msg} ({i}/{num_lines})")
+        i += len(batch)
+        yield _parse_batch(batch, parser, convert)
+
+
+def _convert_nodes(xs, ys, texts) -> List:
+    return [list(map(float, xs)), list(map(float, ys)), texts]
+
+
+def _convert_links(from_indices, to_indices, costs, n_nodes: int) -> List:
+    columns = [list(map(int, column)) for column in (from_indices, to_indices, costs)]
+    for indices in columns[:2]:
+        if min(indices) < 0 or max(indices) >= n_nodes:
+            raise ValueError("node index out of bounds")
+    return columns
+
+
+def _add_nodes(network: Network, lines: _CleanLines, num_nodes: int, radius: int):
+    for xs, ys, texts in _parse_batches(
+        lines,
+        num_nodes,
+        _parse_node,
+        _convert_nodes,
+        exception_msg="Could not find the number of nodes expected",
+    ):
+        for pos_x, pos_y, text in zip(xs, ys, texts):
+            network.add_node(Point(pos_x, pos_y), text, radius=radius)
+
+
+def _add_links(network: Network, lines: _CleanLines, num_links: int, workflow: bool):
+    nodes = network.nodes
+    add_link_fn = network.add_workflow_link if workflow else network.add_link
+    for from_indices, to_indices, costs in _parse_batches(
+        lines,
+        num_links,
+        partial(_parse_link, n_nodes=len(nodes)),
+        partial(_convert_links, n_nodes=len(nodes)),
+        exception_msg="Could not find the number of links expected",
+    ):
+        for from_index, to_index, cost in zip(from_indices, to_indices, costs):
+            add_link_fn(nodes[from_index], nodes[to_index], cost)
 
 
 def load_from_file(filename: str, workflow: bool = False) -> Network:
@@ -96,9 +303,10 @@ def load_from_file(filename: str, workflow: bool = False) -> Network:
     Load a network from a file
     """
     network = Network()
-    with open(filename, "r", encoding="utf-8") as reader:
+    with _open_text(filename, "r", _compression_of(filename)) as reader:
+        lines = _CleanLines(reader)
         num_nodes = _get_value(
-            reader, exception_msg="Could not find the number of nodes"
+            lines, exception_msg="Could not find the number of nodes"
         )
         if num_nodes == 0:
             return network
@@ -106,18 +314,372 @@ def load_from_file(filename: str, workflow: bool = False) -> Network:
         if num_nodes > Network.BIG:
             radius = Node.SMALL_RADIUS
         num_links = _get_value(
-            reader, exception_msg="Could not find the number of links"
+            lines, exception_msg="Could not find the number of links"
         )
-        _parse_lines(
-            reader,
-            num_lines=num_nodes,
-            parser=lambda line: _add_node(network, node_str=line, radius=radius),
-            exception_msg="Could not find the number of nodes expected",
+        _add_nodes(network, lines, num_nodes, radius)
+        _add_links(network, lines, num_links, workflow)
+    return network
+
+
+def _binary_sections(
+    num_nodes: int, num_links: int, text_size: int
+) -> List[Tuple[str, int]]:
+    # Typecode and length of the arrays after the header, in file order: node
+    # x and y, the CSR offsets, targets, costs and link indices, and the offsets
+    # of the node texts into the UTF-8 text table.
+    return [
+        ("d", num_nodes),
+        ("d", num_nodes),
+        ("q", num_nodes + 1),
+        ("i", num_links),
+        ("d", num_links),
+        ("i", num_links),
+        ("q", num_nodes + 1),
+        ("B", text_size),
+    ]
+
+
+def _binary_layout(
+    num_nodes: int, num_links: int, text_size: int
+) -> List[Tuple[str, int, int]]:
+    # Typecode, position and size in bytes of the arrays after the header.
+    position = _PREFIX.size + struct.calcsize(_FIELDS)
+    layout = []
+    for typecode, length in _binary_sections(num_nodes, num_links, text_size):
+        size = length * array(typecode).itemsize
+        layout.append((typecode, position, size))
+        position += size + (-size % 8)
+    return layout
+
+
+def save_binary(network: Network, filename: str, byteorder: str = sys.byteorder):
+    """
+    Save the network in the binary format, with the links grouped by start node
+    """
+    compact = network.to_csr()
+    texts = [node.text.encode("utf-8") for node in network.nodes]
+    text_offsets = array("q", [0])
+    for text in texts:
+        text_offsets.append(text_offsets[-1] + len(text))
+    arrays = [
+        array("d", (node.pos.x for node in network.nodes)),
+        array("d", (node.pos.y for node in network.nodes)),
+        array("q", compact.offsets),
+        array("i", compact.targets),
+        array("d", compact.costs),
+        array("i", compact.link_indices),
+        text_offsets,
+        array("B", b"".join(texts)),
+    ]
+    order = "<" if byteorder == "little" else ">"
+    with open(filename, "wb") as writer:
+        writer.write(_PREFIX.pack(BINARY_MAGIC, order.encode()))
+        writer.write(
+            struct.pack(
+                order + _FIELDS,
+                BINARY_VERSION,
+                len(network.nodes),
+                len(network.links),
+                text_offsets[-1],
+            )
         )
-        _parse_lines(
-            reader,
-            num_lines=num_links,
-            parser=lambda line: _add_link(network, link_str=line, workflow=workflow),
-            exception_msg="Could not find the number of links expected",
+        for values in arrays:
+            if byteorder != sys.byteorder:
+                values.byteswap()
+            data = values.tobytes()
+            writer.write(data + bytes(-len(data) % 8))
+
+
+def _check_binary(
+    num_nodes: int, num_links: int, text_size: int, sections: List[Sequence]
+) -> Optional[str]:
+    # Return what is wrong with the arrays of a binary file, if anything, so
+    # that a search never runs into an index out of range. The array typecodes
+    # are also NumPy type codes.
+    offsets, targets, _, link_indices, text_offsets = (
+        numpy.frombuffer(section, dtype=typecode)
+        for section, typecode in zip(sections[2:7], "qidiq")
+    )
+    for name, values, last in (
+        ("link offsets", offsets, num_links),
+        ("text offsets", text_offsets, text_size),
+    ):
+        if values[0] != 0 or values[-1] != last or (numpy.diff(values) < 0).any():
+            return f"Corrupt binary network file: bad {name}"
+    if targets.size and (targets.min() < 0 or targets.max() >= num_nodes):
+        return "Corrupt binary network file: link target out of range"
+    if link_indices.size and (
+        link_indices.min() < 0
+        or link_indices.max() >= num_links
+        or (numpy.bincount(link_indices, minlength=num_links) != 1).any()
+    ):
+        return "Corrupt binary network file: bad link indices"
+    return None
+
+
+def _read_binary(buffer, check: bool = True) -> Tuple[int, int, List[Sequence]]:
+    # Return the number of nodes and links and the arrays. They are views into
+    # buffer when the file has the native byte order, and copies otherwise.
+    # The header and sizes are always checked, the contents of the arrays only
+    # with check, which reads all of them.
+    if len(buffer) < _PREFIX.size + struct.calcsize(_FIELDS):
+        raise DeserializationException("Not a binary network file")
+    magic, order = _PREFIX.unpack_from(buffer)
+    if magic != BINARY_MAGIC or order not in (b"<", b">"):
+        raise DeserializationException("Not a binary network file")
+    version, num_nodes, num_links, text_size = struct.unpack_from(
+        order.decode() + _FIELDS, buffer, _PREFIX.size
+    )
+    if version != BINARY_VERSION:
+        raise DeserializationException(f"Unsupported binary network version: {version}")
+    if min(num_nodes, num_links, text_size) < 0:
+        raise DeserializationException("Corrupt binary network file: negative count")
+    layout = _binary_layout(num_nodes, num_links, text_size)
+    if any(position + size > len(buffer) for _, position, size in layout):
+        raise DeserializationException("Truncated binary network file")
+    native = (order == b"<") == (sys.byteorder == "little")
+    view = memoryview(buffer)
+    sections = []
+    for typecode, position, size in layout:
+        if native:
+            sections.append(view[position : position + size].cast(typecode))
+        else:
+            values = array(typecode)
+            values.frombytes(view[position : position + size])
+            values.byteswap()
+            sections.append(values)
+    message = None
+    if check:
+        message = _check_binary(num_nodes, num_links, text_size, sections)
+    if message is not None:
+        # Release the views so that the caller can close a memory mapped buffer.
+        for section in sections:
+            if isinstance(section, memoryview):
+                section.release()
+        view.release()
+        raise DeserializationException(message)
+    return num_nodes, num_links, sections
+
+
+def is_binary_file(filename: str) -> bool:
+    with open(filename, "rb") as reader:
+        return reader.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def load_compact(filename: str, check: bool = True) -> CompactNetwork:
+    """
+    Map a binary network file into memory and return its links as a
+    CompactNetwork whose arrays are views into the file, without creating a
+    Node or Link. Checking the arrays reads the whole file, check=False only
+    checks the header and size, for files known to be written correctly.
+    """
+    with open(filename, "rb") as reader:
+        buffer = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        num_nodes, _, sections = _read_binary(buffer, check)
+    except DeserializationException:
+        buffer.close()
+        raise
+    # The views keep the map open for as long as the CompactNetwork lives.
+    offsets, targets, costs, link_indices = sections[2:6]
+    return CompactNetwork(num_nodes, offsets, targets, costs, link_indices)
+
+
+def load_binary(filename: str, workflow: bool = False) -> Network:
+    """
+    Load a network from a binary file, keeping the order of its links
+    """
+    network = Network()
+    with open(filename, "rb") as reader:
+        data = reader.read()
+    num_nodes, num_links, sections = _read_binary(data)
+    xs, ys, offsets, targets, costs, link_indices, text_offsets, text = sections
+    radius = Node.SMALL_RADIUS if num_nodes > Network.BIG else Node.LARGE_RADIUS
+    text = bytes(text)
+    for i in range(num_nodes):
+        network.add_node(
+            Point(xs[i], ys[i]),
+            text[text_offsets[i] : text_offsets[i + 1]].decode("utf-8"),
+            radius=radius,
+        )
+
+    from_nodes = array("i", bytes(4 * num_links))
+    edges = array("i", bytes(4 * num_links))  # edge of every link index
+    for node in range(num_nodes):
+        for e in range(offsets[node], offsets[node + 1]):
+            from_nodes[e] = node
+            edges[link_indices[e]] = e
+    add_link_fn = network.add_workflow_link if workflow else network.add_link
+    for e in edges:
+        cost = costs[e]
+        add_link_fn(
+            network.nodes[from_nodes[e]],
+            network.nodes[targets[e]],
+            int(cost) if cost.is_integer() else cost,
         )
     return network
+
+
+def compact_filename(network_filename: str) -> str:
+    return network_filename + ".netb"
+
+
+def _write_binary_from_text(reader, writer):
+    # Keep the per-node arrays in memory and spill the links into temporary
+    # files, then scatter them by start node into the mapped output file.
+    xs, ys = array("d"), array("d")
+    text_offsets = array("q", [0])
+    with tempfile.TemporaryFile() as texts, tempfile.TemporaryFile() as links:
+        lines = _CleanLines(reader)
+        num_nodes = _get_value(
+            lines, exception_msg="Could not find the number of nodes"
+        )
+        num_links = 0
+        if num_nodes > 0:
+            num_links = _get_value(
+                lines, exception_msg="Could not find the number of links"
+            )
+        for batch_xs, batch_ys, batch_texts in _parse_batches(
+            lines,
+            num_nodes,
+            _parse_node,
+            _convert_nodes,
+            exception_msg="Could not find the number of nodes expected",
+        ):
+            xs.extend(batch_xs)
+            ys.extend(batch_ys)
+            encoded = [text.encode("utf-8") for text in batch_texts]
+            for text in encoded:
+                text_offsets.append(text_offsets[-1] + len(text))
+            texts.write(b"".join(encoded))
+
+        offsets = array("q", bytes(8 * (num_nodes + 1)))
+        for from_indices, to_indices, costs in _parse_batches(
+            lines,
+            num_links,
+            partial(_parse_link, n_nodes=num_nodes),
+            partial(_convert_links, n_nodes=num_nodes),
+            exception_msg="Could not find the number of links expected",
+        ):
+            for from_index in from_indices:
+                offsets[from_index + 1] += 1
+            array("i", from_indices).tofile(links)
+            array("i", to_indices).tofile(links)
+            array("d", costs).tofile(links)
+        for i in range(num_nodes):
+            offsets[i + 1] += offsets[i]
+
+        layout = _binary_layout(num_nodes, num_links, text_offsets[-1])
+        _, position, size = layout[-1]
+        writer.truncate(position + size + (-size % 8))
+        order = "<" if sys.byteorder == "little" else ">"
+        writer.write(_PREFIX.pack(BINARY_MAGIC, order.encode()))
+        writer.write(
+            struct.pack(
+                order + _FIELDS, BINARY_VERSION, num_nodes, num_links, text_offsets[-1]
+            )
+        )
+        for i, values in [(0, xs), (1, ys), (2, offsets), (6, text_offsets)]:
+            writer.seek(layout[i][1])
+            values.tofile(writer)
+        writer.seek(layout[7][1])
+        texts.seek(0)
+        shutil.copyfileobj(texts, writer, CHUNK_SIZE)
+        writer.flush()
+
+        buffer = mmap.mmap(writer.fileno(), 0)
+        view = memoryview(buffer)
+        targets, edge_costs, link_indices = (
+            view[position : position + size].cast(typecode)
+            for typecode, position, size in layout[3:6]
+        )
+        try:
+            next_edge = offsets[:-1]
+            links.seek(0)
+            for first in range(0, num_links, BATCH_SIZE):
+                batch = array("i"), array("i"), array("d")
+                for values in batch:
+                    values.fromfile(links, min(BATCH_SIZE, num_links - first))
+                for k, (from_index, to_index, cost) in enumerate(zip(*batch), first):
+                    e = next_edge[from_index]
+                    next_edge[from_index] = e + 1
+                    targets[e] = to_index
+                    edge_costs[e] = cost
+                    link_indices[e] = k
+        finally:
+            for values in (targets, edge_costs, link_indices, view):
+                values.release()
+            buffer.close()
+
+
+def _umask() -> int:
+    # The umask can only be read by setting it.
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+@contextmanager
+def replace_when_done(filename: str) -> Iterator[str]:
+    """
+    Yield the name of a new temporary file next to filename, which replaces
+    filename when the block succeeds and is removed when it fails
+    """
+    descriptor, partial_filename = tempfile.mkstemp(
+        suffix=PARTIAL_SUFFIX,
+        prefix=os.path.basename(filename) + ".",
+        dir=os.path.dirname(os.path.abspath(filename)),
+    )
+    os.close(descriptor)
+    try:
+        yield partial_filename
+        # mkstemp makes the file private, give it the mode open would have.
+        os.chmod(partial_filename, 0o666 & ~_umask())
+        os.replace(partial_filename, filename)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(partial_filename)
+        raise
+
+
+def convert_to_binary(filename: str, binary_filename: str):
+    """
+    Stream a text network file into the binary format without creating any
+    Node or Link, so that networks larger than memory can be converted
+    """
+    with replace_when_done(binary_filename) as partial_filename:
+        with _open_text(filename, "r", _compression_of(filename)) as reader:
+            with open(partial_filename, "w+b") as writer:
+                _write_binary_from_text(reader, writer)
+
+
+def load_lazily(filename: str) -> CompactNetwork:
+    """
+    Return the links of a text network file as a CompactNetwork over a memory
+    mapped index, so that only the pages a search touches are read. The index
+    is built next to the file when it is missing or older than the file.
+    Building it checks every line, so opening it only checks its header and
+    size.
+    """
+    index_filename = compact_filename(filename)
+    if not os.path.exists(index_filename) or os.path.getmtime(
+        index_filename
+    ) < os.path.getmtime(filename):
+        convert_to_binary(filename, index_filename)
+    return load_compact(index_filename, check=False)
+
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description="convert a text network file into the binary format"
+    )
+    parser.add_argument("filename", help="text network file")
+    parser.add_argument(
+        "output", nargs="?", help="binary file, by default FILENAME.netb"
+    )
+    args = parser.parse_args()
+    convert_to_binary(args.filename, args.output or compact_filename(args.filename))
+
+
+if __name__ == "__main__":
+    _main()
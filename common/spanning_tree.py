@@ -0,0 +1,156 @@
+"""
+Minimum spanning forests of a network whose links are taken as undirected
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from common.network import Link, Node
+
+
+class UnionFind:
+    """
+    Disjoint sets of node indices with path compression and union by size
+    """
+
+    def __init__(self, size: int):
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parents[root] != root:
+            root = self.parents[root]
+        while self.parents[i] != root:
+            self.parents[i], i = root, self.parents[i]
+        return root
+
+    def union(self, i: int, j: int) -> bool:
+        """
+        Merge the sets of i and j, return False if they were already one
+        """
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+        if self.sizes[i] < self.sizes[j]:
+            i, j = j, i
+        self.parents[j] = i
+        self.sizes[i] += self.sizes[j]
+        return True
+
+
+class IndexedHeap:
+    """
+    Binary min heap of items 0..size-1 where the key of a queued item can be
+    lowered in O(log n), so every item is queued at most once
+    """
+
+    def __init__(self, size: int):
+        self.keys: List[float] = [float("inf")] * size
+        self.positions: List[int] = [-1] * size  # -1 when not queued
+        self.heap: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, item: int) -> bool:
+        return self.positions[item] != -1
+
+    def push_or_decrease(self, item: int, key: float) -> bool:
+        """
+        Queue item with key, or lower its key. Return False if the key did not
+        improve.
+        """
+        if key >= self.keys[item]:
+            return False
+        self.keys[item] = key
+        if self.positions[item] == -1:
+            self.positions[item] = len(self.heap)
+            self.heap.append(item)
+        self._sift_up(self.positions[item])
+        return True
+
+    def pop(self) -> int:
+        item = self.heap[0]
+        last = self.heap.pop()
+        self.positions[item] = -1
+        if self.heap:
+            self.heap[0] = last
+            self.positions[last] = 0
+            self._sift_down(0)
+        return item
+
+    def _sift_up(self, position: int):
+        heap, keys, positions = self.heap, self.keys, self.positions
+        item = heap[position]
+        while position > 0:
+            parent = (position - 1) // 2
+            if keys[heap[parent]] <= keys[item]:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position]] = position
+            position = parent
+        heap[position] = item
+        positions[item] = position
+
+    def _sift_down(self, position: int):
+        heap, keys, positions = self.heap, self.keys, self.positions
+        item = heap[position]
+        size = len(heap)
+        while (child := 2 * position + 1) < size:
+            if child + 1 < size and keys[heap[child + 1]] < keys[heap[child]]:
+                child += 1
+            if keys[item] <= keys[heap[child]]:
+                break
+            heap[position] = heap[child]
+            positions[heap[position]] = position
+            position = child
+        heap[position] = item
+        positions[item] = position
+
+
+def kruskal(
+    nodes: Sequence[Node], links: Sequence[Link], sorted_links: Sequence[int]
+) -> List[Link]:
+    """
+    sorted_links holds the indices of links in increasing cost order
+    """
+    sets = UnionFind(len(nodes))
+    tree: List[Link] = []
+    for k in sorted_links:
+        link = links[k]
+        if sets.union(link.from_node.index, link.to_node.index):
+            tree.append(link)
+            if len(tree) == len(nodes) - 1:
+                break
+    return tree
+
+
+def prim(nodes: Sequence[Node], start: int = 0) -> List[Link]:
+    """
+    Grow a tree from start, then from the first node left out of it, until
+    every node is in the forest
+    """
+    tree: List[Link] = []
+    if not nodes:
+        return tree
+    queue = IndexedHeap(len(nodes))
+    best_links: List[Optional[Link]] = [None] * len(nodes)
+    in_tree = [False] * len(nodes)
+    roots = [start] + [i for i in range(len(nodes)) if i != start]
+    for root in roots:
+        if in_tree[root]:
+            continue
+        queue.push_or_decrease(root, 0)
+        while queue:
+            i = queue.pop()
+            in_tree[i] = True
+            if best_links[i] is not None:
+                tree.append(best_links[i])
+            node = nodes[i]
+            for link in node.links + node.in_links:
+                j = (link.to_node if link.from_node is node else link.from_node).index
+                if not in_tree[j] and queue.push_or_decrease(j, link.cost):
+                    best_links[j] = link
+    return tree
@@ -0,0 +1,80 @@
+"""
+Uniform grid of buckets to find the items near a point or inside a box
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class GridIndex(Generic[T]):
+    """
+    Every item is stored in all the cells its bounding box overlaps, so a point
+    query only looks at one cell and a box query at the occupied cells it covers
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[T]] = {}
+        # The columns and rows of the occupied cells, as col0, row0, col1, row1.
+        self.bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _cell_box(
+        self, x0: float, y0: float, x1: float, y1: float
+    ) -> Tuple[int, int, int, int]:
+        col0, row0 = self._cell(min(x0, x1), min(y0, y1))
+        col1, row1 = self._cell(max(x0, x1), max(y0, y1))
+        return col0, row0, col1, row1
+
+    def _cells(
+        self, x0: float, y0: float, x1: float, y1: float
+    ) -> Iterator[Tuple[int, int]]:
+        col0, row0, col1, row1 = self._cell_box(x0, y0, x1, y1)
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                yield col, row
+
+    def insert(self, item: T, x0: float, y0: float, x1: float, y1: float):
+        for cell in self._cells(x0, y0, x1, y1):
+            self.cells.setdefault(cell, []).append(item)
+        col0, row0, col1, row1 = self._cell_box(x0, y0, x1, y1)
+        if self.bounds is not None:
+            col0, row0 = min(col0, self.bounds[0]), min(row0, self.bounds[1])
+            col1, row1 = max(col1, self.bounds[2]), max(row1, self.bounds[3])
+        self.bounds = col0, row0, col1, row1
+
+    def at(self, x: float, y: float) -> List[T]:
+        """
+        Items whose bounding box may contain the point
+        """
+        return self.cells.get(self._cell(x, y), [])
+
+    def inside(self, x0: float, y0: float, x1: float, y1: float) -> Set[T]:
+        """
+        Items whose bounding box may overlap the box
+        """
+        items: Set[T] = set()
+        if self.bounds is None:
+            return items
+        # Only the part of the box over occupied cells is looked at, and when
+        # that still covers more cells than are occupied, the occupied cells
+        # are filtered instead, so zooming far out stays cheap.
+        col0, row0, col1, row1 = self._cell_box(x0, y0, x1, y1)
+        col0, row0 = max(col0, self.bounds[0]), max(row0, self.bounds[1])
+        col1, row1 = min(col1, self.bounds[2]), min(row1, self.bounds[3])
+        if col0 > col1 or row0 > row1:
+            return items
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > len(self.cells):
+            for (col, row), cell_items in self.cells.items():
+                if col0 <= col <= col1 and row0 <= row <= row1:
+                    items.update(cell_items)
+            return items
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                items.update(self.cells.get((col, row), ()))
+        return items
@@ -0,0 +1,79 @@
+import pickle
+from array import array
+
+import numpy
+import pytest
+
+from common.compact_network import NO_EDGE, CompactNetwork
+from common.network import Network
+from common.point import Point
+
+
+@pytest.fixture
+def network() -> Network:
+    test_network = Network()
+    node_a, node_b, node_c = (
+        test_network.add_node(Point(i, 0), text) for i, text in enumerate("ABC")
+    )
+    test_network.add_link(node_b, node_c, 5)
+    test_network.add_link(node_a, node_b, 1)
+    test_network.add_link(node_a, node_c, 7)
+    return test_network
+
+
+def test_from_network(network):
+    compact = CompactNetwork.from_network(network)
+    assert compact.num_nodes == 3
+    assert compact.num_links == 3
+    assert list(compact.offsets) == [0, 2, 3, 3]
+    assert list(compact.targets) == [1, 2, 2]
+    assert list(compact.costs) == [1, 7, 5]
+    assert list(compact.link_indices) == [1, 2, 0]
+
+
+def test_reverse(network):
+    reverse = CompactNetwork.from_network(network).reverse()
+    assert list(reverse.offsets) == [0, 0, 1, 3]
+    assert list(reverse.targets) == [0, 0, 1]
+    assert list(reverse.link_indices) == [1, 2, 0]
+
+
+def test_shortest_path_tree(network):
+    compact = network.to_csr()
+    costs, edges = compact.shortest_path_tree(0)
+    assert list(costs) == [0, 1, 6]
+    assert edges[0] == NO_EDGE
+    links = compact.to_links(network, edges)
+    assert links[0] is None
+    assert str(links[2]) == "[B] --> [C] (5)"
+
+
+def test_to_csr_is_rebuilt_after_a_change(network):
+    compact = network.to_csr()
+    assert network.to_csr() is compact
+    network.add_link(network.nodes[2], network.nodes[0], 1)
+    assert network.to_csr().num_links == 4
+
+
+def test_pickle_copies_views():
+    compact = CompactNetwork(
+        2,
+        memoryview(array("q", [0, 1, 1]).tobytes()).cast("q"),
+        array("i", [1]),
+        array("d", [2.5]),
+        array("i", [0]),
+    )
+    copy = pickle.loads(pickle.dumps(compact))
+    assert isinstance(copy.offsets, array)
+    assert list(copy.offsets) == [0, 1, 1]
+    assert list(copy.costs) == [2.5]
+
+
+def test_from_arrays():
+    compact = CompactNetwork.from_arrays(
+        3, numpy.array([2, 0, 0]), numpy.array([0, 1, 2]), numpy.array([7, 3, 4])
+    )
+    assert list(compact.offsets) == [0, 2, 2, 3]
+    assert list(compact.targets) == [1, 2, 0]
+    assert list(compact.costs) == [3, 4, 7]
+    assert list(compact.link_indices) == [1, 2, 0]
@@ -0,0 +1,127 @@
+import pytest
+
+from common.contraction import ContractionHierarchy
+from common.network import Network
+from common.point import Point
+
+
+@pytest.fixture
+def network(random_grid) -> Network:
+    # 5 x 5 grid with links in both directions and random costs.
+    return random_grid(5, 5, 10, 20, seed=0)
+
+
+def test_queries_match_dijkstra(network):
+    compact = network.to_csr()
+    hierarchy = ContractionHierarchy.build(compact)
+    assert sorted(hierarchy.rank) == list(range(25))
+    for source in range(25):
+        costs, _ = compact.shortest_path_tree(source)
+        for target in range(25):
+            path = hierarchy.query(source, target)
+            node = source
+            for i in path:
+                assert network.links[i].from_node.index == node
+                node = network.links[i].to_node.index
+            assert node == target
+            assert sum(network.links[i].cost for i in path) == costs[target]
+
+
+def test_queries_match_dijkstra_on_a_larger_grid(random_grid):
+    # Deep enough for shortcuts of shortcuts and for stalled nodes.
+    test_network = random_grid(15, 15, 1, 9, seed=3)
+    compact = test_network.to_csr()
+    hierarchy = ContractionHierarchy.build(compact)
+    assert hierarchy.num_shortcuts > 0
+    for source in range(0, 225, 7):
+        costs, _ = compact.shortest_path_tree(source)
+        for target in range(0, 225, 5):
+            path = hierarchy.query(source, target)
+            assert sum(test_network.links[i].cost for i in path) == costs[target]
+
+
+def test_query_with_no_path():
+    test_network = Network()
+    node_a = test_network.add_node(Point(0, 0), "A")
+    node_b = test_network.add_node(Point(1, 0), "B")
+    test_network.add_link(node_a, node_b, 1)
+    hierarchy = ContractionHierarchy.build(test_network.to_csr())
+    assert hierarchy.query(1, 0) is None
+    assert [test_network.links[i] for i in hierarchy.query(0, 1)] == [
+        test_network.links[0]
+    ]
+
+
+def test_check_for_path_marks_the_original_links(network):
+    network.select_start_node(network.nodes[0])
+    network.select_end_node(network.nodes[24])
+    network.check_for_path(Network.DIJKSTRA)
+    expected = [link for link in network.links if link.is_in_path]
+    network.select_end_node(network.nodes[24])
+    network.build_contraction_hierarchy()
+    network.check_for_path(Network.CONTRACTION_HIERARCHIES)
+    assert network.num_settled == network.contraction_hierarchy.num_settled
+    assert sum(link.cost for link in network.links if link.is_in_path) == sum(
+        link.cost for link in expected
+    )
+
+
+def test_queries_do_not_build_the_hierarchy(network):
+    network.select_start_node(network.nodes[0])
+    network.select_end_node(network.nodes[24])
+    network.check_for_path(Network.DIJKSTRA)
+    expected = sum(link.cost for link in network.links if link.is_in_path)
+    network.select_end_node(network.nodes[24])
+    network.check_for_path(Network.CONTRACTION_HIERARCHIES)
+    assert network.contraction_hierarchy is None
+    assert sum(link.cost for link in network.links if link.is_in_path) == expected
+
+    # A cost change drops the hierarchy, and the query runs again without it.
+    network.build_contraction_hierarchy()
+    network.check_for_path(Network.CONTRACTION_HIERARCHIES)
+    link = next(link for link in network.links if link.is_in_path)
+    network.update_link_cost(link, link.cost + 100)
+    assert network.contraction_hierarchy is None
+    cost = sum(link.cost for link in network.links if link.is_in_path)
+    network.select_end_node(network.nodes[24])
+    network.check_for_path(Network.DIJKSTRA)
+    assert sum(link.cost for link in network.links if link.is_in_path) == cost
+
+
+def test_many_to_many_matches_dijkstra(network):
+    sources, targets = [0, 7, 12, 24], [3, 12, 20]
+    compact = network.to_csr()
+    network.build_contraction_hierarchy()
+    result = network.many_to_many(
+        [network.nodes[i] for i in sources], [network.nodes[i] for i in targets]
+    )
+    assert (result.matrix.num_rows, result.matrix.num_cols) == (4, 3)
+    for row, source in enumerate(sources):
+        costs, _ = compact.shortest_path_tree(source)
+        for col, target in enumerate(targets):
+            assert result.matrix[row, col] == costs[target]
+            path = result.path(row, col)
+            assert sum(network.links[i].cost for i in path) == costs[target]
+            node = source
+            for i in path:
+                assert network.links[i].from_node.index == node
+                node = network.links[i].to_node.index
+            assert node == target
+
+
+def test_many_to_many_with_no_path():
+    test_network = Network()
+    node_a = test_network.add_node(Point(0, 0), "A")
+    node_b = test_network.add_node(Point(1, 0), "B")
+    test_network.add_link(node_a, node_b, 1)
+    test_network.build_contraction_hierarchy()
+    result = test_network.many_to_many([node_b], [node_a, node_b])
+    assert result.matrix[0, 0] == float("inf")
+    assert result.path(0, 0) is None
+    assert result.path(0, 1) == []
+
+
+def test_many_to_many_needs_a_hierarchy(network):
+    with pytest.raises(RuntimeError):
+        network.many_to_many(network.nodes[:2], network.nodes[2:4])
+    assert network.contraction_hierarchy is None
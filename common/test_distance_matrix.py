@@ -0,0 +1,42 @@
+import pytest
+
+from common.distance_matrix import DistanceMatrix, distance_matrix
+from common.network import Network
+from common.point import Point
+
+
+@pytest.fixture
+def network() -> Network:
+    # A --1--> B --2--> C, and D on its own.
+    test_network = Network()
+    node_a, node_b, node_c, _ = (
+        test_network.add_node(Point(i, 0), text) for i, text in enumerate("ABCD")
+    )
+    test_network.add_link(node_a, node_b, 1)
+    test_network.add_link(node_b, node_c, 2)
+    return test_network
+
+
+def test_distance_matrix_to_every_node(network):
+    matrix = distance_matrix(network.to_csr(), [0, 1], workers=1)
+    assert (matrix.num_rows, matrix.num_cols) == (2, 4)
+    inf = float("inf")
+    assert list(matrix.row(0)) == [0, 1, 3, inf]
+    assert list(matrix.row(1)) == [inf, 0, 2, inf]
+
+
+def test_distance_matrix_with_targets(network):
+    matrix = distance_matrix(network.to_csr(), [0, 1], [2, 0], workers=2)
+    assert (matrix.num_rows, matrix.num_cols) == (2, 2)
+    assert matrix[0, 0] == 3
+    assert matrix[1, 0] == 2
+    assert matrix[1, 1] == float("inf")
+
+
+def test_save_and_load(network, tmp_path):
+    filename = str(tmp_path / "matrix.bin")
+    matrix = distance_matrix(network.to_csr(), [0, 2], [1, 2], workers=1)
+    matrix.save(filename)
+    loaded = DistanceMatrix.load(filename)
+    assert (loaded.num_rows, loaded.num_cols) == (2, 2)
+    assert loaded.values == matrix.values
@@ -0,0 +1,109 @@
+import pytest
+
+from common.network import Network
+from common.point import Point
+
+
+@pytest.fixture
+def network(random_grid) -> Network:
+    # 3 x 4 grid with links in both directions and random costs.
+    test_network = random_grid(3, 4, 1, 9, seed=2)
+    test_network.select_start_node(test_network.nodes[0])
+    test_network.select_end_node(test_network.nodes[11])
+    return test_network
+
+
+def _all_path_costs(network: Network) -> list:
+    costs = []
+
+    def visit(node, visited, cost):
+        if node is network.end_node:
+            costs.append(cost)
+            return
+        for link in node.links:
+            if link.to_node not in visited:
+                visit(link.to_node, visited | {link.to_node}, cost + link.cost)
+
+    visit(network.start_node, {network.start_node}, 0)
+    return sorted(costs)
+
+
+def test_paths_are_the_cheapest_loopless_ones(network):
+    paths = network.find_k_shortest_paths(10)
+    assert len(paths) == 10
+    assert [sum(link.cost for link in path) for path in paths] == _all_path_costs(
+        network
+    )[:10]
+    assert len({tuple(map(id, path)) for path in paths}) == 10
+    for path in paths:
+        nodes = [network.start_node] + [link.to_node for link in path]
+        assert path[0].from_node is network.start_node
+        assert nodes[-1] is network.end_node
+        assert len(set(nodes)) == len(nodes)
+        assert all(a.to_node is b.from_node for a, b in zip(path, path[1:]))
+
+
+def test_fewer_paths_than_asked():
+    test_network = Network()
+    node_a, node_b, node_c = (
+        test_network.add_node(Point(i, 0), text) for i, text in enumerate("ABC")
+    )
+    test_network.add_link(node_a, node_b, 1)
+    test_network.add_link(node_a, node_c, 5)
+    test_network.add_link(node_b, node_c, 1)
+    test_network.select_start_node(node_a)
+    test_network.select_end_node(node_c)
+    paths = test_network.find_k_shortest_paths(5)
+    assert [[str(link) for link in path] for path in paths] == [
+        ["[A] --> [B] (1)", "[B] --> [C] (1)"],
+        ["[A] --> [C] (5)"],
+    ]
+    test_network.select_start_node(node_c)
+    test_network.select_end_node(node_a)
+    assert test_network.find_k_shortest_paths(5) == []
+
+
+def test_many_paths_with_ties(random_grid):
+    # Few distinct costs, so many paths tie and the spur searches get cut off
+    # at the cost of the last path still needed.
+    test_network = random_grid(5, 5, 1, 2, seed=4)
+    test_network.select_start_node(test_network.nodes[0])
+    test_network.select_end_node(test_network.nodes[24])
+    paths = test_network.find_k_shortest_paths(60)
+    assert [sum(link.cost for link in path) for path in paths] == _all_path_costs(
+        test_network
+    )[:60]
+    assert len({tuple(map(id, path)) for path in paths}) == 60
+
+
+def test_dead_end_branches():
+    test_network = Network()
+    nodes = [test_network.add_node(Point(i, 0), str(i)) for i in range(9)]
+    for from_node, to_node, cost in [
+        (5, 6, 1),
+        (0, 0, 10),
+        (8, 3, 1),
+        (6, 7, 1),
+        (6, 2, 8),
+        (5, 8, 2),
+        (0, 8, 2),
+        (8, 1, 6),
+    ]:
+        test_network.add_link(nodes[from_node], nodes[to_node], cost)
+    test_network.select_start_node(nodes[6])
+    test_network.select_end_node(nodes[7])
+    paths = test_network.find_k_shortest_paths(8)
+    assert [[str(link) for link in path] for path in paths] == [["[6] --> [7] (1)"]]
+
+
+def test_dead_end_next_to_the_end():
+    test_network = Network()
+    node_s, node_a, node_t = (
+        test_network.add_node(Point(i, 0), text) for i, text in enumerate("SAT")
+    )
+    test_network.add_link(node_s, node_a, 1)
+    test_network.add_link(node_s, node_t, 1)
+    test_network.select_start_node(node_s)
+    test_network.select_end_node(node_t)
+    paths = test_network.find_k_shortest_paths(3)
+    assert [[str(link) for link in path] for path in paths] == [["[S] --> [T] (1)"]]
@@ -0,0 +1,143 @@
+import pytest
+
+from common.compact_network import CompactNetwork
+from common.landmarks import Landmarks, landmarks_filename, load_landmarks_for
+from common.network import Network
+from common.point import Point
+
+
+@pytest.fixture
+def grid() -> Network:
+    # 4 x 4 grid with links in both directions, costs at least as long as links.
+    network = Network()
+    for row in range(4):
+        for col in range(4):
+            network.add_node(Point(10 * col, 10 * row), str(4 * row + col))
+    for i, node in enumerate(network.nodes):
+        if i % 4 < 3:
+            network.add_link(node, network.nodes[i + 1], 10 + i % 3)
+            network.add_link(network.nodes[i + 1], node, 12 - i % 2)
+        if i < 12:
+            network.add_link(node, network.nodes[i + 4], 10 + i % 5)
+            network.add_link(network.nodes[i + 4], node, 11)
+    return network
+
+
+def test_build_picks_distinct_landmarks(grid):
+    landmarks = Landmarks.build(grid.to_csr(), k=3)
+    assert len(set(landmarks.nodes)) == 3
+    assert landmarks.num_nodes == 16
+    assert landmarks.num_links == len(grid.links)
+
+
+def test_lower_bounds_never_overestimate(grid):
+    compact = grid.to_csr()
+    landmarks = Landmarks.build(compact, k=3)
+    for source in range(compact.num_nodes):
+        costs, _ = compact.shortest_path_tree(source)
+        for target, cost in enumerate(costs):
+            assert landmarks.lower_bound(source, target) <= cost
+
+
+def test_build_with_workers_matches_in_process(grid):
+    compact = grid.to_csr()
+    expected = Landmarks.build(compact, k=2)
+    landmarks = Landmarks.build(compact, k=2, workers=2)
+    assert landmarks.nodes == expected.nodes
+    assert landmarks.from_costs == expected.from_costs
+    assert landmarks.to_costs == expected.to_costs
+
+
+def test_build_runs_one_search_per_landmark_and_direction(grid, monkeypatch):
+    compact = grid.to_csr()
+    expected = Landmarks.build(compact, k=3)
+    calls = []
+    shortest_path_tree = CompactNetwork.shortest_path_tree
+
+    def counted(self, source):
+        calls.append(source)
+        return shortest_path_tree(self, source)
+
+    monkeypatch.setattr(CompactNetwork, "shortest_path_tree", counted)
+    landmarks = Landmarks.build(compact, k=3)
+    # One from node 0 to pick the first landmark, then one each way per landmark.
+    assert len(calls) == 1 + 2 * 3
+    given = Landmarks.build(compact, nodes=expected.nodes)
+    assert landmarks.from_costs == given.from_costs == expected.from_costs
+    assert landmarks.to_costs == given.to_costs == expected.to_costs
+
+
+def _path_cost(links, end: int) -> int:
+    cost = 0
+    link = links[end]
+    while link is not None:
+        cost += link.cost
+        link = links[link.from_node.index]
+    return cost
+
+
+def test_alt_finds_the_shortest_path(grid):
+    grid.select_start_node(grid.nodes[0])
+    expected = _path_cost(grid.find_path_tree_dijkstra(), 15)
+    assert grid.landmarks is None
+    links = grid.find_path_alt(grid.nodes[15])
+    assert grid.landmarks is not None
+    assert _path_cost(links, 15) == expected
+
+
+def test_update_link_cost_never_builds_landmarks(grid):
+    grid.select_start_node(grid.nodes[0])
+    grid.select_end_node(grid.nodes[15])
+    grid.check_for_path(Network.ALT)
+    landmarks = grid.landmarks
+    grid.update_link_cost(grid.links[0], grid.links[0].cost + 5)
+    assert grid.landmarks is landmarks
+    grid.update_link_cost(grid.links[0], 1)
+    assert grid.landmarks is None
+    in_path = [link for link in grid.links if link.is_in_path]
+    for link in grid.links:
+        link.is_in_tree = link.is_in_path = False
+    expected = _path_cost(grid.find_path_tree_dijkstra(), 15)
+    assert sum(link.cost for link in in_path) == expected
+
+
+def test_save_and_load(grid, tmp_path):
+    filename = str(tmp_path / "grid.net")
+    landmarks = Landmarks.build(grid.to_csr(), k=2)
+    landmarks.save(landmarks_filename(filename))
+    loaded = load_landmarks_for(grid, filename)
+    assert loaded.nodes == landmarks.nodes
+    assert loaded.from_costs == landmarks.from_costs
+    assert loaded.to_costs == landmarks.to_costs
+
+
+def test_stale_landmarks_are_ignored(grid, tmp_path):
+    filename = str(tmp_path / "grid.net")
+    assert load_landmarks_for(grid, filename) is None
+    Landmarks.build(grid.to_csr(), k=2).save(landmarks_filename(filename))
+    grid.add_link(grid.nodes[0], grid.nodes[5], 30)
+    assert load_landmarks_for(grid, filename) is None
+
+
+def test_landmarks_for_other_costs_are_ignored(grid, tmp_path):
+    filename = str(tmp_path / "grid.net")
+    Landmarks.build(grid.to_csr(), k=2).save(landmarks_filename(filename))
+    other = Network()
+    for node in grid.nodes:
+        other.add_node(node.pos, node.text)
+    for link in grid.links:
+        other.add_link(
+            other.nodes[link.from_node.index],
+            other.nodes[link.to_node.index],
+            link.cost + 1,
+        )
+    assert load_landmarks_for(other, filename) is None
+    assert load_landmarks_for(grid, filename) is not None
+
+
+def test_truncated_landmarks_are_ignored(grid, tmp_path):
+    filename = str(tmp_path / "grid.net")
+    Landmarks.build(grid.to_csr(), k=2).save(landmarks_filename(filename))
+    with open(landmarks_filename(filename), "r+b") as writer:
+        writer.truncate(100)
+    assert load_landmarks_for(grid, filename) is None
@@ -1,6 +1,8 @@
+import random
+
 import pytest
 
-from common.network import Network
+from common.network import NegativeCycleException, Network
 from common.point import Point
 
 
@@ -41,3 +43,293 @@ def test_end_point(network):
     node_a = network.nodes[0]
     network.select_end_node(node_a)
     assert node_a.is_end_node
+
+
+@pytest.fixture
+def diamond() -> Network:
+    # A --1--> B --1--> D
+    # A --3--> C --1--> D, plus a cheap detour B --1--> C
+    test_network = Network()
+    node_a, node_b, node_c, node_d = (
+        test_network.add_node(Point(x, y), text)
+        for x, y, text in [(0, 1, "A"), (1, 0, "B"), (1, 2, "C"), (2, 1, "D")]
+    )
+    test_network.add_link(node_a, node_b, 1)
+    test_network.add_link(node_a, node_c, 3)
+    test_network.add_link(node_b, node_d, 1)
+    test_network.add_link(node_c, node_d, 1)
+    test_network.add_link(node_b, node_c, 1)
+    return test_network
+
+
+def _tree_costs(links_in_tree) -> list:
+    costs = []
+    for link in links_in_tree:
+        cost = 0
+        while link is not None:
+            cost += link.cost
+            link = links_in_tree[link.from_node.index]
+        costs.append(cost)
+    return costs
+
+
+def test_dijkstra_builds_the_shortest_path_tree(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    links_in_tree = diamond.find_path_tree_dijkstra()
+    assert links_in_tree[0] is None
+    assert _tree_costs(links_in_tree) == [0, 1, 2, 2]
+    assert [str(link) for link in diamond.links if link.is_in_tree] == [
+        "[A] --> [B] (1)",
+        "[B] --> [D] (1)",
+        "[B] --> [C] (1)",
+    ]
+
+
+def test_dijkstra_matches_label_correcting(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    expected = _tree_costs(diamond.find_path_tree_label_correcting())
+    assert _tree_costs(diamond.find_path_tree_dijkstra()) == expected
+
+
+def test_dijkstra_marks_the_path_to_the_end_node(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    diamond.select_end_node(diamond.nodes[3])
+    diamond.check_for_path(Network.DIJKSTRA)
+    assert [str(link) for link in diamond.links if link.is_in_path] == [
+        "[A] --> [B] (1)",
+        "[B] --> [D] (1)",
+    ]
+
+
+def test_label_correcting_handles_negative_costs(diamond):
+    diamond.links[1].cost = -1  # A --> C
+    diamond.select_start_node(diamond.nodes[0])
+    links_in_tree = diamond.find_path_tree_label_correcting()
+    assert _tree_costs(links_in_tree) == [0, 1, -1, 0]
+    assert [str(link) for link in diamond.links if link.is_in_tree] == [
+        "[A] --> [B] (1)",
+        "[A] --> [C] (-1)",
+        "[C] --> [D] (1)",
+    ]
+
+
+def test_label_correcting_detects_negative_cycles(diamond):
+    diamond.add_link(diamond.nodes[3], diamond.nodes[1], -3)
+    diamond.select_start_node(diamond.nodes[0])
+    with pytest.raises(NegativeCycleException):
+        diamond.find_path_tree_label_correcting()
+
+
+def test_dijkstra_stops_when_the_end_node_is_settled(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    links_in_tree = diamond.find_path_tree_dijkstra(end_node=diamond.nodes[1])
+    assert str(links_in_tree[1]) == "[A] --> [B] (1)"
+    assert [str(link) for link in diamond.links if link.is_in_tree] == [
+        "[A] --> [B] (1)"
+    ]
+
+
+def test_links_are_indexed_by_both_ends(diamond):
+    node_b = diamond.nodes[1]
+    assert [str(link) for link in node_b.links] == [
+        "[B] --> [D] (1)",
+        "[B] --> [C] (1)",
+    ]
+    assert [str(link) for link in node_b.in_links] == ["[A] --> [B] (1)"]
+
+
+def test_bidirectional_finds_the_same_path_as_dijkstra(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    diamond.select_end_node(diamond.nodes[3])
+    diamond.check_for_path(Network.BIDIRECTIONAL)
+    assert [str(link) for link in diamond.links if link.is_in_path] == [
+        "[A] --> [B] (1)",
+        "[B] --> [D] (1)",
+    ]
+    assert diamond.num_settled <= len(diamond.nodes)
+
+
+def test_bidirectional_with_no_path(diamond):
+    diamond.select_start_node(diamond.nodes[3])
+    links = diamond.find_path_bidirectional(end_node=diamond.nodes[0])
+    assert list(links) == [None] * len(diamond.nodes)
+
+
+@pytest.fixture
+def line() -> Network:
+    # L <-- S --> M --> E, with link costs equal to link lengths.
+    test_network = Network()
+    node_s, node_m, node_e, node_l = (
+        test_network.add_node(Point(x, 0), text)
+        for x, text in [(0, "S"), (10, "M"), (20, "E"), (-11, "L")]
+    )
+    test_network.add_link(node_s, node_m, 10)
+    test_network.add_link(node_m, node_e, 10)
+    test_network.add_link(node_s, node_l, 11)
+    test_network.select_start_node(node_s)
+    test_network.select_end_node(node_e)
+    return test_network
+
+
+def test_a_star_settles_fewer_nodes_than_dijkstra(line):
+    line.check_for_path(Network.DIJKSTRA)
+    assert line.num_settled == 4
+    line.select_end_node(line.end_node)
+    line.check_for_path(Network.A_STAR)
+    assert line.num_settled == 3
+    assert [str(link) for link in line.links if link.is_in_path] == [
+        "[S] --> [M] (10)",
+        "[M] --> [E] (10)",
+    ]
+
+
+def test_a_star_without_end_node_builds_the_whole_tree(line):
+    links_in_tree = line.find_path_a_star()
+    assert _tree_costs(links_in_tree) == [0, 10, 20, 11]
+
+
+@pytest.fixture
+def rounded_grid() -> Network:
+    # 10 x 10 grid with links in both directions, 10.5 apart and costs of 0 to
+    # 20 percent more than that rounded down, so some links cost less than
+    # they are long.
+    rng = random.Random(2)
+    test_network = Network()
+    for row in range(10):
+        for col in range(10):
+            test_network.add_node(Point(10.5 * col, 10.5 * row), str(10 * row + col))
+    nodes = test_network.nodes
+    for i, node in enumerate(nodes):
+        for j in ([i + 1] if i % 10 < 9 else []) + ([i + 10] if i < 90 else []):
+            test_network.add_link(
+                node, nodes[j], int(10.5 * (1 + rng.randint(0, 20) / 100))
+            )
+            test_network.add_link(
+                nodes[j], node, int(10.5 * (1 + rng.randint(0, 20) / 100))
+            )
+    return test_network
+
+
+def test_a_star_matches_dijkstra_on_rounded_costs(rounded_grid):
+    rng = random.Random(6)
+    for _ in range(100):
+        start, end_node = rng.sample(rounded_grid.nodes, 2)
+        rounded_grid.select_start_node(start)
+        expected = _tree_costs(rounded_grid.find_path_tree_dijkstra())[end_node.index]
+        links = rounded_grid.find_path_a_star(end_node)
+        cost, link = 0, links[end_node.index]
+        while link is not None:
+            cost += link.cost
+            link = links[link.from_node.index]
+        assert cost == expected
+
+
+@pytest.mark.parametrize(
+    "link_index,new_cost",
+    [(0, 5), (0, 0), (1, 1), (1, 4), (2, 3), (3, 0), (4, 9)],
+)
+def test_update_link_cost_repairs_the_tree(diamond, link_index, new_cost):
+    diamond.select_start_node(diamond.nodes[0])
+    diamond.select_end_node(diamond.nodes[3])
+    diamond.find_path(diamond.find_path_tree_dijkstra())
+    diamond.update_link_cost(diamond.links[link_index], new_cost)
+    repaired = diamond.tree_links
+    in_tree = [link for link in diamond.links if link.is_in_tree]
+    assert sorted(in_tree, key=diamond.links.index) == sorted(
+        (link for link in repaired if link), key=diamond.links.index
+    )
+    in_path = [link for link in diamond.links if link.is_in_path]
+    for link in diamond.links:
+        link.is_in_tree = False
+    expected = diamond.find_path_tree_dijkstra()
+    assert _tree_costs(repaired) == _tree_costs(expected)
+    assert sum(link.cost for link in in_path) == _tree_costs(expected)[3]
+
+
+def test_update_link_cost_without_a_tree(diamond):
+    diamond.update_link_cost(diamond.links[0], 7)
+    assert diamond.links[0].cost == 7
+    assert diamond.tree_links is None
+
+
+@pytest.mark.parametrize(
+    "algorithm_idx",
+    [Network.DIJKSTRA, Network.BIDIRECTIONAL, Network.A_STAR, Network.ALT],
+)
+def test_update_link_cost_runs_the_last_query_again(diamond, capsys, algorithm_idx):
+    diamond.select_start_node(diamond.nodes[0])
+    diamond.select_end_node(diamond.nodes[3])
+    diamond.check_for_path(algorithm_idx)
+    assert diamond.tree_links is None
+    capsys.readouterr()
+    diamond.update_link_cost(diamond.links[2], 100)
+    in_path = [link for link in diamond.links if link.is_in_path]
+    assert sum(link.cost for link in in_path) == 3
+    assert diamond.links[2] not in in_path
+    assert all(link.is_in_tree or link.is_in_path for link in diamond.marked_links)
+    assert capsys.readouterr().out == ""
+
+
+def test_update_link_cost_marks_each_link_once(diamond, capsys):
+    diamond.select_start_node(diamond.nodes[0])
+    diamond.select_end_node(diamond.nodes[3])
+    diamond.find_path(diamond.find_path_tree_dijkstra())
+    capsys.readouterr()
+    for cost in [5, 1, 5, 1]:
+        diamond.update_link_cost(diamond.links[0], cost)
+    assert len(diamond.marked_links) == len(set(diamond.marked_links))
+    assert len(diamond.marked_links) <= len(diamond.links)
+    assert capsys.readouterr().out == ""
+
+
+def test_selecting_a_node_clears_the_marked_links(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    diamond.select_end_node(diamond.nodes[3])
+    diamond.check_for_path(Network.LABEL_CORRECTING)
+    assert any(link.is_in_path for link in diamond.links)
+    diamond.select_end_node(diamond.nodes[2])
+    assert not any(link.is_in_path or link.is_in_tree for link in diamond.links)
+
+
+def test_consecutive_queries_reuse_the_workspace(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    first = diamond.find_path_tree_dijkstra(end_node=diamond.nodes[3])
+    assert str(first[3]) == "[B] --> [D] (1)"
+    diamond.select_start_node(diamond.nodes[2])
+    second = diamond.find_path_tree_dijkstra(end_node=diamond.nodes[3])
+    assert str(second[3]) == "[C] --> [D] (1)"
+    assert second[1] is None
+
+
+def test_label_setting_builds_the_shortest_path_tree():
+    # A spanning tree would reach C through B --> C, which is cheaper than A --> C.
+    test_network = Network()
+    node_a, node_b, node_c = (
+        test_network.add_node(Point(i, 0), text) for i, text in enumerate("ABC")
+    )
+    test_network.add_link(node_a, node_b, 2)
+    test_network.add_link(node_a, node_c, 3)
+    test_network.add_link(node_b, node_c, 2)
+    test_network.select_start_node(node_a)
+    links_in_tree = test_network.find_path_tree_label_setting()
+    assert _tree_costs(links_in_tree) == [0, 2, 3]
+    assert test_network.tree_costs == [0, 2, 3]
+
+
+def test_node_at(network):
+    assert network.node_at(Point(0, 0)) is network.nodes[0]
+    assert network.node_at(Point(0, 11)) is network.nodes[1]
+    assert network.node_at(Point(100, 100)) is None
+    node_d = network.add_node(Point(100, 100), "D")
+    assert network.node_at(Point(100, 100)) is node_d
+
+
+def test_label_searches_reuse_the_workspace(diamond):
+    diamond.select_start_node(diamond.nodes[0])
+    workspace = diamond._workspaces[0]
+    generation = workspace.generation
+    correcting = diamond.find_path_tree_label_correcting()
+    setting = diamond.find_path_tree_label_setting()
+    assert workspace.generation == generation + 2
+    assert correcting == setting
+    assert _tree_costs(setting) == [0, 1, 2, 2]
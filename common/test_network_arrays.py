@@ -0,0 +1,67 @@
+import numpy
+import pytest
+
+import common.serializer as serializer
+from common.network_arrays import NetworkArrays, grid_links, grid_positions
+
+
+@pytest.fixture
+def arrays() -> NetworkArrays:
+    return NetworkArrays(
+        numpy.array([0.0, 10.5, 20.0]),
+        numpy.array([0.0, 5.0, 9.9]),
+        numpy.array([2, 0, 0]),
+        numpy.array([0, 1, 2]),
+        numpy.array([7, 3, 4]),
+    )
+
+
+def test_grid_positions():
+    xs, ys, dist_x, dist_y = grid_positions(140, 240, 3, 2)
+    assert (dist_x, dist_y) == (100, 100)
+    assert xs.tolist() == [20, 120] * 3
+    assert ys.tolist() == [20, 20, 120, 120, 220, 220]
+
+
+def test_grid_links():
+    from_nodes, to_nodes, steps = grid_links(2, 3, [(1, 0), (0, 1), (-1, 0)])
+    assert list(zip(from_nodes.tolist(), to_nodes.tolist(), steps.tolist())) == [
+        (0, 1, 0),
+        (0, 3, 1),
+        (1, 2, 0),
+        (1, 4, 1),
+        (1, 0, 2),
+        (2, 5, 1),
+        (2, 1, 2),
+        (3, 4, 0),
+        (4, 5, 0),
+        (4, 3, 2),
+        (5, 4, 2),
+    ]
+
+
+def test_to_network(arrays):
+    network = arrays.to_network()
+    assert [node.text for node in network.nodes] == ["0", "1", "2"]
+    assert [str(link) for link in network.links] == [
+        "[2] --> [0] (7)",
+        "[0] --> [1] (3)",
+        "[0] --> [2] (4)",
+    ]
+
+
+def test_to_csr(arrays):
+    compact, expected = arrays.to_csr(), arrays.to_network().to_csr()
+    assert list(compact.offsets) == list(expected.offsets)
+    assert list(compact.targets) == list(expected.targets)
+    assert list(compact.costs) == list(expected.costs)
+    assert list(compact.link_indices) == list(expected.link_indices)
+
+
+def test_save_into_file(tmp_path, arrays):
+    filename = str(tmp_path / "test.net")
+    arrays.save_into_file(filename)
+    with open(filename, "r", encoding="utf-8") as reader:
+        assert reader.read() == (
+            serializer._network_to_string(arrays.to_network()) + "\n"
+        )
@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+
+import common.network_cache as network_cache
+import common.serializer as serializer
+from common.network import WorkflowLink
+from common.network_cache import NetworkCache
+
+TEST_FILES_PATH = "2_shortest_paths/test_files/"
+
+
+@pytest.fixture
+def cache(tmp_path) -> NetworkCache:
+    return NetworkCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def network_file(tmp_path) -> str:
+    filename = str(tmp_path / "test.net")
+    with open(TEST_FILES_PATH + "dijkstra3.txt", "r", encoding="utf-8") as reader:
+        with open(filename, "w", encoding="utf-8") as writer:
+            writer.write(reader.read())
+    return filename
+
+
+def test_load_twice(cache, network_file):
+    expected = serializer.load_from_file(network_file)
+    first = cache.load(network_file)
+    assert len(cache.entries()) == 1
+    second = cache.load(network_file)
+    for network in (first, second):
+        assert serializer._network_to_string(network) == (
+            serializer._network_to_string(expected)
+        )
+    assert list(second.to_csr().targets) == list(expected.to_csr().targets)
+    assert list(second.reverse_csr().targets) == list(expected.reverse_csr().targets)
+    assert list(second.sorted_links()) == list(expected.sorted_links())
+    assert len(cache.entries()) == 1
+
+
+def test_options_and_content_are_part_of_the_key(cache, network_file):
+    cache.load(network_file)
+    assert isinstance(cache.load(network_file, workflow=True).links[0], WorkflowLink)
+    assert isinstance(cache.load(network_file, workflow=True).links[0], WorkflowLink)
+    assert len(cache.entries()) == 2
+
+    with open(network_file, "a", encoding="utf-8") as writer:
+        writer.write("\n# Changed.")
+    cache.load(network_file)
+    assert len(cache.entries()) == 3
+
+
+def test_evict_least_recently_used(tmp_path, cache, network_file):
+    other_file = str(tmp_path / "other.net")
+    with open(other_file, "w", encoding="utf-8") as writer:
+        writer.write("2\n1\n0,0,A\n1,1,B\n0,1,1")
+    cache.load(network_file)
+    first_key = cache.key(network_file)
+    size = cache.entries()[first_key][1]
+
+    cache.max_bytes = 2 * size
+    time.sleep(0.01)
+    cache.load(other_file)
+    time.sleep(0.01)
+    cache.load(network_file)  # now the most recently used
+    assert len(cache.entries()) == 2
+
+    cache.max_bytes = size
+    cache.evict()
+    assert list(cache.entries()) == [first_key]
+    assert os.path.exists(os.path.join(cache.directory, first_key + ".netb"))
+
+
+def test_stale_partial_files_are_removed(tmp_path, network_file):
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    stale, recent = directory / "a.idx.x.partial", directory / "b.netb.y.partial"
+    for path in (stale, recent):
+        path.write_bytes(bytes(100))
+    old = time.time() - 2 * network_cache.STALE_PARTIAL_SECONDS
+    os.utime(stale, (old, old))
+    cache = NetworkCache(str(directory))
+    assert not stale.exists() and recent.exists()
+    assert cache.entries() == {}
+
+    os.utime(recent, (old, old))
+    cache.load(network_file)
+    assert not recent.exists()
+    assert len(cache.entries()) == 1
@@ -0,0 +1,132 @@
+import pytest
+
+from common.network import Network
+from common.network_view import NetworkView
+from common.point import Point
+
+
+class FakeCanvas:
+    # Records the items the view keeps on the canvas.
+    def __init__(self, width: int = 100, height: int = 100):
+        self.width, self.height = width, height
+        self.items = {}
+        self.calls = 0
+        self.raised = []
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _create(self, kind, coords, options):
+        self.calls += 1
+        item = len(self.items) + 1
+        self.items[item] = dict(options, kind=kind, coords=coords)
+        return item
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def itemconfig(self, item, **options):
+        self.calls += 1
+        self.items[item].update(options)
+
+    def delete(self, item):
+        self.calls += 1
+        if item == "all":
+            self.items = {}
+        else:
+            del self.items[item]
+
+    def tag_raise(self, tag):
+        self.raised.append(tag)
+
+    def kinds(self, kind):
+        return [options for options in self.items.values() if options["kind"] == kind]
+
+
+@pytest.fixture
+def line() -> Network:
+    # Nodes A, B, C left to right and D far outside a 100x100 viewport.
+    test_network = Network()
+    nodes = [
+        test_network.add_node(Point(x, 50), text)
+        for x, text in [(10, "A"), (50, "B"), (90, "C"), (1000, "D")]
+    ]
+    for node_a, node_b in zip(nodes, nodes[1:]):
+        test_network.add_link(node_a, node_b, 1)
+        test_network.add_link(node_b, node_a, 1)
+    return test_network
+
+
+def test_draw_culls(line):
+    canvas = FakeCanvas()
+    NetworkView(line, canvas).draw()
+    # A-B and B-C, and C-D which crosses the border. D is not drawn.
+    assert len(canvas.kinds("line")) == 3
+    assert len(canvas.kinds("oval")) == 3 + 3  # nodes and link label backgrounds
+
+
+def test_refresh_touches_changed_links(line):
+    canvas = FakeCanvas()
+    view = NetworkView(line, canvas)
+    view.draw()
+    line.select_start_node(line.nodes[0])
+    line.select_end_node(line.nodes[2])
+    line.check_for_path(Network.DIJKSTRA)
+    canvas.calls = 0
+    view.refresh()
+    # Two links turn red and two nodes change color.
+    assert canvas.calls == 4
+    assert sorted(item["fill"] for item in canvas.kinds("line")) == [
+        "black",
+        "red",
+        "red",
+    ]
+
+    line.select_start_node(line.nodes[2])
+    line.select_end_node(line.nodes[0])
+    line.check_for_path(Network.DIJKSTRA)
+    view.refresh()
+    # The path back uses the reverse links, which are only drawn when marked,
+    # and C --> D joins the tree.
+    fills = sorted(item["fill"] for item in canvas.kinds("line"))
+    assert fills == ["black", "black", "green", "red", "red"]
+    # The new lines were created over the nodes, which are raised back once.
+    assert canvas.raised == [NetworkView.OVERLAY]
+
+
+def test_level_of_detail(line):
+    canvas = FakeCanvas()
+    view = NetworkView(line, canvas)
+    view.scale = 0.1
+    view.draw()
+    # A and B fall into one cell, so A --> B is merged away.
+    assert len(canvas.kinds("line")) == 2
+    assert canvas.kinds("oval") == []
+
+    line.select_start_node(line.nodes[0])
+    view.refresh()
+    assert len(canvas.kinds("oval")) == 1
+
+
+def test_zoom_keeps_anchor():
+    view = NetworkView(Network(), FakeCanvas())
+    view.zoom(2, 30, 40)
+    anchor = view.to_world(30, 40)
+    assert (anchor.x, anchor.y) == (30, 40)
+    assert view.to_screen(Point(0, 0)) == (-30, -40)
+
+
+def test_zoom_out_stops_at_min_scale():
+    view = NetworkView(Network(), FakeCanvas())
+    for _ in range(100):
+        view.zoom(0.5, 0, 0)
+    assert view.scale == NetworkView.MIN_SCALE
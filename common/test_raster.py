@@ -0,0 +1,48 @@
+import pytest
+
+from common.network import Network
+from common.point import Point
+from common.raster import polylines, render_network
+
+
+@pytest.fixture
+def line() -> Network:
+    test_network = Network()
+    nodes = [
+        test_network.add_node(Point(x, 20), text)
+        for x, text in [(20, "A"), (60, "B"), (100, "C")]
+    ]
+    for node_a, node_b in zip(nodes, nodes[1:]):
+        test_network.add_link(node_a, node_b, 1)
+        test_network.add_link(node_b, node_a, 1)
+    return test_network
+
+
+def test_polylines(line):
+    chains = polylines(line.links)
+    assert sum(len(chain) - 1 for chain in chains) == len(line.links)
+    assert [[node.text for node in chain] for chain in chains] == [
+        ["A", "B", "A"],
+        ["B", "C", "B"],
+    ]
+
+
+def test_render(line):
+    image = render_network(line)
+    assert image.size == (120, 40)
+    assert image.getpixel((50, 20)) == (0, 0, 0)
+    # Inside node A, up and left of its label so the font does not matter.
+    assert image.getpixel((14, 14)) == (255, 255, 255)
+
+    line.select_start_node(line.nodes[0])
+    line.select_end_node(line.nodes[2])
+    line.check_for_path(Network.DIJKSTRA)
+    image = render_network(line, scale=2)
+    assert image.size == (230, 70)
+    assert image.getpixel((92, 40)) == (255, 0, 0)
+    assert image.getpixel((30, 30)) == (255, 192, 203)  # pink start node
+
+    smooth = render_network(line, scale=2, antialias=True)
+    assert smooth.size == image.size
+    red, green, blue = smooth.getpixel((92, 40))
+    assert red > 200 and green < 50 and blue < 50
@@ -1,3 +1,7 @@
+import gzip
+import os
+import struct
+
 import pytest
 from pytest import approx
 
@@ -94,8 +98,8 @@ def test_parse_a_link_string_with_index_out_of_bounds_raises_an_exception(networ
     assert str(ex.value) == "Node index out of bounds: '1,2,3'"
 
 
-def test_save_and_load_from_file(network):
-    filename = TEST_FILES_PATH + "test.net"
+def test_save_and_load_from_file(tmp_path, network):
+    filename = str(tmp_path / "test.net")
     serializer.save_into_file(network, filename)
     new_network = serializer.load_from_file(filename)
     assert len(new_network.nodes) == 2
@@ -137,3 +141,233 @@ def test_load_a_file_with_less_links_than_expected_raises_an_exception():
     with pytest.raises(DeserializationException) as ex:
         serializer.load_from_file(TEST_FILES_PATH + "missing-links.txt")
     assert str(ex.value) == "Could not find the number of links expected (0/1)"
+
+
+@pytest.mark.parametrize("byteorder", ["little", "big"])
+def test_binary_round_trip(tmp_path, byteorder):
+    network = serializer.load_from_file(TEST_FILES_PATH + "dijkstra3.txt")
+    filename = str(tmp_path / "test.netb")
+    serializer.save_binary(network, filename, byteorder)
+    assert serializer.is_binary_file(filename)
+    loaded = serializer.load_binary(filename)
+    assert serializer._network_to_string(loaded) == serializer._network_to_string(
+        network
+    )
+    assert [node.radius for node in loaded.nodes] == [
+        node.radius for node in network.nodes
+    ]
+
+
+def test_load_compact(tmp_path, network):
+    network.add_node(Point(2, 0), "Ç")
+    network.add_link(network.nodes[2], network.nodes[0], 3)
+    network.add_link(network.nodes[0], network.nodes[2], 2)
+    filename = str(tmp_path / "test.netb")
+    serializer.save_binary(network, filename)
+    compact = serializer.load_compact(filename)
+    expected = network.to_csr()
+    assert compact.num_nodes == 3
+    assert list(compact.offsets) == list(expected.offsets)
+    assert list(compact.targets) == list(expected.targets)
+    assert list(compact.costs) == list(expected.costs)
+    assert list(compact.link_indices) == list(expected.link_indices)
+    assert list(compact.shortest_path_tree(2)[0]) == [3, 4, 0]
+    assert serializer.load_binary(filename).nodes[2].text == "Ç"
+
+
+def test_load_binary_rejects_text_files():
+    assert not serializer.is_binary_file(TEST_FILES_PATH + "dijkstra3.txt")
+    with pytest.raises(DeserializationException) as ex:
+        serializer.load_binary(TEST_FILES_PATH + "dijkstra3.txt")
+    assert str(ex.value) == "Not a binary network file"
+
+
+def test_load_binary_rejects_truncated_files(tmp_path, network):
+    filename = str(tmp_path / "test.netb")
+    serializer.save_binary(network, filename)
+    with open(filename, "rb") as reader:
+        data = reader.read()
+    with open(filename, "wb") as writer:
+        writer.write(data[:-16])
+    with pytest.raises(DeserializationException) as ex:
+        serializer.load_binary(filename)
+    assert str(ex.value) == "Truncated binary network file"
+
+
+def _corrupt(filename: str, position: int, fmt: str, value: int):
+    with open(filename, "r+b") as writer:
+        writer.seek(position)
+        writer.write(struct.pack("=" + fmt, value))
+
+
+@pytest.mark.parametrize(
+    "section,index,fmt,value,message",
+    [
+        (None, 1, "q", -1, "negative count"),
+        (None, 2, "q", -5, "negative count"),
+        (2, 1, "q", 5, "bad link offsets"),
+        (3, 0, "i", 7, "link target out of range"),
+        (3, 0, "i", -1, "link target out of range"),
+        (5, 1, "i", 0, "bad link indices"),
+        (6, 2, "q", 1, "bad text offsets"),
+    ],
+)
+def test_load_binary_rejects_corrupt_files(
+    tmp_path, network, section, index, fmt, value, message
+):
+    # The network has the links A --> B and B --> A.
+    network.add_link(network.nodes[1], network.nodes[0], 2)
+    filename = str(tmp_path / "test.netb")
+    serializer.save_binary(network, filename)
+    if section is None:
+        # The header fields after the prefix: version, nodes, links, text size.
+        position = serializer._PREFIX.size + 8 * index
+    else:
+        position = serializer._binary_layout(2, 2, 2)[section][1]
+        position += index * struct.calcsize(fmt)
+    _corrupt(filename, position, fmt, value)
+    for load in (serializer.load_binary, serializer.load_compact):
+        with pytest.raises(DeserializationException) as ex:
+            load(filename)
+        assert str(ex.value) == f"Corrupt binary network file: {message}"
+
+
+def _write_lines(tmp_path, lines) -> str:
+    filename = str(tmp_path / "test.net")
+    with open(filename, "w", encoding="utf-8") as writer:
+        writer.write("\n".join(lines))
+    return filename
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_load_from_file_in_batches(tmp_path, monkeypatch, batch_size):
+    monkeypatch.setattr(serializer, "BATCH_SIZE", batch_size)
+    lines = ["3 # Nodes", "", "3", "0,0,A", "# B", "1,1,B # B", "2,2,C"]
+    filename = _write_lines(tmp_path, lines + ["0,1,4", "1,2,5", "2,0,6"])
+    network = serializer.load_from_file(filename)
+    assert [node.text for node in network.nodes] == ["A", "B", "C"]
+    assert [str(link) for link in network.links] == [
+        "[A] --> [B] (4)",
+        "[B] --> [C] (5)",
+        "[C] --> [A] (6)",
+    ]
+
+
+@pytest.mark.parametrize(
+    "lines, message",
+    [
+        (["2", "1", "0,0,A", "1,B", "0,1,1"], "Invalid node string: '1,B'"),
+        (["2", "1", "0,0,A", "1,x,B", "0,1,1"], "Invalid node string: '1,x,B'"),
+        (["2", "2", "0,0,A", "1,1,B", "0,1,1", "0,1"], "Invalid link string: '0,1'"),
+        (
+            ["2", "2", "0,0,A", "1,1,B", "0,2,1", "0,x,1"],
+            "Node index out of bounds: '0,2,1'",
+        ),
+        (
+            ["2", "2", "0,0,A", "1,1,B", "0,1,1"],
+            "Could not find the number of links expected (1/2)",
+        ),
+    ],
+)
+def test_load_from_file_reports_the_first_invalid_line(tmp_path, lines, message):
+    with pytest.raises(DeserializationException) as ex:
+        serializer.load_from_file(_write_lines(tmp_path, lines))
+    assert str(ex.value) == message
+
+
+@pytest.mark.parametrize("batch_size", [1, 1000])
+def test_convert_to_binary(tmp_path, monkeypatch, batch_size):
+    monkeypatch.setattr(serializer, "BATCH_SIZE", batch_size)
+    filename = TEST_FILES_PATH + "dijkstra3.txt"
+    expected = str(tmp_path / "expected.netb")
+    serializer.save_binary(serializer.load_from_file(filename), expected)
+    converted = str(tmp_path / "converted.netb")
+    serializer.convert_to_binary(filename, converted)
+    with open(expected, "rb") as expected_reader:
+        with open(converted, "rb") as converted_reader:
+            assert converted_reader.read() == expected_reader.read()
+
+
+def test_convert_to_binary_keeps_the_default_file_mode(tmp_path):
+    mask = os.umask(0o022)
+    try:
+        converted = str(tmp_path / "converted.netb")
+        serializer.convert_to_binary(TEST_FILES_PATH + "dijkstra3.txt", converted)
+    finally:
+        os.umask(mask)
+    assert os.stat(converted).st_mode & 0o777 == 0o644
+
+
+def test_convert_to_binary_reports_invalid_lines(tmp_path):
+    lines = ["2", "2", "0,0,A", "1,1,B", "0,1,1", "0,2,1"]
+    converted = str(tmp_path / "converted.netb")
+    with pytest.raises(DeserializationException) as ex:
+        serializer.convert_to_binary(_write_lines(tmp_path, lines), converted)
+    assert str(ex.value) == "Node index out of bounds: '0,2,1'"
+    assert list(tmp_path.iterdir()) == [tmp_path / "test.net"]
+
+
+def test_load_lazily_missing_file(tmp_path):
+    filename = str(tmp_path / "missing.net")
+    with pytest.raises(FileNotFoundError) as ex:
+        serializer.load_lazily(filename)
+    assert ex.value.filename == filename
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_load_lazily(tmp_path):
+    filename = _write_lines(tmp_path, ["2", "2", "0,0,A", "1,1,B", "0,1,4", "1,0,5"])
+    compact = serializer.load_lazily(filename)
+    assert list(compact.shortest_path_tree(1)[0]) == [5, 0]
+    index_filename = serializer.compact_filename(filename)
+    built = os.path.getmtime(index_filename)
+    assert list(serializer.load_lazily(filename).costs) == [4, 5]
+    assert os.path.getmtime(index_filename) == built
+
+
+def test_load_lazily_does_not_read_the_whole_index(tmp_path, monkeypatch):
+    filename = _write_lines(tmp_path, ["2", "1", "0,0,A", "1,1,B", "0,1,4"])
+    serializer.load_lazily(filename)
+
+    def check_binary(*args):
+        raise AssertionError("the arrays were checked")
+
+    monkeypatch.setattr(serializer, "_check_binary", check_binary)
+    assert list(serializer.load_lazily(filename).costs) == [4]
+
+
+@pytest.mark.parametrize("batch_size", [1, 1000])
+def test_save_into_file_in_batches(tmp_path, monkeypatch, network, batch_size):
+    monkeypatch.setattr(serializer, "BATCH_SIZE", batch_size)
+    filename = str(tmp_path / "test.net")
+    serializer.save_into_file(network, filename)
+    with open(filename, "r", encoding="utf-8") as reader:
+        assert reader.read() == serializer._network_to_string(network) + "\n"
+
+
+def test_save_and_load_gzip(tmp_path, network):
+    filename = str(tmp_path / "test.net.gz")
+    serializer.save_into_file(network, filename, compression="gzip")
+    with gzip.open(filename, "rt", encoding="utf-8") as reader:
+        assert reader.read() == serializer._network_to_string(network) + "\n"
+    loaded = serializer.load_from_file(filename)
+    assert serializer._network_to_string(loaded) == serializer._network_to_string(
+        network
+    )
+
+
+def test_save_with_an_unknown_compression_raises_an_exception(tmp_path, network):
+    with pytest.raises(ValueError) as ex:
+        serializer.save_into_file(network, str(tmp_path / "test.net"), "lzma")
+    assert str(ex.value) == "Unknown compression: 'lzma'"
+
+
+def test_save_and_load_zstd(tmp_path, network):
+    pytest.importorskip("zstandard")
+    filename = str(tmp_path / "test.net.zst")
+    serializer.save_into_file(network, filename, compression="zstd")
+    assert serializer._compression_of(filename) == "zstd"
+    loaded = serializer.load_from_file(filename)
+    assert serializer._network_to_string(loaded) == serializer._network_to_string(
+        network
+    )
@@ -0,0 +1,63 @@
+import pytest
+
+from common.network import Network
+from common.point import Point
+from common.spanning_tree import IndexedHeap, UnionFind
+
+
+@pytest.fixture
+def network(random_grid) -> Network:
+    # Two components: a 4 x 4 grid with random costs and a lone pair of nodes.
+    test_network = random_grid(4, 4, 1, 9, seed=1)
+    node_a = test_network.add_node(Point(0, 40), "16")
+    test_network.add_link(node_a, test_network.add_node(Point(10, 40), "17"), 4)
+    return test_network
+
+
+def test_union_find():
+    sets = UnionFind(4)
+    assert sets.union(0, 1)
+    assert sets.union(2, 3)
+    assert not sets.union(1, 0)
+    assert sets.find(0) == sets.find(1) != sets.find(2)
+    assert sets.union(1, 3)
+    assert len({sets.find(i) for i in range(4)}) == 1
+
+
+def test_indexed_heap_pops_in_key_order():
+    queue = IndexedHeap(5)
+    for item, key in enumerate([5, 3, 8, 1, 7]):
+        queue.push_or_decrease(item, key)
+    assert not queue.push_or_decrease(1, 4)
+    assert queue.push_or_decrease(2, 0)
+    assert [queue.pop() for _ in range(len(queue))] == [2, 3, 1, 0, 4]
+
+
+def test_kruskal_and_prim_agree(network):
+    kruskal = network.find_minimum_spanning_tree_kruskal()
+    prim = network.find_minimum_spanning_tree_prim()
+    assert len(kruskal) == len(prim) == 16
+    assert sum(link.cost for link in kruskal) == sum(link.cost for link in prim)
+    assert {link for link in network.links if link.is_in_tree} == set(prim)
+
+
+def test_sorted_links_are_refreshed_after_a_cost_change(network):
+    assert network.sorted_links() is network.sorted_links()
+    most_expensive = network.links[network.sorted_links()[-1]]
+    network.update_link_cost(most_expensive, 0)
+    assert network.links[network.sorted_links()[0]] is most_expensive
+
+
+def test_tree_replaces_the_marks_of_a_path(network):
+    network.select_start_node(network.nodes[0])
+    network.select_end_node(network.nodes[15])
+    network.check_for_path(Network.LABEL_CORRECTING)
+    tree = network.find_minimum_spanning_tree_kruskal()
+    assert not any(link.is_in_path for link in network.links)
+    assert {link for link in network.links if link.is_in_tree} == set(tree)
+    assert network.tree_links is None
+
+    network.update_link_cost(tree[0], 100)
+    tree = network.find_minimum_spanning_tree_prim()
+    assert {link for link in network.links if link.is_in_tree} == set(tree)
+    assert set(network.marked_links) == set(tree)
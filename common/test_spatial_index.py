@@ -0,0 +1,31 @@
+from common.spatial_index import GridIndex
+
+
+def test_at():
+    index = GridIndex(10)
+    index.insert("a", 0, 0, 5, 5)
+    index.insert("b", 12, 8, 25, 12)
+    assert index.at(1, 1) == ["a"]
+    assert index.at(9, 9) == ["a"]
+    assert index.at(15, 9) == ["b"]
+    assert index.at(21, 11) == ["b"]
+    assert index.at(-1, -1) == []
+
+
+def test_inside():
+    index = GridIndex(10)
+    index.insert("a", 0, 0, 5, 5)
+    index.insert("b", 30, 30, 35, 35)
+    assert index.inside(0, 0, 19, 19) == {"a"}
+    assert index.inside(35, 35, 5, 5) == {"a", "b"}
+    assert index.inside(50, 50, 60, 60) == set()
+
+
+def test_inside_a_huge_box():
+    index = GridIndex(10)
+    index.insert("a", 0, 0, 5, 5)
+    index.insert("b", 30, 30, 35, 35)
+    assert index.inside(-1e12, -1e12, 1e12, 1e12) == {"a", "b"}
+    assert index.inside(-1e12, -1e12, 1e12, 10) == {"a"}
+    assert index.inside(-1e12, 100, 1e12, 1e12) == set()
+    assert GridIndex(10).inside(-1e12, -1e12, 1e12, 1e12) == set()
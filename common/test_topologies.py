@@ -0,0 +1,112 @@
+import math
+
+import numpy
+import pytest
+
+import common.serializer as serializer
+import common.topologies as topologies
+from common.network_arrays import NetworkArrays
+
+
+def _links(arrays: NetworkArrays):
+    return list(zip(arrays.from_indices.tolist(), arrays.to_indices.tolist()))
+
+
+def _check_links(arrays: NetworkArrays):
+    links = _links(arrays)
+    assert links == sorted(set(links))
+    assert all(from_index != to_index for from_index, to_index in links)
+    assert len(arrays.costs) == len(links)
+
+
+def _check_both_ways(arrays: NetworkArrays):
+    links = set(_links(arrays))
+    assert all((to_index, from_index) in links for from_index, to_index in links)
+
+
+@pytest.mark.parametrize(
+    "build",
+    [
+        lambda rng: topologies.random_geometric_arrays(500, 400, 200, 6, rng),
+        lambda rng: topologies.road_network_arrays(500, 400, 8, 10, rng),
+        lambda rng: topologies.scale_free_arrays(500, 400, 200, 3, rng),
+        lambda rng: topologies.layered_dag_arrays(500, 400, 5, 20, 3, rng),
+    ],
+)
+def test_seed(build):
+    first = build(numpy.random.default_rng(1))
+    second = build(numpy.random.default_rng(1))
+    other = build(numpy.random.default_rng(2))
+    assert all(numpy.array_equal(a, b) for a, b in zip(first, second))
+    assert not all(
+        len(a) == len(b) and numpy.array_equal(a, b) for a, b in zip(first, other)
+    )
+
+
+def test_random_geometric():
+    arrays = topologies.random_geometric_arrays(
+        500, 400, 300, 6, numpy.random.default_rng(3)
+    )
+    _check_links(arrays)
+    _check_both_ways(arrays)
+    distance = math.sqrt(6 * (500 - 20) * (400 - 20) / (math.pi * 300))
+    # Same pairs as checking every pair of nodes.
+    xs, ys = arrays.xs.tolist(), arrays.ys.tolist()
+    expected = [
+        (i, j)
+        for i in range(300)
+        for j in range(300)
+        if i != j and (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2 <= distance**2
+    ]
+    assert _links(arrays) == expected
+
+
+def test_road_network():
+    arrays = topologies.road_network_arrays(
+        500, 400, 6, 7, numpy.random.default_rng(3), diagonals=1.0
+    )
+    _check_links(arrays)
+    _check_both_ways(arrays)
+    links = set(_links(arrays))
+    # All the grid roads and one diagonal per cell.
+    assert len(links) == 2 * (6 * 6 + 7 * 5 + 5 * 6)
+    assert (0, 1) in links and (0, 7) in links
+    assert ((0, 8) in links) != ((1, 7) in links)
+
+    arrays = topologies.road_network_arrays(
+        500, 400, 6, 7, numpy.random.default_rng(3), diagonals=0.0
+    )
+    assert len(arrays.from_indices) == 2 * (6 * 6 + 7 * 5)
+
+
+def test_scale_free():
+    arrays = topologies.scale_free_arrays(
+        500, 400, 1000, 2, numpy.random.default_rng(3)
+    )
+    _check_links(arrays)
+    _check_both_ways(arrays)
+    assert 3000 < len(arrays.from_indices) <= 4000
+    degrees = numpy.bincount(arrays.from_indices, minlength=1000)
+    # The first nodes become hubs.
+    assert degrees[:10].mean() > 5 * degrees[-500:].mean()
+
+
+def test_layered_dag():
+    arrays = topologies.layered_dag_arrays(
+        500, 400, 4, 10, 3, numpy.random.default_rng(3)
+    )
+    _check_links(arrays)
+    links = _links(arrays)
+    assert all(to_index // 10 == from_index // 10 + 1 for from_index, to_index in links)
+    assert all((i, i + 10) in links for i in range(30))
+    assert arrays.xs.tolist()[::10] == sorted(set(arrays.xs.tolist()))
+
+
+def test_save_and_load(tmp_path):
+    arrays = topologies.road_network_arrays(500, 400, 4, 5, numpy.random.default_rng(3))
+    filename = str(tmp_path / "road.net")
+    arrays.save_into_file(filename)
+    network = serializer.load_from_file(filename)
+    assert [
+        (link.from_node.index, link.to_node.index, link.cost) for link in network.links
+    ] == list(zip(*(values.tolist() for values in arrays[2:])))
@@ -0,0 +1,20 @@
+from common.workspace import SearchWorkspace
+
+
+def test_reset_forgets_the_previous_search():
+    workspace = SearchWorkspace()
+    workspace.reset(3)
+    workspace.set(1, 5, None)
+    assert workspace.cost(1) == 5
+    workspace.reset(3)
+    assert workspace.cost(1) == float("inf")
+    assert list(workspace) == [None, None, None]
+
+
+def test_reset_grows_the_workspace():
+    workspace = SearchWorkspace()
+    workspace.reset(2)
+    workspace.reset(4)
+    workspace.set(3, 1, None)
+    assert len(workspace) == 4
+    assert workspace.to_lists() == ([float("inf")] * 3 + [1], [None] * 4)
@@ -0,0 +1,294 @@
+"""
+Generate non-grid networks as NumPy arrays, to benchmark the algorithms on
+several kinds of topology
+"""
+import argparse
+import math
+from typing import Tuple
+
+import numpy
+
+from common.network import Network, Node
+from common.network_arrays import NetworkArrays, grid_links, grid_positions
+
+# The 3 x 3 block of spatial hash cells around a cell.
+_NEIGHBOUR_CELLS = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+# Right, down and the two diagonals of the cell below right and below left.
+_ROAD_STEPS = [(1, 0), (0, 1), (1, 1), (-1, 1)]
+
+
+def _margin(num_nodes: int) -> int:
+    return 2 * (Node.LARGE_RADIUS if num_nodes < Network.BIG else Node.SMALL_RADIUS)
+
+
+def _random_positions(
+    rng: numpy.random.Generator, width: int, height: int, num_nodes: int
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    margin = _margin(num_nodes)
+    xs = rng.uniform(margin, width - margin, num_nodes)
+    ys = rng.uniform(margin, height - margin, num_nodes)
+    return xs, ys
+
+
+def _unique_links(
+    num_nodes: int, from_indices: numpy.ndarray, to_indices: numpy.ndarray
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    # Drop self loops and repeated links, and sort by start and then end node.
+    linked = from_indices != to_indices
+    keys = numpy.sort(from_indices[linked] * num_nodes + to_indices[linked])
+    keys = keys[numpy.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys // num_nodes, keys % num_nodes
+
+
+def _both_ways(
+    num_nodes: int, from_indices: numpy.ndarray, to_indices: numpy.ndarray
+) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    return _unique_links(
+        num_nodes,
+        numpy.concatenate((from_indices, to_indices)),
+        numpy.concatenate((to_indices, from_indices)),
+    )
+
+
+def _network_arrays(
+    rng: numpy.random.Generator,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    from_indices: numpy.ndarray,
+    to_indices: numpy.ndarray,
+) -> NetworkArrays:
+    # Like the grids, the cost of a link is its length times 1.0 to 1.2.
+    lengths = numpy.hypot(
+        xs[to_indices] - xs[from_indices], ys[to_indices] - ys[from_indices]
+    )
+    percents = rng.integers(0, 21, len(lengths))
+    costs = (lengths * (1 + percents / 100)).astype(numpy.int64)
+    return NetworkArrays(xs, ys, from_indices, to_indices, costs)
+
+
+def random_geometric_arrays(
+    width: int,
+    height: int,
+    num_nodes: int,
+    degree: float,
+    rng: numpy.random.Generator,
+) -> NetworkArrays:
+    """
+    Place num_nodes nodes at random and link, both ways, every pair closer than
+    the distance that gives about degree links per node. The pairs are found
+    with a spatial hash of cells as wide as that distance, and the nodes are
+    numbered cell by cell.
+    """
+    xs, ys = _random_positions(rng, width, height, num_nodes)
+    margin = _margin(num_nodes)
+    area = (width - 2 * margin) * (height - 2 * margin)
+    distance = math.sqrt(degree * area / (math.pi * num_nodes))
+
+    num_cols = max(1, math.ceil((width - 2 * margin) / distance))
+    num_rows = max(1, math.ceil((height - 2 * margin) / distance))
+    cols = numpy.minimum(((xs - margin) / distance).astype(numpy.int64), num_cols - 1)
+    rows = numpy.minimum(((ys - margin) / distance).astype(numpy.int64), num_rows - 1)
+    cells = rows * num_cols + cols
+    order = numpy.argsort(cells, kind="stable")
+    xs, ys, cols, rows = xs[order], ys[order], cols[order], rows[order]
+    cells = cells[order]
+    starts = numpy.searchsorted(cells, numpy.arange(num_rows * num_cols + 1))
+    counts = numpy.diff(starts)
+
+    from_parts, to_parts = [], []
+    nodes = numpy.arange(num_nodes)
+    for d_col, d_row in _NEIGHBOUR_CELLS:
+        inside = (
+            (cols + d_col >= 0)
+            & (cols + d_col < num_cols)
+            & (rows + d_row >= 0)
+            & (rows + d_row < num_rows)
+        )
+        from_nodes = nodes[inside]
+        other_cells = cells[inside] + d_row * num_cols + d_col
+        # Pair every node with each node of the other cell.
+        num_pairs = counts[other_cells]
+        firsts = numpy.repeat(starts[other_cells], num_pairs)
+        offsets = numpy.arange(num_pairs.sum()) - numpy.repeat(
+            numpy.cumsum(num_pairs) - num_pairs, num_pairs
+        )
+        from_nodes = numpy.repeat(from_nodes, num_pairs)
+        to_nodes = firsts + offsets
+        close = (xs[to_nodes] - xs[from_nodes]) ** 2 + (
+            ys[to_nodes] - ys[from_nodes]
+        ) ** 2 <= distance**2
+        from_parts.append(from_nodes[close])
+        to_parts.append(to_nodes[close])
+
+    from_indices, to_indices = _unique_links(
+        num_nodes, numpy.concatenate(from_parts), numpy.concatenate(to_parts)
+    )
+    return _network_arrays(rng, xs, ys, from_indices, to_indices)
+
+
+def road_network_arrays(
+    width: int,
+    height: int,
+    num_rows: int,
+    num_cols: int,
+    rng: numpy.random.Generator,
+    jitter: float = 0.25,
+    diagonals: float = 0.5,
+) -> NetworkArrays:
+    """
+    Build a planar, Delaunay-like road network: the nodes of a grid are moved
+    at random by up to jitter times the grid spacing, which keeps every cell
+    convex, and each cell gets one of its two diagonals with probability
+    diagonals. Every road is a link each way.
+    """
+    xs, ys, dist_x, dist_y = grid_positions(width, height, num_rows, num_cols)
+    xs = xs + rng.uniform(-jitter, jitter, len(xs)) * dist_x
+    ys = ys + rng.uniform(-jitter, jitter, len(ys)) * dist_y
+
+    from_nodes, to_nodes, steps = grid_links(num_rows, num_cols, _ROAD_STEPS)
+    num_cells = (max(num_rows - 1, 0), max(num_cols - 1, 0))
+    has_diagonal = rng.random(num_cells) < diagonals
+    # 0 for the diagonal from the top left corner, 1 for the one from the top right.
+    kinds = rng.integers(0, 2, num_cells)
+    rows, cols = from_nodes // num_cols, from_nodes % num_cols
+    # A diagonal step from the top right corner belongs to the cell on the left.
+    cell_cols = numpy.where(steps == 3, cols - 1, cols)
+    is_diagonal = steps >= 2
+    cell_rows = numpy.where(is_diagonal, rows, 0)
+    cell_cols = numpy.where(is_diagonal, cell_cols, 0)
+    keep = ~is_diagonal
+    if num_cells[0] and num_cells[1]:
+        keep |= (
+            is_diagonal
+            & has_diagonal[cell_rows, cell_cols]
+            & (kinds[cell_rows, cell_cols] == steps - 2)
+        )
+
+    from_indices, to_indices = _both_ways(len(xs), from_nodes[keep], to_nodes[keep])
+    return _network_arrays(rng, xs, ys, from_indices, to_indices)
+
+
+def scale_free_arrays(
+    width: int,
+    height: int,
+    num_nodes: int,
+    links_per_node: int,
+    rng: numpy.random.Generator,
+) -> NetworkArrays:
+    """
+    Build a Barabási–Albert graph placed at random: node v attaches to
+    links_per_node earlier nodes picked with probability proportional to their
+    degree. The self loops and repeated links the sampling can produce are
+    dropped, so there are slightly fewer than links_per_node edges per node,
+    each a link both ways.
+    """
+    xs, ys = _random_positions(rng, width, height, num_nodes)
+
+    # Batagelj and Brandes' sampling: edge e adds the entries ends[2e] = e's
+    # node and ends[2e + 1] = ends[picks[e]] for a random picks[e] <= 2e, so
+    # that every node appears in ends once per edge it is on.
+    num_edges = num_nodes * links_per_node
+    picks = rng.integers(0, 2 * numpy.arange(num_edges) + 1)
+    # Instead of filling ends in order, follow every pick back to an even entry.
+    positions = picks.copy()
+    odd = numpy.flatnonzero(positions & 1)
+    while len(odd):
+        positions[odd] = picks[positions[odd] >> 1]
+        odd = odd[positions[odd] & 1 == 1]
+    from_nodes = numpy.arange(num_edges) // links_per_node
+    to_nodes = (positions >> 1) // links_per_node
+
+    from_indices, to_indices = _both_ways(num_nodes, from_nodes, to_nodes)
+    return _network_arrays(rng, xs, ys, from_indices, to_indices)
+
+
+def layered_dag_arrays(
+    width: int,
+    height: int,
+    num_layers: int,
+    layer_size: int,
+    links_per_node: int,
+    rng: numpy.random.Generator,
+) -> NetworkArrays:
+    """
+    Build a directed acyclic graph of num_layers columns of layer_size nodes,
+    numbered layer by layer. Every node but the last layer's links to the node
+    in the same row of the next layer and to links_per_node - 1 other nodes of
+    that layer picked at random, with the repeated links dropped.
+    """
+    # A grid with a row per layer, transposed so that the layers are columns.
+    ys, xs, _, _ = grid_positions(height, width, num_layers, layer_size)
+
+    num_from = (num_layers - 1) * layer_size
+    from_nodes = numpy.repeat(numpy.arange(num_from), links_per_node)
+    next_firsts = (from_nodes // layer_size + 1) * layer_size
+    rows = rng.integers(0, layer_size, len(from_nodes))
+    rows[::links_per_node] = from_nodes[::links_per_node] % layer_size
+    from_indices, to_indices = _unique_links(
+        num_layers * layer_size, from_nodes, next_firsts + rows
+    )
+    return _network_arrays(rng, xs, ys, from_indices, to_indices)
+
+
+def _main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compression", choices=["gzip", "zstd"])
+    topologies = parser.add_subparsers(dest="topology", required=True)
+
+    geometric = topologies.add_parser("geometric", help="random geometric graph")
+    geometric.add_argument("nodes", type=int)
+    geometric.add_argument("degree", type=float, help="mean links per node")
+
+    road = topologies.add_parser("road", help="Delaunay-like planar road network")
+    road.add_argument("rows", type=int)
+    road.add_argument("cols", type=int)
+    road.add_argument("--jitter", type=float, default=0.25)
+    road.add_argument("--diagonals", type=float, default=0.5)
+
+    scale_free = topologies.add_parser("scale-free", help="Barabási–Albert graph")
+    scale_free.add_argument("nodes", type=int)
+    scale_free.add_argument("links_per_node", type=int)
+
+    dag = topologies.add_parser("dag", help="layered directed acyclic graph")
+    dag.add_argument("layers", type=int)
+    dag.add_argument("layer_size", type=int)
+    dag.add_argument("links_per_node", type=int)
+
+    args = parser.parse_args()
+    rng = numpy.random.default_rng(args.seed)
+    if args.topology == "geometric":
+        arrays = random_geometric_arrays(
+            args.width, args.height, args.nodes, args.degree, rng
+        )
+    elif args.topology == "road":
+        arrays = road_network_arrays(
+            args.width,
+            args.height,
+            args.rows,
+            args.cols,
+            rng,
+            args.jitter,
+            args.diagonals,
+        )
+    elif args.topology == "scale-free":
+        arrays = scale_free_arrays(
+            args.width, args.height, args.nodes, args.links_per_node, rng
+        )
+    else:
+        arrays = layered_dag_arrays(
+            args.width,
+            args.height,
+            args.layers,
+            args.layer_size,
+            args.links_per_node,
+            rng,
+        )
+    arrays.save_into_file(args.filename, args.compression)
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,59 @@
+"""
+Per-node search state reused from one query to the next
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from common.network import Link
+
+
+class SearchWorkspace:
+    """
+    Costs, links, settled flags and counts indexed by node. An entry only counts
+    when its stamp is the current generation, so reset is O(1) and a search only
+    touches the nodes it visits. Indexing returns the link of a node (None when
+    it was not reached), so a workspace can stand in for a list of tree links
+    until the next reset.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.num_nodes = 0
+        self.stamps: List[int] = []
+        self.settled: List[int] = []
+        self.costs: List[float] = []
+        self.links: List[Optional[Link]] = []
+        self.counts: List[int] = []  # such as the number of links in a path
+
+    def reset(self, num_nodes: int):
+        if len(self.stamps) < num_nodes:
+            missing = num_nodes - len(self.stamps)
+            self.stamps.extend([0] * missing)
+            self.settled.extend([0] * missing)
+            self.costs.extend([float("inf")] * missing)
+            self.links.extend([None] * missing)
+            self.counts.extend([0] * missing)
+        self.num_nodes = num_nodes
+        self.generation += 1
+
+    def set(self, i: int, cost: float, link: Optional[Link]):
+        self.stamps[i] = self.generation
+        self.costs[i] = cost
+        self.links[i] = link
+
+    def cost(self, i: int) -> float:
+        return self.costs[i] if self.stamps[i] == self.generation else float("inf")
+
+    def __getitem__(self, i: int) -> Optional[Link]:
+        return self.links[i] if self.stamps[i] == self.generation else None
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+    def __iter__(self) -> Iterator[Optional[Link]]:
+        return (self[i] for i in range(self.num_nodes))
+
+    def to_lists(self) -> Tuple[List[float], List[Optional[Link]]]:
+        return [self.cost(i) for i in range(self.num_nodes)], list(self)